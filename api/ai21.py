@@ -1,9 +1,9 @@
 import os
-from typing import Dict, Any
-from ai21 import AI21Client
-from ai21.models.chat import ChatMessage
+from typing import Dict, Any, List, Iterator
 
-from api.base import BaseProvider
+from api.base import BaseProvider, get_packing_prompt, get_reference_prompt
+from api.errors import CALLER_ERRORS
+from api.transport import get_transport
 from utils.language_utils import get_language_code
 
 
@@ -39,7 +39,9 @@ class AI21Provider(BaseProvider):
     def _get_client(self):
         """Get or create an AI21 client."""
         if not self.client and self.api_key:
-            self.client = AI21Client(api_key=self.api_key)
+            from ai21 import AI21Client
+            # The SDK only takes a client-wide timeout; the caller's deadline is checked between attempts
+            self.client = AI21Client(api_key=self.api_key, timeout_sec=get_transport().read_timeout)
         return self.client
     
     def test_connection(self) -> bool:
@@ -49,6 +51,8 @@ class AI21Provider(BaseProvider):
             if not client:
                 return False
             
+            from ai21.models.chat import ChatMessage
+            
             # Make a simple call to test the connection
             response = client.chat.completions.create(
                 model="jamba-1.5-mini",
@@ -65,6 +69,32 @@ class AI21Provider(BaseProvider):
             print(f"AI21 connection error: {str(e)}")
             return False
     
+    @classmethod
+    def get_max_chunk_tokens(cls, model: str) -> int:
+        # Translate requests are capped at max_tokens=2048; leave room for translations longer than the source
+        return 1200
+    
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+    
+    def _get_messages(self, text: str, source_language: str, target_language: str) -> List[Any]:
+        """Build the chat messages for a translation request."""
+        from ai21.models.chat import ChatMessage
+        
+        # Create system and user messages
+        system_message = (
+            f"You are a professional translator from {source_language} to {target_language}. "
+            "Translate the provided text accurately, preserving meaning, tone, and style. "
+            "Only provide the translation without additional comments."
+        )
+        system_message += get_packing_prompt() + get_reference_prompt()
+        
+        return [
+            ChatMessage(role="system", content=system_message),
+            ChatMessage(role="user", content=text),
+        ]
+    
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using AI21 (Jamba)."""
         client = self._get_client()
@@ -75,24 +105,39 @@ class AI21Provider(BaseProvider):
         target_code = get_language_code(target_language)
         
         try:
-            # Create system and user messages
-            system_message = (
-                f"You are a professional translator from {source_language} to {target_language}. "
-                "Translate the provided text accurately, preserving meaning, tone, and style. "
-                "Only provide the translation without additional comments."
-            )
-            
-            response = client.chat.completions.create(
+            response = self._send_request(model, text, lambda: client.chat.completions.create(
                 model=model,
-                messages=[
-                    ChatMessage(role="system", content=system_message),
-                    ChatMessage(role="user", content=text),
-                ],
+                messages=self._get_messages(text, source_language, target_language),
                 temperature=0.3,
                 max_tokens=2048,
-            )
+            ))
             
             # Extract the translation from the response
             return response.choices[0].message.content
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text using AI21 (Jamba), yielding the translation as it is generated."""
+        client = self._get_client()
+        if not client:
+            raise ValueError("API key not set for AI21")
+        
+        try:
+            stream = self._stream_request(model, text, lambda: client.chat.completions.create(
+                model=model,
+                messages=self._get_messages(text, source_language, target_language),
+                temperature=0.3,
+                max_tokens=2048,
+                stream=True,
+            ))
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except CALLER_ERRORS:
+            raise
         except Exception as e:
             raise Exception(f"Translation error: {str(e)}")
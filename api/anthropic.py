@@ -1,8 +1,9 @@
 import os
-import anthropic
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 
-from api.base import BaseProvider
+from api.base import BaseProvider, get_packing_prompt, get_reference_prompt
+from api.errors import CALLER_ERRORS
+from api.cancellation import on_cancel
 from utils.language_utils import get_language_code
 
 
@@ -39,7 +40,9 @@ class AnthropicProvider(BaseProvider):
     def _get_client(self):
         """Get or create an Anthropic client."""
         if not self.client and self.api_key:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+            import anthropic
+            # Retries are handled by our own retry policy in BaseProvider
+            self.client = anthropic.Anthropic(api_key=self.api_key, max_retries=0)
         return self.client
     
     def test_connection(self) -> bool:
@@ -60,6 +63,24 @@ class AnthropicProvider(BaseProvider):
             print(f"Anthropic connection error: {str(e)}")
             return False
     
+    @classmethod
+    def get_max_chunk_tokens(cls, model: str) -> int:
+        # Translate requests are capped at max_tokens=4000; leave room for translations longer than the source
+        return 2400
+    
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+    
+    def _get_system_prompt(self, source_language: str, target_language: str) -> str:
+        """Build the system prompt for a translation request."""
+        # Use of system prompt for better translation quality
+        return (
+            f"You are a professional translator from {source_language} to {target_language}. "
+            "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
+            "Only provide the translation, with no additional comments or explanations."
+        ) + get_packing_prompt() + get_reference_prompt()
+    
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using Claude."""
         client = self._get_client()
@@ -69,24 +90,47 @@ class AnthropicProvider(BaseProvider):
         source_code = get_language_code(source_language)
         target_code = get_language_code(target_language)
         
-        # Use of system prompt for better translation quality
-        system_prompt = (
-            f"You are a professional translator from {source_language} to {target_language}. "
-            "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
-            "Only provide the translation, with no additional comments or explanations."
-        )
-        
         try:
-            response = client.messages.create(
+            response = self._send_request(model, text, lambda: client.messages.create(
                 model=model,
-                system=system_prompt,
+                system=self._get_system_prompt(source_language, target_language),
                 max_tokens=4000,
                 messages=[
                     {"role": "user", "content": text}
-                ]
-            )
+                ],
+                timeout=self.get_request_timeout()
+            ))
             
             # Extract the translation from the response
             return response.content[0].text
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text using Claude, yielding the translation as it is generated."""
+        client = self._get_client()
+        if not client:
+            raise ValueError("API key not set for Anthropic")
+        
+        def stream_text():
+            with client.messages.stream(
+                model=model,
+                system=self._get_system_prompt(source_language, target_language),
+                max_tokens=4000,
+                messages=[
+                    {"role": "user", "content": text}
+                ],
+                timeout=self.get_request_timeout()
+            ) as stream, on_cancel(stream.close):
+                for delta in stream.text_stream:
+                    yield delta
+        
+        try:
+            for delta in self._stream_request(model, text, stream_text):
+                yield delta
+        except CALLER_ERRORS:
+            raise
         except Exception as e:
             raise Exception(f"Translation error: {str(e)}")
@@ -1,9 +1,9 @@
 import os
-import requests
-import json
-from typing import Dict, Any
+from typing import Dict, Any, Iterator
 
-from api.base import BaseProvider
+from api.base import BaseProvider, get_packing_prompt, get_reference_prompt
+from api.errors import CALLER_ERRORS, raise_for_status
+from api.transport import get_transport, iter_sse_events
 from utils.language_utils import get_language_code
 
 
@@ -41,13 +41,8 @@ class ArliAIProvider(BaseProvider):
             if not self.api_key:
                 return False
             
-            # Prepare headers and payload for a simple test request
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f"Bearer {self.api_key}"
-            }
-            
-            payload = json.dumps({
+            # Prepare payload for a simple test request
+            payload = {
                 "model": "Mistral-Nemo-12B-Instruct-2407",
                 "messages": [
                     {"role": "system", "content": "You are a helpful assistant."},
@@ -57,10 +52,10 @@ class ArliAIProvider(BaseProvider):
                 "max_tokens": 10,
                 "stream": False,
                 "multipler": 2
-            })
+            }
             
             # Send test request
-            response = requests.post(self.api_url, headers=headers, data=payload)
+            response = get_transport().post(self.api_url, headers=self._get_headers(), json=payload)
             
             # Check if the request was successful
             return response.status_code == 200
@@ -68,6 +63,44 @@ class ArliAIProvider(BaseProvider):
             print(f"ArliAI connection error: {str(e)}")
             return False
     
+    @classmethod
+    def get_max_chunk_tokens(cls, model: str) -> int:
+        # Translate requests are capped at max_tokens=2048; leave room for translations longer than the source
+        return 1200
+    
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+    
+    def _get_headers(self) -> Dict[str, str]:
+        """Get headers for API requests."""
+        return {
+            'Content-Type': 'application/json',
+            'Authorization': f"Bearer {self.api_key}"
+        }
+    
+    def _get_payload(self, text: str, model: str, source_language: str, target_language: str, stream: bool) -> Dict[str, Any]:
+        """Build the request payload for a translation request."""
+        # Create system message for translation
+        system_message = (
+            f"You are a professional translator from {source_language} to {target_language}. "
+            "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
+            "Only provide the translation, with no additional comments or explanations."
+        )
+        system_message += get_packing_prompt() + get_reference_prompt()
+        
+        return {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": system_message},
+                {"role": "user", "content": text}
+            ],
+            "temperature": 0.3,
+            "top_p": 0.9,
+            "max_tokens": 2048,
+            "stream": stream
+        }
+    
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using ArliAI."""
         if not self.api_key:
@@ -77,40 +110,38 @@ class ArliAIProvider(BaseProvider):
         target_code = get_language_code(target_language)
         
         try:
-            # Prepare headers
-            headers = {
-                'Content-Type': 'application/json',
-                'Authorization': f"Bearer {self.api_key}"
-            }
+            payload = self._get_payload(text, model, source_language, target_language, stream=False)
             
-            # Create system message for translation
-            system_message = (
-                f"You are a professional translator from {source_language} to {target_language}. "
-                "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
-                "Only provide the translation, with no additional comments or explanations."
-            )
+            # Send request (raises on an unsuccessful status code)
+            response = self._send_request(model, text, lambda: raise_for_status(
+                get_transport().post(self.api_url, headers=self._get_headers(), json=payload)
+            ))
             
-            # Prepare payload
-            payload = json.dumps({
-                "model": model,
-                "messages": [
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": text}
-                ],
-                "temperature": 0.3,
-                "top_p": 0.9,
-                "max_tokens": 2048,
-                "stream": False
-            })
-            
-            # Send request
-            response = requests.post(self.api_url, headers=headers, data=payload)
+            json_response = response.json()
+            return json_response['choices'][0]['message']['content']
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text using ArliAI, yielding the translation as it is generated."""
+        if not self.api_key:
+            raise ValueError("API key not set for ArliAI")
+        
+        try:
+            payload = self._get_payload(text, model, source_language, target_language, stream=True)
+            lines = self._stream_request(
+                model, text,
+                lambda: get_transport().stream_lines("POST", self.api_url, headers=self._get_headers(), json=payload)
+            )
             
-            # Check if the request was successful
-            if response.status_code == 200:
-                json_response = response.json()
-                return json_response['choices'][0]['message']['content']
-            else:
-                raise Exception(f"Error from ArliAI API: Status code {response.status_code}, {response.text}")
+            for event in iter_sse_events(lines):
+                choices = event.get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    yield delta
+        except CALLER_ERRORS:
+            raise
         except Exception as e:
             raise Exception(f"Translation error: {str(e)}")
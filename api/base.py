@@ -1,8 +1,85 @@
 from abc import ABC, abstractmethod
+import contextvars
+import importlib
+import inspect
 import os
-from typing import Dict, Any, Optional, List
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, List, Iterator, Iterable, Callable, Tuple, TypeVar
 
+from api.cancellation import check_cancelled, is_cancelled, on_cancel
+from api.circuit import get_circuit_breaker
+from api.deadline import check_deadline, get_remaining
+from api.errors import DeadlineExceeded, TranslationCancelled, get_caller_error, is_cancellation
+from api.health import get_backend_health
+from api.metrics import increment
+from api.ratelimit import get_rate_limiter
+from api.retry import get_retry_policy
+from api.transport import get_transport
+from utils.chunking import estimate_tokens
 from utils.model_info import get_models_for_provider
+from utils.packing import can_pack, pack_segments, plan_batches, unpack_segments
+
+
+# Version of the translation prompts used by the providers. Bump this when a
+# prompt changes so cached translations from the old prompt are not reused.
+PROMPT_VERSION = 1
+
+T = TypeVar("T")
+
+# (source, translation) pairs of similar segments from the translation
+# memory, set around a provider call so the prompt can include them.
+_reference_translations = contextvars.ContextVar("reference_translations", default=())
+
+
+@contextmanager
+def use_reference_translations(examples: List[Tuple[str, str]]):
+    """Make providers include these reference translations in prompts built inside the block."""
+    token = _reference_translations.set(tuple(examples))
+    try:
+        yield
+    finally:
+        _reference_translations.reset(token)
+
+
+def get_reference_prompt() -> str:
+    """Prompt text listing the current reference translations ("" when there are none)."""
+    examples = _reference_translations.get()
+    if not examples:
+        return ""
+    
+    lines = ["", "", "For consistency, these similar segments were translated earlier:"]
+    for source, translation in examples:
+        lines.append(f"Source: {source}")
+        lines.append(f"Translation: {translation}")
+    return "\n".join(lines)
+
+
+# Set while a batch of <seg id="n"> segments is being translated, so the
+# prompt tells the model to carry the tags through.
+_packed_segments = contextvars.ContextVar("packed_segments", default=False)
+
+
+@contextmanager
+def translating_packed_segments():
+    """Make providers ask for segment tags to be kept in prompts built inside the block."""
+    token = _packed_segments.set(True)
+    try:
+        yield
+    finally:
+        _packed_segments.reset(token)
+
+
+def get_packing_prompt() -> str:
+    """Prompt text asking to keep the segment tags of a packed batch ("" outside one)."""
+    if not _packed_segments.get():
+        return ""
+    return (
+        "\n\nThe text is a list of segments, each wrapped in a <seg id=\"n\">...</seg> tag. "
+        "Translate only the text inside each tag. Keep every <seg id=\"n\"> and </seg> tag exactly as "
+        "it is, in the same order, and never merge, split, drop or add segments."
+    )
 
 
 class BaseProvider(ABC):
@@ -29,6 +106,11 @@ class BaseProvider(ABC):
         provider_name = cls.get_name()
         return get_models_for_provider(provider_name)
     
+    @classmethod
+    def requires_api_key(cls) -> bool:
+        """Check if this provider needs an API key of its own to be set in API Settings."""
+        return True
+    
     @classmethod
     def is_api_key_set(cls) -> bool:
         """Check if the API key for this provider is set in the environment."""
@@ -49,53 +131,270 @@ class BaseProvider(ABC):
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using this provider."""
         pass
+    
+    @classmethod
+    def get_max_chunk_tokens(cls, model: str) -> int:
+        """Get the largest source chunk (in estimated tokens) to send in one request.
+        
+        Long documents are split into chunks of this size so the translation
+        fits within the output limit the provider uses for the model.
+        """
+        return 2000
+    
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        """Check if this provider streams translations as they are generated."""
+        return False
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text, yielding pieces of the translation as they arrive.
+        
+        Providers without streaming support yield the whole translation once.
+        """
+        yield self.translate(text, model, source_language, target_language)
+    
+    @classmethod
+    def get_max_batch_segments(cls, model: str) -> int:
+        """Get the most segments translate_batch packs into one request."""
+        return 50
+    
+    def translate_batch(self, texts: List[str], model: str, source_language: str,
+                        target_language: str, max_workers: int = 4) -> List[str]:
+        """Translate many short texts, packing several into each request.
+        
+        Segments are packed into numbered tags up to the chunk token budget,
+        so the prompt and round trip are paid once per batch instead of once
+        per string. Segments whose translations do not line up are retried in
+        a smaller batch, and on their own as a last resort. Blank texts are
+        returned unchanged and outer whitespace is preserved.
+        """
+        cores = [text.strip() for text in texts]
+        packable = [index for index, core in enumerate(cores) if core and can_pack(core)]
+        unpackable = [index for index, core in enumerate(cores) if core and not can_pack(core)]
+        
+        batches = plan_batches([cores[index] for index in packable],
+                               self.get_max_chunk_tokens(model), self.get_max_batch_segments(model))
+        groups = [[packable[position] for position in batch] for batch in batches]
+        groups.extend([index] for index in unpackable)
+        
+        def translate_group(indexes: List[int]) -> Dict[int, str]:
+            return self._translate_packed(indexes, cores, model, source_language, target_language)
+        
+        translations = {}
+        if len(groups) == 1 or max_workers <= 1:
+            for group in groups:
+                translations.update(translate_group(group))
+        else:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(groups))) as executor:
+                futures = [executor.submit(contextvars.copy_context().run, translate_group, group)
+                           for group in groups]
+                for future in futures:
+                    translations.update(future.result())
+        
+        results = []
+        for index, text in enumerate(texts):
+            if index not in translations:
+                results.append(text)
+                continue
+            leading = text[:len(text) - len(text.lstrip())]
+            trailing = text[len(text.rstrip()):]
+            results.append(leading + translations[index] + trailing)
+        return results
+    
+    def _translate_packed(self, indexes: List[int], cores: List[str], model: str,
+                          source_language: str, target_language: str) -> Dict[int, str]:
+        """Translate one batch of segments, retrying any that come back misaligned."""
+        if len(indexes) == 1:
+            index = indexes[0]
+            return {index: self.translate(cores[index], model, source_language, target_language).strip()}
+        
+        with translating_packed_segments():
+            response = self.translate(pack_segments([cores[index] for index in indexes]),
+                                      model, source_language, target_language)
+        aligned = unpack_segments(response, len(indexes))
+        translations = {indexes[position]: translation for position, translation in aligned.items()}
+        
+        missing = [index for position, index in enumerate(indexes) if position not in aligned]
+        if not missing:
+            return translations
+        
+        increment("batch_misaligned", f"{self.get_name()}/{model}", len(missing))
+        if len(missing) < len(indexes):
+            retry_groups = [missing]
+        else:
+            # Nothing lined up: halve the batch so a bad segment cannot sink the rest again
+            half = len(indexes) // 2
+            retry_groups = [indexes[:half], indexes[half:]]
+        
+        for group in retry_groups:
+            translations.update(self._translate_packed(group, cores, model, source_language, target_language))
+        return translations
+    
+    def get_endpoint(self) -> str:
+        """Name the endpoint this provider calls, for its circuit breaker.
+        
+        Providers whose server address is configurable include it, so two
+        servers behind the same provider fail independently.
+        """
+        return self.get_name()
+    
+    def get_request_timeout(self) -> float:
+        """Seconds an SDK request may take: the HTTP read timeout, capped by the caller's deadline."""
+        return get_transport().get_timeout()[1]
+    
+    def _on_failure(self, health, started: float, error: Exception, label: str) -> None:
+        """Record a failed call and turn a failure past the caller's deadline into DeadlineExceeded.
+        
+        A failure the caller caused is re-raised as its DeadlineExceeded or
+        TranslationCancelled, so callers can catch those types directly.
+        """
+        caller_error = get_caller_error(error)
+        if caller_error is not None:
+            increment("cancelled" if isinstance(caller_error, TranslationCancelled) else "deadline_exceeded", label)
+            if caller_error is not error:
+                raise type(caller_error)(str(caller_error)) from error
+            return  # Stopped by the caller, not by the backend
+        health.record_failure(time.monotonic() - started)
+        remaining = get_remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded calling {label}: {str(error)}") from error
+    
+    @staticmethod
+    def _record_attempt_error(breaker, error: Exception) -> None:
+        """Tell the circuit breaker about a failed attempt unless the caller caused it."""
+        if is_cancellation(error):
+            breaker.release()
+        else:
+            breaker.record_error(error)
+    
+    def _send_request(self, model: str, text: str, request_fn: Callable[[], T]) -> T:
+        """Send one API request for text through the provider's call policies.
+        
+        Every network call a provider makes for a translation goes through
+        here (or _stream_request), so circuit breakers, rate limits, retries
+        and health tracking apply however it was reached. Each attempt holds
+        a rate limiter slot; backoff between attempts happens outside it.
+        While the endpoint's circuit is open, attempts fail immediately
+        instead of waiting for a timeout. Attempts, backoff and rate limiter
+        waits all share the caller's deadline (see api.deadline); a call
+        still failing when it passes raises DeadlineExceeded. A cancelled
+        translation (see api.cancellation) stops before its next attempt.
+        """
+        limiter = get_rate_limiter(self.get_name(), model)
+        health = get_backend_health(self.get_name(), model)
+        breaker = get_circuit_breaker(self.get_endpoint())
+        label = f"{self.get_name()}/{model}"
+        # Budget for the prompt plus a translation of similar length
+        tokens = estimate_tokens(text) * 2
+        
+        def attempt():
+            check_deadline(label)
+            check_cancelled(label)
+            breaker.before_call()
+            try:
+                with limiter.limit(tokens):
+                    result = request_fn()
+            except Exception as e:
+                self._record_attempt_error(breaker, e)
+                raise
+            breaker.record_success()
+            return result
+        
+        started = time.monotonic()
+        try:
+            result = get_retry_policy().call(attempt, label=label)
+        except Exception as e:
+            self._on_failure(health, started, e, label)
+            raise
+        health.record_success(time.monotonic() - started, tokens)
+        return result
+    
+    def _stream_request(self, model: str, text: str, stream_fn: Callable[[], Iterable[T]]) -> Iterator[T]:
+        """Like _send_request, but holds the request slot until the stream is consumed.
+        
+        Cancelling the translation closes the stream, aborting the read in
+        progress, when the SDK's stream object can be closed; generator
+        streams are closed by the transport or stop at the next piece.
+        """
+        limiter = get_rate_limiter(self.get_name(), model)
+        health = get_backend_health(self.get_name(), model)
+        breaker = get_circuit_breaker(self.get_endpoint())
+        label = f"{self.get_name()}/{model}"
+        tokens = estimate_tokens(text) * 2
+        
+        def attempt():
+            check_deadline(label)
+            check_cancelled(label)
+            breaker.before_call()
+            received_any = False
+            try:
+                with limiter.limit(tokens):
+                    stream = stream_fn()
+                    # Closing a generator from another thread is not allowed
+                    close = None if inspect.isgenerator(stream) else getattr(stream, "close", None)
+                    with on_cancel(close or (lambda: None)):
+                        for item in stream:
+                            if not received_any:
+                                # The endpoint is answering
+                                received_any = True
+                                breaker.record_success()
+                            # Read timeouts only bound the gaps between pieces
+                            check_deadline(label)
+                            check_cancelled(label)
+                            yield item
+            except Exception as e:
+                error = e
+                if is_cancelled() and not is_cancellation(e):
+                    # The stream broke because cancelling closed it
+                    error = TranslationCancelled(f"Translation cancelled calling {label}")
+                if not received_any:
+                    self._record_attempt_error(breaker, error)
+                if error is e:
+                    raise
+                raise error from e
+            finally:
+                if not received_any:
+                    breaker.release()
+        
+        # A stream the caller abandons early is recorded as neither success nor failure
+        started = time.monotonic()
+        try:
+            yield from get_retry_policy().stream(attempt, label=label)
+        except Exception as e:
+            self._on_failure(health, started, e, label)
+            raise
+        health.record_success(time.monotonic() - started, tokens)
+
+
+# Registry of provider names to the module and class implementing them.
+# Provider modules are imported on first lookup, and each one only imports
+# its SDK when a client is first created, so startup stays light.
+PROVIDER_REGISTRY = {
+    "Anthropic": ("api.anthropic", "AnthropicProvider"),
+    "Google AI Studio": ("api.googleaistudio", "GoogleAIStudioProvider"),
+    "AI21": ("api.ai21", "AI21Provider"),
+    "OpenAI": ("api.openai", "OpenAIProvider"),
+    "Deepseek": ("api.deepseek", "DeepseekProvider"),
+    "Cohere": ("api.cohere", "CohereProvider"),
+    "Mistral": ("api.mistral", "MistralProvider"),
+    "Featherless": ("api.featherless", "FeatherlessProvider"),
+    "ArliAI": ("api.arliai", "ArliAIProvider"),
+    "Openrouter": ("api.openrouter", "OpenrouterProvider"),
+    "OpenAI Compatible": ("api.oaicompat", "OAICompatibleProvider"),
+    "Router": ("api.router", "RouterProvider")
+}
 
 
 def get_provider_list() -> List[str]:
     """Get a list of all available providers."""
-    return [
-        "Anthropic",
-        "Google AI Studio",
-        "AI21",
-        "OpenAI",
-        "Deepseek",
-        "Cohere",
-        "Mistral",
-        "Featherless",
-        "ArliAI",
-        "Openrouter",
-        "OpenAI Compatible"
-    ]
+    return list(PROVIDER_REGISTRY.keys())
 
 
 def get_provider_class(provider_name: str) -> type:
     """Get the provider class by name."""
-    providers = {
-        "Anthropic": AnthropicProvider,
-        "Google AI Studio": GoogleAIStudioProvider,
-        "AI21": AI21Provider,
-        "OpenAI": OpenAIProvider,
-        "Deepseek": DeepseekProvider,
-        "Cohere": CohereProvider,
-        "Mistral": MistralProvider,
-        "Featherless": FeatherlessProvider,
-        "ArliAI": ArliAIProvider,
-        "Openrouter": OpenrouterProvider,
-        "OpenAI Compatible": OAICompatibleProvider
-    }
-    
-    return providers.get(provider_name, BaseProvider)
-
-
-# Import specific providers (after defining the base class)
-from api.anthropic import AnthropicProvider
-from api.googleaistudio import GoogleAIStudioProvider
-from api.ai21 import AI21Provider
-from api.openai import OpenAIProvider
-from api.deepseek import DeepseekProvider
-from api.cohere import CohereProvider
-from api.mistral import MistralProvider
-from api.featherless import FeatherlessProvider
-from api.arliai import ArliAIProvider
-from api.openrouter import OpenrouterProvider
-from api.oaicompat import OAICompatibleProvider
+    entry = PROVIDER_REGISTRY.get(provider_name)
+    if entry is None:
+        return BaseProvider
+    
+    module_name, class_name = entry
+    return getattr(importlib.import_module(module_name), class_name)
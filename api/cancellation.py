@@ -0,0 +1,121 @@
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from api.errors import TranslationCancelled
+
+
+class CancelToken:
+    """Cooperative cancellation of one translation.
+
+    Provider calls check the token between attempts, retries and stream
+    pieces, and register callbacks that close their open stream or
+    connection, so cancel() also aborts I/O already in progress. A child
+    token is cancelled with its parent, and can be cancelled on its own;
+    detach() it once its work is over so a long-lived parent does not keep
+    collecting finished children.
+    """
+
+    def __init__(self, parent: Optional["CancelToken"] = None):
+        self._event = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+        self._detach: Callable[[], None] = lambda: None
+        if parent is not None:
+            self._detach = parent.add_callback(self.cancel)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Cancel, running every registered callback once."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"Error while cancelling: {str(e)}")
+
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback on cancellation (now, if already cancelled). Returns a function removing it."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._remove_callback(callback)
+        callback()
+        return lambda: None
+
+    def _remove_callback(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def detach(self) -> None:
+        """Stop following the parent token."""
+        self._detach()
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to seconds, waking early on cancellation. Returns True if cancelled."""
+        return self._event.wait(seconds)
+
+
+# Token of the translation running in this context, or None. Like the
+# deadline, it follows work into chunk and hedging pools.
+_token: contextvars.ContextVar[Optional[CancelToken]] = contextvars.ContextVar("cancel_token", default=None)
+
+
+@contextmanager
+def cancellation_scope(token: CancelToken):
+    """Run the with-block so that cancelling token cancels its provider calls."""
+    reset = _token.set(token)
+    try:
+        yield token
+    finally:
+        _token.reset(reset)
+
+
+def get_cancel_token() -> Optional[CancelToken]:
+    """Get the current cancellation token, if any."""
+    return _token.get()
+
+
+def is_cancelled() -> bool:
+    """Check whether the current translation has been cancelled."""
+    token = _token.get()
+    return token is not None and token.cancelled
+
+
+def check_cancelled(label: str = "") -> None:
+    """Raise TranslationCancelled if the current translation has been cancelled."""
+    if is_cancelled():
+        raise TranslationCancelled(f"Translation cancelled{' calling ' + label if label else ''}")
+
+
+def sleep(seconds: float) -> None:
+    """Sleep, raising TranslationCancelled as soon as the current translation is cancelled."""
+    token = _token.get()
+    if token is None:
+        time.sleep(seconds)
+    elif token.wait(seconds):
+        check_cancelled()
+
+
+@contextmanager
+def on_cancel(callback: Callable[[], None]):
+    """Run callback if the current translation is cancelled during the with-block."""
+    token = _token.get()
+    if token is None:
+        yield
+        return
+    remove = token.add_callback(callback)
+    try:
+        yield
+    finally:
+        remove()
@@ -0,0 +1,162 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from api.errors import CircuitOpenError, get_status_code
+from api.metrics import increment, set_gauge
+from api.retry import is_retryable
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+# Values of the circuit_state gauge
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+DEFAULT_CIRCUIT_SETTINGS = {
+    "enabled": True,
+    "failure_threshold": 5,   # Consecutive failed attempts that open the circuit
+    "open_interval": 30.0,    # Seconds to fail fast before letting a probe through
+    "half_open_probes": 1     # Probe requests allowed at once while half-open
+}
+
+
+def is_endpoint_failure(error: BaseException) -> bool:
+    """Decide whether an error means the endpoint itself is unhealthy.
+
+    Connection errors, timeouts and 5xx responses count; throttling and
+    errors about the request itself (400, 401, ...) do not, since the
+    endpoint answered.
+    """
+    status_code = get_status_code(error)
+    if status_code is not None:
+        return status_code >= 500 or status_code == 408
+    return is_retryable(error)
+
+
+class CircuitBreaker:
+    """Circuit breaker for one endpoint.
+
+    Closed: calls go through, and failure_threshold consecutive endpoint
+    failures open the circuit. Open: calls fail immediately with
+    CircuitOpenError for open_interval seconds. Half-open: up to
+    half_open_probes calls are let through; a success closes the circuit
+    and a failure opens it again.
+    """
+
+    def __init__(self, endpoint: str, enabled: bool = True, failure_threshold: int = 5,
+                 open_interval: float = 30.0, half_open_probes: int = 1):
+        self.endpoint = endpoint
+        self.enabled = enabled
+        self.failure_threshold = failure_threshold
+        self.open_interval = open_interval
+        self.half_open_probes = half_open_probes
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probes = 0
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            print(f"Circuit for {self.endpoint} is now {state}")
+        self.state = state
+        set_gauge("circuit_state", self.endpoint, STATE_VALUES[state])
+
+    def before_call(self) -> None:
+        """Admit a call, or raise CircuitOpenError if the endpoint should not be called now."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.open_interval - time.monotonic()
+                if remaining > 0:
+                    increment("circuit_rejected", self.endpoint)
+                    raise CircuitOpenError(self.endpoint, remaining)
+                self._set_state(HALF_OPEN)
+                self.probes = 0
+
+            if self.state == HALF_OPEN:
+                if self.probes >= self.half_open_probes:
+                    increment("circuit_rejected", self.endpoint)
+                    raise CircuitOpenError(self.endpoint)
+                self.probes += 1
+
+    def record_success(self) -> None:
+        """Record a call the endpoint answered."""
+        with self._lock:
+            self.failures = 0
+            if self.state == HALF_OPEN:
+                self.probes = 0
+                self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        """Record a call that failed because of the endpoint."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                increment("circuit_opened", self.endpoint)
+                self._set_state(OPEN)
+
+    def record_error(self, error: BaseException) -> None:
+        """Record a call that raised, counting it only if the endpoint is to blame."""
+        if is_endpoint_failure(error):
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def release(self) -> None:
+        """Give back a probe slot for a call that ended without a verdict (e.g. an abandoned stream)."""
+        with self._lock:
+            if self.state == HALF_OPEN and self.probes > 0:
+                self.probes -= 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the breaker state, and seconds until a probe is allowed when open."""
+        with self._lock:
+            retry_in = None
+            if self.state == OPEN:
+                retry_in = max(0.0, self.opened_at + self.open_interval - time.monotonic())
+            return {"state": self.state, "failures": self.failures, "retry_in": retry_in}
+
+
+_circuit_settings: Dict[str, Any] = dict(DEFAULT_CIRCUIT_SETTINGS)
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def configure_circuit_breakers(options: Optional[Dict[str, Any]] = None) -> None:
+    """Apply circuit breaker settings to every endpoint, keeping their current states."""
+    global _circuit_settings
+
+    circuit_settings = dict(DEFAULT_CIRCUIT_SETTINGS)
+    for key, value in (options or {}).items():
+        if key in circuit_settings:
+            circuit_settings[key] = value
+
+    with _breakers_lock:
+        _circuit_settings = circuit_settings
+        for breaker in _breakers.values():
+            for key, value in circuit_settings.items():
+                setattr(breaker, key, value)
+
+
+def get_circuit_breaker(endpoint: str) -> CircuitBreaker:
+    """Get (creating if needed) the circuit breaker for an endpoint."""
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = CircuitBreaker(endpoint, **_circuit_settings)
+            _breakers[endpoint] = breaker
+        return breaker
+
+
+def get_circuit_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Get the stats of every endpoint's circuit breaker."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.endpoint: breaker.get_stats() for breaker in breakers}
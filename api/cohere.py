@@ -1,8 +1,9 @@
+import math
 import os
-from typing import Dict, Any
-import cohere
+from typing import Dict, Any, Iterator
 
-from api.base import BaseProvider
+from api.base import BaseProvider, get_packing_prompt, get_reference_prompt
+from api.errors import CALLER_ERRORS
 from utils.language_utils import get_language_code
 
 
@@ -38,6 +39,7 @@ class CohereProvider(BaseProvider):
     def _get_client(self):
         """Get or create a Cohere client."""
         if not self.client and self.api_key:
+            import cohere
             self.client = cohere.Client(api_key=self.api_key)
         return self.client
     
@@ -58,6 +60,36 @@ class CohereProvider(BaseProvider):
             print(f"Cohere connection error: {str(e)}")
             return False
     
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+    
+    def _get_chat_arguments(self, text: str, model: str, source_language: str, target_language: str) -> Dict[str, Any]:
+        """Build the chat call arguments for a translation request."""
+        # Create translation prompt
+        prompt = (
+            f"Translate the following {source_language} text to {target_language}. "
+            "Provide only the translation without any additional text, comments, or explanations."
+            f"{get_packing_prompt()}{get_reference_prompt()}\n\n"
+            f"Text to translate: {text}"
+        )
+        
+        # Create chat history with system message
+        chat_history = [
+            {"role": "SYSTEM", "message": "You are a professional translator. Your task is to translate text accurately while preserving the meaning, tone, and style."}
+        ]
+        
+        return {
+            "model": model,
+            "message": prompt,
+            "chat_history": chat_history,
+            "temperature": 0.3
+        }
+    
+    def _get_request_options(self) -> Dict[str, Any]:
+        """Per-request options bounding the call by the caller's deadline."""
+        return {"timeout_in_seconds": math.ceil(self.get_request_timeout())}
+    
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using Cohere."""
         client = self._get_client()
@@ -68,26 +100,34 @@ class CohereProvider(BaseProvider):
         target_code = get_language_code(target_language)
         
         try:
-            # Create translation prompt
-            prompt = (
-                f"Translate the following {source_language} text to {target_language}. "
-                "Provide only the translation without any additional text, comments, or explanations.\n\n"
-                f"Text to translate: {text}"
-            )
-            
-            # Create chat history with system message
-            chat_history = [
-                {"role": "SYSTEM", "message": "You are a professional translator. Your task is to translate text accurately while preserving the meaning, tone, and style."}
-            ]
-            
-            response = client.chat(
-                model=model,
-                message=prompt,
-                chat_history=chat_history,
-                temperature=0.3
-            )
+            chat_arguments = self._get_chat_arguments(text, model, source_language, target_language)
+            response = self._send_request(model, text, lambda: client.chat(
+                **chat_arguments, request_options=self._get_request_options()
+            ))
             
             # Extract the translation from the response
             return response.text
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text using Cohere, yielding the translation as it is generated."""
+        client = self._get_client()
+        if not client:
+            raise ValueError("API key not set for Cohere")
+        
+        try:
+            chat_arguments = self._get_chat_arguments(text, model, source_language, target_language)
+            stream = self._stream_request(model, text, lambda: client.chat_stream(
+                **chat_arguments, request_options=self._get_request_options()
+            ))
+            
+            for event in stream:
+                if event.event_type == "text-generation":
+                    yield event.text
+        except CALLER_ERRORS:
+            raise
         except Exception as e:
-            raise Exception(f"Translation error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Translation error: {str(e)}")
@@ -0,0 +1,71 @@
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from api.errors import DeadlineExceeded
+
+
+DEFAULT_DEADLINES = {
+    "request": 120.0,   # One GUI, server or JSONL translation
+    "document": 1800.0  # One CLI file or queued document job
+}
+
+# Monotonic time by which the current translation must finish, or None. A
+# context variable, so it follows the caller into chunk and hedging pools
+# that run work in a copy of the caller's context.
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+
+def get_deadline(settings, kind: str) -> Optional[float]:
+    """Get the configured deadline in seconds for a kind of work ("request" or "document"), or None."""
+    deadlines = dict(DEFAULT_DEADLINES)
+    deadlines.update(settings.get_deadline_settings())
+    return deadlines.get(kind) or None
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]):
+    """Run the with-block under a deadline seconds from now.
+
+    A nested scope can only shorten the deadline it runs under; None leaves
+    the current deadline (if any) in place.
+    """
+    if seconds is None:
+        yield
+        return
+
+    deadline = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        deadline = min(deadline, current)
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def get_remaining() -> Optional[float]:
+    """Seconds left before the current deadline (negative once passed), or None without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check_deadline(label: str = "") -> None:
+    """Raise DeadlineExceeded if the current deadline has passed."""
+    remaining = get_remaining()
+    if remaining is not None and remaining <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded{' calling ' + label if label else ''}")
+
+
+def bound_timeouts(connect_timeout: float, read_timeout: float) -> Tuple[float, float]:
+    """Cap a (connect, read) timeout pair by the time left before the deadline."""
+    remaining = get_remaining()
+    if remaining is None:
+        return connect_timeout, read_timeout
+    if remaining <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    return min(connect_timeout, remaining), min(read_timeout, remaining)
@@ -0,0 +1,118 @@
+import email.utils
+import time
+from typing import Iterator, Optional
+
+
+class ProviderHTTPError(Exception):
+    """An API returned an unsuccessful HTTP status."""
+
+    def __init__(self, status_code: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"Error from API: Status code {status_code}, {message}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """A call was refused without being sent because its endpoint's circuit breaker is open."""
+
+    def __init__(self, endpoint: str, retry_after: Optional[float] = None):
+        message = f"{endpoint} is unavailable, failing fast (circuit open)"
+        if retry_after:
+            message += f"; next attempt in {retry_after:.0f}s"
+        super().__init__(message)
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(Exception):
+    """The caller's deadline passed before the call could finish."""
+
+
+class TranslationCancelled(Exception):
+    """The translation was cancelled by its caller (or superseded by a newer one)."""
+
+
+# Errors meaning the caller stopped the call. Providers raise them as they
+# are instead of wrapping them in a "Translation error".
+CALLER_ERRORS = (DeadlineExceeded, TranslationCancelled)
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def raise_for_status(response):
+    """Raise ProviderHTTPError for a non-200 response, otherwise return it."""
+    if response.status_code != 200:
+        raise ProviderHTTPError(
+            response.status_code,
+            response.text,
+            retry_after=parse_retry_after(response.headers.get("Retry-After"))
+        )
+    return response
+
+
+def iter_error_chain(error: BaseException) -> Iterator[BaseException]:
+    """Yield an error and the errors it was raised from or during."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def is_deadline_exceeded(error: BaseException) -> bool:
+    """Check whether an error, or one it was raised from, is a DeadlineExceeded."""
+    return any(isinstance(current, DeadlineExceeded) for current in iter_error_chain(error))
+
+
+def is_cancellation(error: BaseException) -> bool:
+    """Check whether an error, or one it was raised from, is a TranslationCancelled."""
+    return any(isinstance(current, TranslationCancelled) for current in iter_error_chain(error))
+
+
+def get_caller_error(error: BaseException) -> Optional[BaseException]:
+    """Find the DeadlineExceeded or TranslationCancelled behind an error, if any."""
+    for current in iter_error_chain(error):
+        if isinstance(current, CALLER_ERRORS):
+            return current
+    return None
+
+
+def get_status_code(error: BaseException) -> Optional[int]:
+    """Find the HTTP status code behind an error raised by an SDK or the transport."""
+    for current in iter_error_chain(error):
+        for candidate in (
+            getattr(current, "status_code", None),
+            getattr(getattr(current, "response", None), "status_code", None),
+            getattr(current, "code", None),  # google.api_core exceptions
+        ):
+            if isinstance(candidate, int):
+                return candidate
+    return None
+
+
+def get_retry_after(error: BaseException) -> Optional[float]:
+    """Find a Retry-After delay (in seconds) carried by an error, if any."""
+    for current in iter_error_chain(error):
+        retry_after = getattr(current, "retry_after", None)
+        if retry_after is not None:
+            return retry_after
+
+        headers = getattr(getattr(current, "response", None), "headers", None)
+        if headers is not None:
+            retry_after = parse_retry_after(headers.get("retry-after"))
+            if retry_after is not None:
+                return retry_after
+    return None
@@ -1,8 +1,8 @@
 import os
-from typing import Dict, Any
-from openai import OpenAI
+from typing import Dict, Any, List, Iterator
 
-from api.base import BaseProvider
+from api.base import BaseProvider, get_packing_prompt, get_reference_prompt
+from api.errors import CALLER_ERRORS
 from utils.language_utils import get_language_code
 
 
@@ -39,9 +39,12 @@ class FeatherlessProvider(BaseProvider):
     def _get_client(self):
         """Get or create a Featherless client."""
         if not self.client and self.api_key:
+            from openai import OpenAI
+            # Retries are handled by our own retry policy in BaseProvider
             self.client = OpenAI(
                 api_key=self.api_key,
-                base_url=self.base_url
+                base_url=self.base_url,
+                max_retries=0
             )
         return self.client
     
@@ -66,6 +69,25 @@ class FeatherlessProvider(BaseProvider):
             print(f"Featherless connection error: {str(e)}")
             return False
     
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+    
+    def _get_messages(self, text: str, source_language: str, target_language: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a translation request."""
+        # Create system and user messages
+        system_message = (
+            f"You are a professional translator from {source_language} to {target_language}. "
+            "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
+            "Only provide the translation, with no additional comments or explanations."
+        )
+        system_message += get_packing_prompt() + get_reference_prompt()
+        
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": text}
+        ]
+    
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using Featherless AI."""
         client = self._get_client()
@@ -76,23 +98,39 @@ class FeatherlessProvider(BaseProvider):
         target_code = get_language_code(target_language)
         
         try:
-            # Create system and user messages
-            system_message = (
-                f"You are a professional translator from {source_language} to {target_language}. "
-                "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
-                "Only provide the translation, with no additional comments or explanations."
-            )
-            
-            response = client.chat.completions.create(
+            response = self._send_request(model, text, lambda: client.chat.completions.create(
                 model=model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": text}
-                ],
-                temperature=0.3
-            )
+                messages=self._get_messages(text, source_language, target_language),
+                temperature=0.3,
+                timeout=self.get_request_timeout()
+            ))
             
             # Extract the translation from the response
             return response.choices[0].message.content
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text using Featherless AI, yielding the translation as it is generated."""
+        client = self._get_client()
+        if not client:
+            raise ValueError("API key not set for Featherless")
+        
+        try:
+            stream = self._stream_request(model, text, lambda: client.chat.completions.create(
+                model=model,
+                messages=self._get_messages(text, source_language, target_language),
+                temperature=0.3,
+                stream=True,
+                timeout=self.get_request_timeout()
+            ))
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except CALLER_ERRORS:
+            raise
         except Exception as e:
             raise Exception(f"Translation error: {str(e)}")
@@ -1,9 +1,8 @@
 import os
-from typing import Dict, Any
-import google.generativeai as genai
-from google.generativeai import types
+from typing import Dict, Any, Iterator
 
-from api.base import BaseProvider
+from api.base import BaseProvider, get_packing_prompt, get_reference_prompt
+from api.errors import CALLER_ERRORS
 from utils.language_utils import get_language_code
 
 
@@ -42,6 +41,7 @@ class GoogleAIStudioProvider(BaseProvider):
         
         # Configure the Google AI Studio client
         if api_key:
+            import google.generativeai as genai
             genai.configure(api_key=api_key)
             self.client = genai
         else:
@@ -50,6 +50,7 @@ class GoogleAIStudioProvider(BaseProvider):
     def _get_client(self):
         """Get or create a Google client."""
         if not self.client and self.api_key:
+            import google.generativeai as genai
             genai.configure(api_key=self.api_key)
             self.client = genai
         return self.client
@@ -68,6 +69,19 @@ class GoogleAIStudioProvider(BaseProvider):
             print(f"AI Studio connection error: {str(e)}")
             return False
     
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+    
+    def _get_prompt(self, text: str, source_language: str, target_language: str) -> str:
+        """Build the prompt for a translation request."""
+        return (
+            f"Translate the following {source_language} text into {target_language}."
+            f"{get_packing_prompt()}{get_reference_prompt()}\n\n"
+            f"Text to translate: {text}\n\n"
+            "Only provide the translation, with no additional comments or explanations."
+        )
+    
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using Google AI Studio."""
         client = self._get_client()
@@ -81,15 +95,11 @@ class GoogleAIStudioProvider(BaseProvider):
             # Create model instance
             model_instance = client.GenerativeModel(model)
             
-            # Create translation prompt
-            prompt = (
-                f"Translate the following {source_language} text into {target_language}.\n\n"
-                f"Text to translate: {text}\n\n"
-                "Only provide the translation, with no additional comments or explanations."
-            )
-            
             # Generate content
-            response = model_instance.generate_content(prompt)
+            response = self._send_request(model, text, lambda: model_instance.generate_content(
+                self._get_prompt(text, source_language, target_language),
+                request_options={"timeout": self.get_request_timeout()}
+            ))
             
             # Extract and return the translation
             if hasattr(response, 'text'):
@@ -99,5 +109,29 @@ class GoogleAIStudioProvider(BaseProvider):
             else:
                 # Extract from other response formats if needed
                 return str(response)
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text using Google AI Studio, yielding the translation as it is generated."""
+        client = self._get_client()
+        if not client:
+            raise ValueError("API key not set for Google AI Studio")
+        
+        try:
+            model_instance = client.GenerativeModel(model)
+            response = self._stream_request(model, text, lambda: model_instance.generate_content(
+                self._get_prompt(text, source_language, target_language),
+                stream=True,
+                request_options={"timeout": self.get_request_timeout()}
+            ))
+            
+            for chunk in response:
+                if chunk.text:
+                    yield chunk.text
+        except CALLER_ERRORS:
+            raise
         except Exception as e:
-            raise Exception(f"Translation error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Translation error: {str(e)}")
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+from api.metrics import set_gauge
+
+
+class BackendHealth:
+    """Exponentially weighted latency, error rate and throughput of one provider/model.
+
+    Latency is measured around the whole call, including rate limiter waits
+    and retries, so a backend that is queueing or retrying looks as slow as
+    it really is to callers. The latencies of recent successful calls are
+    kept as well, for percentiles.
+    """
+
+    def __init__(self, label: str, alpha: float = 0.2):
+        self.label = label
+        self.alpha = alpha
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.throughput: Optional[float] = None
+        self.requests = 0
+        self.last_failure: Optional[float] = None
+        self._recent: deque = deque(maxlen=256)
+        self._lock = threading.Lock()
+
+    def _average(self, current: Optional[float], value: float) -> float:
+        if current is None:
+            return value
+        return current + self.alpha * (value - current)
+
+    def record_success(self, seconds: float, tokens: int) -> None:
+        """Record a call that returned a translation."""
+        with self._lock:
+            self.requests += 1
+            self.latency = self._average(self.latency, seconds)
+            self._recent.append(seconds)
+            self.error_rate = self._average(self.error_rate, 0.0)
+            if seconds > 0:
+                self.throughput = self._average(self.throughput, tokens / seconds)
+            self._publish()
+
+    def record_failure(self, seconds: float) -> None:
+        """Record a call that failed after its retries."""
+        with self._lock:
+            self.requests += 1
+            # A fast failure must not make the backend look faster
+            self.latency = self._average(self.latency, max(seconds, self.latency or 0.0))
+            self.error_rate = self._average(self.error_rate, 1.0)
+            self.last_failure = time.monotonic()
+            self._publish()
+
+    def _publish(self) -> None:
+        set_gauge("latency_ewma", self.label, round(self.latency, 4))
+        set_gauge("error_rate_ewma", self.label, round(self.error_rate, 4))
+        if self.throughput is not None:
+            set_gauge("throughput_ewma", self.label, round(self.throughput, 2))
+
+    def get_latency_percentile(self, percentile: float, min_samples: int = 1) -> Optional[float]:
+        """Latency percentile of recent successful calls, or None with fewer than min_samples."""
+        with self._lock:
+            samples = sorted(self._recent)
+        if not samples or len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percentile / 100))]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current averages and sample count."""
+        with self._lock:
+            return {
+                "latency": self.latency,
+                "error_rate": self.error_rate,
+                "throughput": self.throughput,
+                "requests": self.requests,
+                "last_failure": self.last_failure
+            }
+
+
+# Health of every provider/model that has been called, keyed by "provider/model"
+_health: Dict[str, BackendHealth] = {}
+_health_lock = threading.Lock()
+_alpha = 0.2
+
+
+def configure_health(alpha: float = 0.2) -> None:
+    """Set the weight of the newest sample in every health average."""
+    global _alpha
+    with _health_lock:
+        _alpha = alpha
+        for health in _health.values():
+            health.alpha = alpha
+
+
+def get_backend_health(provider_name: str, model: Optional[str]) -> BackendHealth:
+    """Get (creating if needed) the health tracker for a provider/model."""
+    label = f"{provider_name}/{model or ''}"
+    with _health_lock:
+        health = _health.get(label)
+        if health is None:
+            health = BackendHealth(label, _alpha)
+            _health[label] = health
+        return health
+
+
+def get_health_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Get the stats of every tracked provider/model."""
+    with _health_lock:
+        trackers = list(_health.values())
+    return {health.label: health.get_stats() for health in trackers}
@@ -0,0 +1,244 @@
+import contextvars
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from api.cancellation import CancelToken, cancellation_scope, check_cancelled, get_cancel_token
+from api.health import get_backend_health
+from api.metrics import increment
+
+
+# A call to hedge: (provider, model, function making the call)
+Attempt = Tuple[str, str, Callable[[], Any]]
+
+DEFAULT_HEDGING_SETTINGS = {
+    "enabled": False,
+    "percentile": 95,
+    "min_delay": 0.25,
+    "min_samples": 20,
+    "budget": 0.05,
+    "alternates": {}
+}
+
+# Prefix of the threads running hedged calls; calls made from them are
+# never hedged again
+_THREAD_PREFIX = "hedge"
+_thread_numbers = itertools.count(1)
+
+
+def _run(future: Future, token: CancelToken, fn: Callable, args) -> None:
+    with cancellation_scope(token):
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+
+def _start(token: CancelToken, fn: Callable, *args) -> Future:
+    """Run fn on a thread of its own under its own cancellation token, in a copy of the caller's context.
+
+    Each call gets a new thread rather than a pooled one, so hedged calls
+    never queue behind each other (which would eat into the hedge delay)
+    and are only limited by the providers' own concurrency limits.
+    """
+    future: Future = Future()
+    future.set_running_or_notify_cancel()
+    # The copied context carries reference translations and the deadline over to the thread
+    context = contextvars.copy_context()
+    threading.Thread(
+        target=context.run, args=(_run, future, token, fn, args),
+        name=f"{_THREAD_PREFIX}-{next(_thread_numbers)}", daemon=True
+    ).start()
+    return future
+
+
+class HedgeBudget:
+    """Caps hedges at a share of requests.
+
+    Every hedgeable request earns ratio credits (up to burst) and every hedge
+    spends one, so over time at most ratio extra requests are sent per request.
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.credits = 0.0
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """Earn credits for one hedgeable request."""
+        with self._lock:
+            self.credits = min(self.burst, self.credits + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Spend the credit for one hedge; False if the budget is used up."""
+        with self._lock:
+            if self.credits < 1.0:
+                return False
+            self.credits -= 1.0
+            return True
+
+
+class Hedger:
+    """Sends a duplicate of a slow request to a second backend.
+
+    The first call runs alone until it has taken longer than the configured
+    percentile of its backend's recent latencies; then, if the budget allows,
+    the same request goes to the second backend and whichever succeeds first
+    wins. The loser is cancelled: a stream is closed at once, and a request
+    already waiting on the network is dropped and stops before any retry.
+    Backends with fewer than min_samples successful calls are not hedged.
+    """
+
+    def __init__(self, options: Optional[Dict[str, Any]] = None):
+        self.options = dict(DEFAULT_HEDGING_SETTINGS)
+        self.options.update(options or {})
+        self.budget = HedgeBudget(self.options["budget"])
+
+    def get_alternate(self, provider_name: str, model: str) -> Optional[Tuple[str, str]]:
+        """Get the configured (provider, model) to hedge a provider/model with, if any."""
+        alternate = self.options["alternates"].get(f"{provider_name}/{model}")
+        return (alternate[0], alternate[1]) if alternate else None
+
+    def get_delay(self, provider_name: str, model: str) -> Optional[float]:
+        """Seconds to wait before hedging a call, or None if it should not be hedged."""
+        if not self.options["enabled"] or threading.current_thread().name.startswith(_THREAD_PREFIX):
+            return None
+        latency = get_backend_health(provider_name, model).get_latency_percentile(
+            self.options["percentile"], self.options["min_samples"]
+        )
+        if latency is None:
+            return None
+        return max(self.options["min_delay"], latency)
+
+    def call(self, primary: Attempt, secondary: Optional[Attempt]) -> Any:
+        """Make the primary call, hedging it with the secondary one if it is slow."""
+        provider_name, model, primary_fn = primary
+        delay = self.get_delay(provider_name, model) if secondary is not None else None
+        if delay is None:
+            return primary_fn()
+
+        self.budget.record_request()
+        # Each call gets a child token, cancelled with the caller's or on losing
+        parent = get_cancel_token()
+        first_token, second_token = CancelToken(parent), CancelToken(parent)
+        try:
+            first = _start(first_token, primary_fn)
+            done, _ = wait([first], timeout=delay)
+            if done or not self.budget.try_spend():
+                return first.result()
+
+            secondary_name, secondary_model, secondary_fn = secondary
+            increment("hedges_sent", f"{secondary_name}/{secondary_model}")
+            second = _start(second_token, secondary_fn)
+            tokens = {first: first_token, second: second_token}
+            pending = {first, second}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        for loser in pending:
+                            tokens[loser].cancel()
+                        if future is second:
+                            increment("hedges_won", f"{secondary_name}/{secondary_model}")
+                        return future.result()
+            # Both failed; report the primary's error
+            return first.result()
+        finally:
+            first_token.detach()
+            second_token.detach()
+
+    def stream(self, primary: Attempt, secondary: Optional[Attempt]) -> Iterator[str]:
+        """Stream from the primary call, hedging with the secondary one if no piece arrives in time.
+
+        The race is decided by the first piece: the other stream is closed
+        and only the winner's pieces are yielded. The delay is a percentile
+        of whole-call latency, so streams are hedged conservatively.
+        """
+        provider_name, model, primary_fn = primary
+        delay = self.get_delay(provider_name, model) if secondary is not None else None
+        if delay is None:
+            yield from primary_fn()
+            return
+
+        self.budget.record_request()
+        events: queue.Queue = queue.Queue()
+        parent = get_cancel_token()
+        tokens = [CancelToken(parent), CancelToken(parent)]
+
+        def pump(index: int, stream_fn: Callable[[], Iterator[str]]) -> None:
+            try:
+                for piece in stream_fn():
+                    # Raising leaves the loop, which closes the stream, and
+                    # tells the reader in case it is waiting on this stream
+                    check_cancelled()
+                    events.put((index, "piece", piece))
+                events.put((index, "done", None))
+            except Exception as e:
+                events.put((index, "error", e))
+
+        _start(tokens[0], pump, 0, primary_fn)
+        hedge_at: Optional[float] = time.monotonic() + delay
+        started = 1
+        winner: Optional[int] = None
+        errors: Dict[int, Exception] = {}
+        try:
+            while True:
+                timeout = max(0.0, hedge_at - time.monotonic()) if hedge_at is not None else None
+                try:
+                    index, kind, value = events.get(timeout=timeout)
+                except queue.Empty:
+                    hedge_at = None
+                    if self.budget.try_spend():
+                        secondary_name, secondary_model, secondary_fn = secondary
+                        increment("hedges_sent", f"{secondary_name}/{secondary_model}")
+                        _start(tokens[1], pump, 1, secondary_fn)
+                        started = 2
+                    continue
+
+                if winner is None:
+                    if kind == "error":
+                        errors[index] = value
+                        if hedge_at is not None or len(errors) == started:
+                            # Failed before a hedge was due, or every stream failed
+                            raise errors.get(0, value)
+                        continue
+                    winner = index
+                    hedge_at = None
+                    tokens[1 - index].cancel()
+                    if index == 1:
+                        increment("hedges_won", f"{secondary[0]}/{secondary[1]}")
+
+                if index != winner:
+                    continue
+                if kind == "piece":
+                    yield value
+                elif kind == "done":
+                    return
+                else:
+                    raise value
+        finally:
+            # Also closes both streams when the caller stops reading early
+            for token in tokens:
+                token.cancel()
+                token.detach()
+
+
+_hedger = Hedger()
+_hedger_lock = threading.Lock()
+
+
+def configure_hedging(options: Optional[Dict[str, Any]] = None) -> None:
+    """Replace the shared hedger with one using the given settings."""
+    global _hedger
+    with _hedger_lock:
+        _hedger = Hedger(options)
+
+
+def get_hedger() -> Hedger:
+    """Get the shared hedger."""
+    with _hedger_lock:
+        return _hedger
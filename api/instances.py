@@ -0,0 +1,65 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from api.base import BaseProvider, get_provider_class
+
+
+# Configured provider instances, keyed by (provider, API key, additional fields).
+# Each instance keeps its SDK client (and that client's connection pool) alive
+# between translations, so only the first request pays for client construction
+# and the TLS handshake.
+_instances: Dict[Tuple, BaseProvider] = {}
+_instances_lock = threading.Lock()
+
+
+def _make_key(provider_name: str, api_key: str, additional_fields: Dict[str, str]) -> Tuple:
+    """Build the registry key for a provider configuration."""
+    return (provider_name, api_key, tuple(sorted(additional_fields.items())))
+
+
+def _configure_instance(provider_name: str, api_key: str, additional_fields: Dict[str, str]) -> BaseProvider:
+    """Create a provider instance and apply the API key and additional fields."""
+    provider_instance = get_provider_class(provider_name)()
+    provider_instance.set_api_key(api_key)
+
+    for field_name, field_value in additional_fields.items():
+        if hasattr(provider_instance, f"set_{field_name}"):
+            getattr(provider_instance, f"set_{field_name}")(field_value)
+
+    return provider_instance
+
+
+def get_provider_instance(provider_name: str, api_key: str,
+                          additional_fields: Optional[Dict[str, str]] = None) -> BaseProvider:
+    """Get a configured provider instance, reusing a warm one if available."""
+    additional_fields = additional_fields or {}
+    key = _make_key(provider_name, api_key, additional_fields)
+
+    with _instances_lock:
+        provider_instance = _instances.get(key)
+        if provider_instance is None:
+            provider_instance = _configure_instance(provider_name, api_key, additional_fields)
+            _instances[key] = provider_instance
+        return provider_instance
+
+
+def get_configured_provider(provider_name: str, settings) -> BaseProvider:
+    """Get a provider instance configured from the credentials stored in settings."""
+    api_key = settings.get_api_key(provider_name)
+
+    additional_fields = {}
+    for field_name in get_provider_class(provider_name).get_additional_fields().keys():
+        additional_fields[field_name] = settings.get_api_field(provider_name, field_name)
+
+    return get_provider_instance(provider_name, api_key, additional_fields)
+
+
+def invalidate_provider_instances(provider_name: Optional[str] = None) -> None:
+    """Drop cached instances for a provider, or for all providers if none is given."""
+    with _instances_lock:
+        if provider_name is None:
+            _instances.clear()
+            return
+
+        for key in [key for key in _instances if key[0] == provider_name]:
+            del _instances[key]
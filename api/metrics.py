@@ -0,0 +1,37 @@
+import threading
+from typing import Dict
+
+
+# Process-wide counters and gauges, keyed by metric name and then by label
+# (usually "provider/model"). Read by the status bar, CLI and server.
+_counters: Dict[str, Dict[str, float]] = {}
+_gauges: Dict[str, Dict[str, float]] = {}
+_metrics_lock = threading.Lock()
+
+
+def increment(name: str, label: str = "", amount: float = 1) -> None:
+    """Add to a counter."""
+    with _metrics_lock:
+        values = _counters.setdefault(name, {})
+        values[label] = values.get(label, 0) + amount
+
+
+def set_gauge(name: str, label: str, value: float) -> None:
+    """Set a gauge to its current value."""
+    with _metrics_lock:
+        _gauges.setdefault(name, {})[label] = value
+
+
+def get_metrics() -> Dict[str, Dict[str, float]]:
+    """Get a snapshot of all counters and gauges."""
+    with _metrics_lock:
+        snapshot = {name: dict(values) for name, values in _counters.items()}
+        snapshot.update({name: dict(values) for name, values in _gauges.items()})
+        return snapshot
+
+
+def reset_metrics() -> None:
+    """Clear all counters and gauges."""
+    with _metrics_lock:
+        _counters.clear()
+        _gauges.clear()
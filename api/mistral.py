@@ -1,8 +1,8 @@
 import os
-from typing import Dict, Any
-from mistralai import Mistral
+from typing import Dict, Any, List, Iterator
 
-from api.base import BaseProvider
+from api.base import BaseProvider, get_packing_prompt, get_reference_prompt
+from api.errors import CALLER_ERRORS
 from utils.language_utils import get_language_code
 
 
@@ -38,6 +38,7 @@ class MistralProvider(BaseProvider):
     def _get_client(self):
         """Get or create a Mistral client."""
         if not self.client and self.api_key:
+            from mistralai import Mistral
             self.client = Mistral(api_key=self.api_key)
         return self.client
     
@@ -59,6 +60,25 @@ class MistralProvider(BaseProvider):
             print(f"Mistral connection error: {str(e)}")
             return False
     
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+    
+    def _get_messages(self, text: str, source_language: str, target_language: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a translation request."""
+        # Create system and user messages
+        system_message = (
+            f"You are a professional translator from {source_language} to {target_language}. "
+            "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
+            "Only provide the translation, with no additional comments or explanations."
+        )
+        system_message += get_packing_prompt() + get_reference_prompt()
+        
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": text}
+        ]
+    
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using Mistral AI."""
         client = self._get_client()
@@ -69,23 +89,39 @@ class MistralProvider(BaseProvider):
         target_code = get_language_code(target_language)
         
         try:
-            # Create system and user messages
-            system_message = (
-                f"You are a professional translator from {source_language} to {target_language}. "
-                "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
-                "Only provide the translation, with no additional comments or explanations."
-            )
-            
-            response = client.chat.complete(
+            response = self._send_request(model, text, lambda: client.chat.complete(
                 model=model,
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": text}
-                ],
-                temperature=0.3
-            )
+                messages=self._get_messages(text, source_language, target_language),
+                temperature=0.3,
+                timeout_ms=int(self.get_request_timeout() * 1000)
+            ))
             
             # Extract the translation from the response
             return response.choices[0].message.content
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text using Mistral AI, yielding the translation as it is generated."""
+        client = self._get_client()
+        if not client:
+            raise ValueError("API key not set for Mistral")
+        
+        try:
+            stream = self._stream_request(model, text, lambda: client.chat.stream(
+                model=model,
+                messages=self._get_messages(text, source_language, target_language),
+                temperature=0.3,
+                timeout_ms=int(self.get_request_timeout() * 1000)
+            ))
+            
+            for event in stream:
+                choices = event.data.choices
+                if choices and choices[0].delta.content:
+                    yield choices[0].delta.content
+        except CALLER_ERRORS:
+            raise
         except Exception as e:
-            raise Exception(f"Translation error: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Translation error: {str(e)}")
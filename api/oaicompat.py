@@ -1,13 +1,20 @@
 import os
 import json
-import requests
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Iterator
 
-from api.base import BaseProvider
+from api.base import BaseProvider, get_packing_prompt, get_reference_prompt
+from api.errors import CALLER_ERRORS, get_status_code, raise_for_status
+from api.retry import RETRYABLE_STATUS_CODES
+from api.transport import get_transport, iter_sse_events
 from utils.language_utils import get_language_code
 from utils.model_info import get_model_display_name as get_display_name
 
 
+# Statuses meaning the server does not offer an endpoint, so the legacy
+# completions endpoint is tried instead
+ENDPOINT_UNSUPPORTED_STATUS_CODES = (404, 405, 501)
+
+
 class OAICompatibleProvider(BaseProvider):
     """Provider for OpenAI-compatible APIs like KoboldAI, LMStudio, etc."""
     
@@ -16,6 +23,11 @@ class OAICompatibleProvider(BaseProvider):
         self.api_key = os.environ.get("KOBOLD_API_KEY", "")
         self.available_models = []
     
+    @classmethod
+    def get_name(cls) -> str:
+        """Override to return the exact name as expected in model_info.py"""
+        return "OpenAI Compatible"
+    
     @classmethod
     def get_api_description(cls) -> str:
         return (
@@ -60,6 +72,10 @@ class OAICompatibleProvider(BaseProvider):
         self.api_url = api_url
         os.environ["KOBOLD_API_URL"] = api_url
     
+    def get_endpoint(self) -> str:
+        """Include the server URL, so each local or remote server has its own circuit breaker."""
+        return f"{self.get_name()} ({self.api_url})"
+    
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests, including API key if available."""
         headers = {"Content-Type": "application/json"}
@@ -67,11 +83,24 @@ class OAICompatibleProvider(BaseProvider):
             headers["Authorization"] = f"Bearer {self.api_key}"
         return headers
     
+    def _post(self, url: str, payload: Dict[str, Any], allow_unsupported: bool = False):
+        """POST a request, raising on errors so the call policies retry them and count them.
+        
+        With allow_unsupported, a response saying the endpoint does not exist
+        is returned instead, so the caller can fall back to another one.
+        """
+        response = get_transport().post(url, json=payload, headers=self._get_headers())
+        if response.status_code == 200:
+            return response
+        if allow_unsupported and response.status_code in ENDPOINT_UNSUPPORTED_STATUS_CODES:
+            return response
+        raise_for_status(response)
+    
     def _fetch_available_models(self) -> List[Dict[str, Any]]:
         """Fetch available models from the API."""
         try:
             url = f"{self.api_url}/v1/models"
-            response = requests.get(url, headers=self._get_headers())
+            response = get_transport().get(url, headers=self._get_headers())
             
             if response.status_code == 200:
                 data = response.json()
@@ -116,6 +145,26 @@ class OAICompatibleProvider(BaseProvider):
             print(f"Connection error: {str(e)}")
             return False
     
+    @classmethod
+    def get_max_chunk_tokens(cls, model: str) -> int:
+        # Translate requests are capped at max_tokens=1024; leave room for translations longer than the source
+        return 600
+    
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+    
+    def _get_prompt(self, text: str, source_language: str, target_language: str) -> str:
+        """Build the instruction prompt for a translation request."""
+        return (
+            f"### Instruction:\n"
+            f"Translate the following {source_language} text to {target_language}. "
+            "Only provide the translation, with no additional comments or explanations."
+            f"{get_packing_prompt()}{get_reference_prompt()}\n\n"
+            f"### Input:\n{text}\n\n"
+            "### Response:"
+        )
+    
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using the OpenAI-compatible API."""
         if not self.api_url:
@@ -129,13 +178,7 @@ class OAICompatibleProvider(BaseProvider):
             model_id = self._get_model_id(model)
             
             # Create a translation prompt
-            prompt = (
-                f"### Instruction:\n"
-                f"Translate the following {source_language} text to {target_language}. "
-                "Only provide the translation, with no additional comments or explanations.\n\n"
-                f"### Input:\n{text}\n\n"
-                "### Response:"
-            )
+            prompt = self._get_prompt(text, source_language, target_language)
             
             # Prepare the request using OpenAI-compatible format
             payload = {
@@ -151,7 +194,7 @@ class OAICompatibleProvider(BaseProvider):
             
             # Send the request with headers that may include the API key
             url = f"{self.api_url}/v1/chat/completions"
-            response = requests.post(url, json=payload, headers=self._get_headers())
+            response = self._send_request(model, text, lambda: self._post(url, payload, allow_unsupported=True))
             
             # Check if the request was successful
             if response.status_code == 200:
@@ -163,7 +206,7 @@ class OAICompatibleProvider(BaseProvider):
                 else:
                     raise Exception("No response content received")
             else:
-                # If chat completions fails, try the legacy completions endpoint
+                # Without chat completions, try the legacy completions endpoint
                 payload = {
                     "model": model_id,
                     "prompt": prompt,
@@ -174,14 +217,61 @@ class OAICompatibleProvider(BaseProvider):
                 }
                 
                 url = f"{self.api_url}/v1/completions"
-                response = requests.post(url, json=payload, headers=self._get_headers())
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if "choices" in data and len(data["choices"]) > 0:
-                        generated_text = data["choices"][0]["text"]
-                        return generated_text.strip()
+                response = self._send_request(model, text, lambda: self._post(url, payload))
                 
-                raise Exception(f"Error from API: Status code {response.status_code}, {response.text}")
+                data = response.json()
+                if "choices" in data and len(data["choices"]) > 0:
+                    generated_text = data["choices"][0]["text"]
+                    return generated_text.strip()
+                raise Exception("No response content received")
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text using the OpenAI-compatible API, yielding tokens as they arrive."""
+        if not self.api_url:
+            raise ValueError("API URL not set")
+        
+        streamed_any = False
+        try:
+            payload = {
+                "model": self._get_model_id(model),
+                "messages": [
+                    {"role": "user", "content": self._get_prompt(text, source_language, target_language)}
+                ],
+                "temperature": 0.7,
+                "max_tokens": 1024,
+                "top_p": 0.9,
+                "stop": ["###"],
+                "stream": True
+            }
+            
+            url = f"{self.api_url}/v1/chat/completions"
+            lines = self._stream_request(
+                model, text,
+                lambda: get_transport().stream_lines("POST", url, json=payload, headers=self._get_headers())
+            )
+            for event in iter_sse_events(lines):
+                choices = event.get("choices") or []
+                delta = choices[0].get("delta", {}).get("content") if choices else None
+                if delta:
+                    # Drop leading whitespace like the non-streaming path's strip()
+                    if not streamed_any:
+                        delta = delta.lstrip()
+                        if not delta:
+                            continue
+                    streamed_any = True
+                    yield delta
+        except CALLER_ERRORS:
+            raise
         except Exception as e:
-            raise Exception(f"Translation error: {str(e)}")
\ No newline at end of file
+            if streamed_any or get_status_code(e) in RETRYABLE_STATUS_CODES:
+                raise Exception(f"Translation error: {str(e)}")
+            print(f"Streaming unavailable, falling back to a blocking request: {str(e)}")
+        
+        # Servers without streaming support get a blocking call instead,
+        # which also tries the legacy completions endpoint
+        if not streamed_any:
+            yield self.translate(text, model, source_language, target_language)
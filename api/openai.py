@@ -1,8 +1,8 @@
 import os
-from openai import OpenAI
-from typing import Dict, Any
+from typing import Dict, Any, List, Iterator
 
-from api.base import BaseProvider
+from api.base import BaseProvider, get_packing_prompt, get_reference_prompt
+from api.errors import CALLER_ERRORS
 from utils.language_utils import get_language_code
 
 
@@ -51,7 +51,9 @@ class OpenAIProvider(BaseProvider):
     def _get_client(self):
         """Get or create an OpenAI client."""
         if not self.client and self.api_key:
-            self.client = OpenAI(api_key=self.api_key)
+            from openai import OpenAI
+            # Retries are handled by our own retry policy in BaseProvider
+            self.client = OpenAI(api_key=self.api_key, max_retries=0)
         return self.client
     
     def test_connection(self) -> bool:
@@ -72,6 +74,25 @@ class OpenAIProvider(BaseProvider):
             print(f"OpenAI connection error: {str(e)}")
             return False
     
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+    
+    def _get_messages(self, text: str, source_language: str, target_language: str) -> List[Dict[str, str]]:
+        """Build the chat messages for a translation request."""
+        # Use system prompt for better translation
+        system_prompt = (
+            f"You are a professional translator from {source_language} to {target_language}. "
+            "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
+            "Only provide the translation, with no additional comments or explanations."
+        )
+        system_prompt += get_packing_prompt() + get_reference_prompt()
+        
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": text}
+        ]
+    
     def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
         """Translate text using OpenAI."""
         client = self._get_client()
@@ -82,23 +103,39 @@ class OpenAIProvider(BaseProvider):
         target_code = get_language_code(target_language)
         
         try:
-            # Use system prompt for better translation
-            system_prompt = (
-                f"You are a professional translator from {source_language} to {target_language}. "
-                "Translate the following text accurately, preserving the meaning, tone, and style of the original. "
-                "Only provide the translation, with no additional comments or explanations."
-            )
-            
-            response = client.chat.completions.create(
+            response = self._send_request(model, text, lambda: client.chat.completions.create(
                 model=model,
                 temperature=0.3,  # Lower temperature for more precise translation
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": text}
-                ]
-            )
+                messages=self._get_messages(text, source_language, target_language),
+                timeout=self.get_request_timeout()
+            ))
             
             # Extract the translation from the response
             return response.choices[0].message.content
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+    
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text using OpenAI, yielding the translation as it is generated."""
+        client = self._get_client()
+        if not client:
+            raise ValueError("API key not set for OpenAI")
+        
+        try:
+            stream = self._stream_request(model, text, lambda: client.chat.completions.create(
+                model=model,
+                temperature=0.3,
+                messages=self._get_messages(text, source_language, target_language),
+                stream=True,
+                timeout=self.get_request_timeout()
+            ))
+            
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except CALLER_ERRORS:
+            raise
         except Exception as e:
             raise Exception(f"Translation error: {str(e)}")
@@ -0,0 +1,190 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional, Tuple
+
+from api.cancellation import check_cancelled, on_cancel
+from api.deadline import check_deadline, get_remaining
+from api.errors import get_status_code, get_retry_after
+
+
+# Status codes that mean "slow down"
+THROTTLE_STATUS_CODES = (429, 503)
+
+# Defaults applied to every provider unless overridden in settings
+DEFAULT_RATE_LIMIT = {
+    "requests_per_minute": None,  # None means no request budget
+    "tokens_per_minute": None,    # None means no token budget
+    "max_concurrency": 8,
+    "min_concurrency": 1
+}
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at capacity per minute."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        """Add the tokens accrued since the last refill."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until amount tokens are available (0 if they are now)."""
+        # Requests larger than the bucket only wait for a full bucket
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Rate limiter for one provider (or provider/model) with adaptive concurrency.
+
+    Requests-per-minute and tokens-per-minute budgets are enforced with token
+    buckets. The number of requests in flight is controlled with AIMD:
+    each success raises the limit by roughly one per window, and a 429/503
+    halves it and pauses new requests for the Retry-After delay.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 max_concurrency: int = 8, min_concurrency: int = 1):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self.throttled_count = 0
+
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._blocked_until = 0.0
+        self._condition = threading.Condition()
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        """Seconds to wait before a request can start (0 if it can start now)."""
+        wait = max(0.0, self._blocked_until - now)
+        if self._request_bucket is not None:
+            self._request_bucket.refill(now)
+            wait = max(wait, self._request_bucket.wait_time(1))
+        if self._token_bucket is not None:
+            self._token_bucket.refill(now)
+            wait = max(wait, self._token_bucket.wait_time(tokens))
+        return wait
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Block until a request of the given token size may be sent.
+
+        Raises DeadlineExceeded if the caller's deadline passes while waiting,
+        and TranslationCancelled if the caller cancels.
+        """
+        with self._condition, on_cancel(self._wake):
+            while True:
+                now = time.monotonic()
+                wait = self._wait_time(tokens, now)
+                if wait <= 0 and self.in_flight < max(1, int(self.concurrency_limit)):
+                    break
+                check_deadline("the rate limiter")
+                check_cancelled("the rate limiter")
+                remaining = get_remaining()
+                if remaining is not None:
+                    wait = min(wait, remaining) if wait > 0 else remaining
+                # Concurrency slots free up on release(); budgets refill over time
+                self._condition.wait(timeout=wait if wait > 0 else None)
+
+            if self._request_bucket is not None:
+                self._request_bucket.tokens -= 1
+            if self._token_bucket is not None:
+                self._token_bucket.tokens -= min(tokens, self._token_bucket.capacity)
+            self.in_flight += 1
+
+    def _wake(self) -> None:
+        """Wake waiting callers so a cancelled one can give up."""
+        with self._condition:
+            self._condition.notify_all()
+
+    def release(self, error: Optional[BaseException] = None) -> None:
+        """Finish a request, adapting the concurrency limit to its outcome."""
+        with self._condition:
+            self.in_flight -= 1
+
+            if error is not None and get_status_code(error) in THROTTLE_STATUS_CODES:
+                # Multiplicative decrease, and pause for Retry-After if given
+                self.throttled_count += 1
+                self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit / 2)
+                retry_after = get_retry_after(error)
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            elif error is None:
+                # Additive increase: about +1 after a full window of successes
+                self.concurrency_limit = min(
+                    float(self.max_concurrency),
+                    self.concurrency_limit + 1.0 / max(1.0, self.concurrency_limit)
+                )
+
+            self._condition.notify_all()
+
+    @contextmanager
+    def limit(self, tokens: int = 0):
+        """Hold a request slot for the duration of the with-block."""
+        self.acquire(tokens)
+        try:
+            yield
+        except BaseException as e:
+            self.release(e)
+            raise
+        else:
+            self.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current concurrency state."""
+        with self._condition:
+            return {
+                "concurrency_limit": int(self.concurrency_limit),
+                "in_flight": self.in_flight,
+                "throttled": self.throttled_count
+            }
+
+
+_rate_limit_config: Dict[str, Dict[str, Any]] = {}
+_limiters: Dict[Tuple[str, Optional[str]], RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limits(config: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    """Set rate limits from settings and reset all limiters.
+
+    Keys are provider names ("Openrouter") or provider/model pairs
+    ("Openrouter/google/gemma-3-27b-it:free"); a per-model entry gets its
+    own limiter, every other model shares the provider's limiter.
+    """
+    global _rate_limit_config
+
+    with _limiters_lock:
+        _rate_limit_config = dict(config or {})
+        _limiters.clear()
+
+
+def get_rate_limiter(provider_name: str, model: Optional[str] = None) -> RateLimiter:
+    """Get the shared limiter for a provider, or for a model with its own limits."""
+    model_key = f"{provider_name}/{model}"
+    if model and model_key in _rate_limit_config:
+        key = (provider_name, model)
+        options = _rate_limit_config[model_key]
+    else:
+        key = (provider_name, None)
+        options = _rate_limit_config.get(provider_name, {})
+
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            limiter_settings = dict(DEFAULT_RATE_LIMIT)
+            limiter_settings.update({k: v for k, v in options.items() if k in DEFAULT_RATE_LIMIT})
+            limiter = RateLimiter(**limiter_settings)
+            _limiters[key] = limiter
+        return limiter
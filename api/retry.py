@@ -0,0 +1,147 @@
+import random
+import threading
+import time
+from typing import Dict, Any, Callable, Iterable, Iterator, Optional, TypeVar
+
+from api import cancellation
+from api.deadline import get_remaining
+from api.errors import get_status_code, get_retry_after, is_cancellation, is_deadline_exceeded, iter_error_chain
+from api.metrics import increment
+
+
+T = TypeVar("T")
+
+# HTTP statuses worth another attempt; every other status is treated as fatal
+RETRYABLE_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+
+# Connection-level errors raised by requests, httpx and the provider SDKs,
+# matched by name so none of those libraries need to be imported here
+RETRYABLE_ERROR_NAMES = {
+    "APIConnectionError", "APITimeoutError",           # openai / anthropic
+    "ConnectError", "ConnectTimeout", "ReadError",      # httpx / requests
+    "ReadTimeout", "RemoteProtocolError", "PoolTimeout",
+    "ChunkedEncodingError", "Timeout",
+    "ServiceUnavailable", "DeadlineExceeded",           # google.api_core (not ours)
+    "InternalServerError"
+}
+
+DEFAULT_RETRY_SETTINGS = {
+    "max_attempts": 4,   # Total attempts, including the first
+    "base_delay": 0.5,   # Seconds; doubled after every failed attempt
+    "max_delay": 20.0,   # Cap on a single backoff delay
+    "deadline": 120.0    # Seconds a call may spend across all attempts
+}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Decide whether an error is transient and the call should be retried."""
+    if is_deadline_exceeded(error) or is_cancellation(error):
+        return False  # The caller's time is up, or it no longer wants the answer
+    status_code = get_status_code(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+
+    for current in iter_error_chain(error):
+        if isinstance(current, (ConnectionError, TimeoutError)):
+            return True
+        if type(current).__name__ in RETRYABLE_ERROR_NAMES:
+            return True
+    return False
+
+
+class RetryPolicy:
+    """Retry transient failures with capped exponential backoff and full jitter."""
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.5,
+                 max_delay: float = 20.0, deadline: float = 120.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def get_delay(self, attempt: int, error: BaseException) -> float:
+        """Backoff before retry number attempt (1-based), honouring Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+        retry_after = get_retry_after(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def _should_retry(self, attempt: int, error: BaseException, started: float) -> Optional[float]:
+        """Return the delay before the next attempt, or None to give up."""
+        if attempt >= self.max_attempts or not is_retryable(error):
+            return None
+
+        delay = self.get_delay(attempt, error)
+        if time.monotonic() - started + delay > self.deadline:
+            return None
+        # Retries share the caller's remaining budget
+        remaining = get_remaining()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+    def call(self, request_fn: Callable[[], T], label: str = "") -> T:
+        """Call request_fn, retrying transient failures."""
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return request_fn()
+            except Exception as e:
+                delay = self._should_retry(attempt, e, started)
+                if delay is None:
+                    increment("failures", label)
+                    raise
+                increment("retries", label)
+                print(f"Retrying {label} in {delay:.1f}s after error: {str(e)}")
+                cancellation.sleep(delay)
+
+    def stream(self, stream_fn: Callable[[], Iterable[T]], label: str = "") -> Iterator[T]:
+        """Iterate stream_fn, retrying transient failures until the first item arrives.
+
+        Once part of the stream has been handed to the caller, errors are
+        raised as-is since the output can no longer be restarted cleanly.
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            received_any = False
+            try:
+                for item in stream_fn():
+                    received_any = True
+                    yield item
+                return
+            except Exception as e:
+                delay = None if received_any else self._should_retry(attempt, e, started)
+                if delay is None:
+                    increment("failures", label)
+                    raise
+                increment("retries", label)
+                print(f"Retrying {label} in {delay:.1f}s after error: {str(e)}")
+                cancellation.sleep(delay)
+
+
+_retry_policy = RetryPolicy(**DEFAULT_RETRY_SETTINGS)
+_retry_policy_lock = threading.Lock()
+
+
+def configure_retry_policy(options: Optional[Dict[str, Any]] = None) -> RetryPolicy:
+    """Replace the shared retry policy with one built from settings."""
+    global _retry_policy
+
+    retry_settings = dict(DEFAULT_RETRY_SETTINGS)
+    for key, value in (options or {}).items():
+        if key in retry_settings:
+            retry_settings[key] = value
+
+    with _retry_policy_lock:
+        _retry_policy = RetryPolicy(**retry_settings)
+        return _retry_policy
+
+
+def get_retry_policy() -> RetryPolicy:
+    """Get the shared retry policy."""
+    return _retry_policy
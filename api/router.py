@@ -0,0 +1,221 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from api.base import BaseProvider, get_provider_class
+from api.circuit import OPEN, get_circuit_breaker
+from api.errors import is_cancellation, is_deadline_exceeded
+from api.hedging import get_hedger
+from api.health import configure_health, get_backend_health
+from api.instances import get_configured_provider
+from api.metrics import increment
+
+
+T = TypeVar("T")
+
+DEFAULT_ROUTING_SETTINGS = {
+    "routes": {},
+    "ewma_alpha": 0.2,
+    "max_error_rate": 0.5,
+    "recovery_interval": 30.0,
+    "explore_probability": 0.05
+}
+
+# Routing options and the settings that hold the backends' credentials,
+# applied by configure_routing
+_routing: Dict[str, Any] = dict(DEFAULT_ROUTING_SETTINGS)
+_settings = None
+_routing_lock = threading.Lock()
+
+
+def configure_routing(settings) -> None:
+    """Apply the routing settings and remember where backend credentials live."""
+    global _routing, _settings
+
+    routing = dict(DEFAULT_ROUTING_SETTINGS)
+    for key, value in settings.get_routing_settings().items():
+        if key in routing:
+            routing[key] = value
+
+    with _routing_lock:
+        _routing = routing
+        _settings = settings
+    configure_health(routing["ewma_alpha"])
+
+
+def get_route_backends(route: str) -> List[Tuple[str, str]]:
+    """Get the (provider, model) backends of a route."""
+    return [(provider_name, model) for provider_name, model in _routing["routes"].get(route, [])]
+
+
+def get_expected_latency(stats: Dict[str, Any]) -> float:
+    """Expected seconds until a successful answer: average latency inflated by the error rate."""
+    if stats["latency"] is None:
+        return 0.0  # Untried backends go first so every backend gets measured
+    return stats["latency"] / max(0.05, 1.0 - stats["error_rate"])
+
+
+def is_circuit_open(provider_name: str) -> bool:
+    """Check whether calls to a backend provider's endpoint are currently failing fast."""
+    if _settings is None:
+        return False
+    endpoint = get_configured_provider(provider_name, _settings).get_endpoint()
+    return get_circuit_breaker(endpoint).get_stats()["state"] == OPEN
+
+
+def rank_backends(route: str) -> List[Tuple[str, str]]:
+    """Order a route's backends from best to worst.
+
+    Backends without an API key are left out. Backends whose circuit is
+    open, or whose error rate is above max_error_rate, go last until
+    recovery_interval has passed since their last failure, after which one
+    request probes them again. A small
+    share of requests goes to a random healthy backend so that averages
+    stay fresh and a recovered backend is noticed.
+    """
+    now = time.monotonic()
+    healthy = []
+    degraded = []
+    for provider_name, model in get_route_backends(route):
+        if _settings is not None and not _settings.get_api_key(provider_name):
+            continue
+        stats = get_backend_health(provider_name, model).get_stats()
+        expected = get_expected_latency(stats)
+        recently_failed = (stats["last_failure"] is not None
+                           and now - stats["last_failure"] < _routing["recovery_interval"])
+        if (stats["error_rate"] > _routing["max_error_rate"] and recently_failed) or is_circuit_open(provider_name):
+            degraded.append((expected, provider_name, model))
+        else:
+            healthy.append((expected, provider_name, model))
+
+    healthy.sort()
+    degraded.sort()
+    if len(healthy) > 1 and random.random() < _routing["explore_probability"]:
+        healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+    return [(provider_name, model) for _, provider_name, model in healthy + degraded]
+
+
+class RouterProvider(BaseProvider):
+    """Send each request to the fastest healthy backend of a route.
+
+    A route is a named set of provider/model pairs considered equivalent
+    for translation (routing.routes in settings); the route name is used as
+    the model. Backends are ranked by their exponentially weighted latency
+    and error rate, tracked for every provider call, and a request that
+    fails on one backend is retried on the next. With hedging enabled, a
+    slow request to the best backend is duplicated to the second best.
+    """
+
+    @classmethod
+    def get_api_description(cls) -> str:
+        """Get a description of the API and how to get API keys."""
+        return ("Routes each request to the fastest healthy provider of a route and fails over "
+                "when one degrades. Routes are lists of equivalent [provider, model] pairs under "
+                "routing.routes in settings.json; each provider uses its own API key.")
+
+    @classmethod
+    def requires_api_key(cls) -> bool:
+        """The router uses the API keys of its backends."""
+        return False
+
+    @classmethod
+    def get_models(cls) -> Dict[str, str]:
+        """Get the configured routes."""
+        return {route: route for route in _routing["routes"]}
+
+    @classmethod
+    def get_max_chunk_tokens(cls, model: str) -> int:
+        """Get the smallest chunk budget of the route's backends."""
+        budgets = [get_provider_class(provider_name).get_max_chunk_tokens(backend_model)
+                   for provider_name, backend_model in get_route_backends(model)]
+        return min(budgets) if budgets else super().get_max_chunk_tokens(model)
+
+    @classmethod
+    def get_max_batch_segments(cls, model: str) -> int:
+        """Get the smallest batch size of the route's backends."""
+        sizes = [get_provider_class(provider_name).get_max_batch_segments(backend_model)
+                 for provider_name, backend_model in get_route_backends(model)]
+        return min(sizes) if sizes else super().get_max_batch_segments(model)
+
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        """Check if this provider streams translations as they are generated."""
+        return True
+
+    def set_api_key(self, api_key: str) -> None:
+        """The router has no API key of its own."""
+        pass
+
+    def test_connection(self) -> bool:
+        """Check that some route has a backend with an API key."""
+        return any(rank_backends(route) for route in _routing["routes"])
+
+    def _get_backend(self, provider_name: str) -> BaseProvider:
+        if _settings is None:
+            raise Exception("Translation error: routing is not configured")
+        return get_configured_provider(provider_name, _settings)
+
+    def _attempt(self, backend: Tuple[str, str], call_fn: Callable[[BaseProvider, str], T]):
+        """Bind call_fn to a backend for the hedger."""
+        provider_name, model = backend
+        return provider_name, model, lambda: call_fn(self._get_backend(provider_name), model)
+
+    def _call(self, route: str, call_fn: Callable[[BaseProvider, str], T]) -> T:
+        """Call the best backend of a route, failing over to the next one on errors."""
+        backends = rank_backends(route)
+        if not backends:
+            raise Exception(f"Translation error: route {route} has no backend with an API key")
+
+        last_error: Optional[Exception] = None
+        for position, backend in enumerate(backends):
+            # Only the first call is hedged, with the next backend in line
+            hedge = self._attempt(backends[1], call_fn) if position == 0 and len(backends) > 1 else None
+            try:
+                return get_hedger().call(self._attempt(backend, call_fn), hedge)
+            except Exception as e:
+                if is_cancellation(e) or is_deadline_exceeded(e):
+                    raise  # The caller gave up; another backend will not help
+                increment("router_failovers", "/".join(backend))
+                print(f"Router: {'/'.join(backend)} failed, trying the next backend: {str(e)}")
+                last_error = e
+        raise Exception(f"Translation error: every backend of route {route} failed: {str(last_error)}")
+
+    def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
+        """Translate text with the best backend of the route named by model."""
+        return self._call(model, lambda backend, backend_model: backend.translate(
+            text, backend_model, source_language, target_language
+        ))
+
+    def translate_batch(self, texts: List[str], model: str, source_language: str,
+                        target_language: str, max_workers: int = 4) -> List[str]:
+        """Translate many short texts with the best backend of the route."""
+        return self._call(model, lambda backend, backend_model: backend.translate_batch(
+            texts, backend_model, source_language, target_language, max_workers
+        ))
+
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str) -> Iterator[str]:
+        """Stream from the best backend; failing over is only possible before the first piece."""
+        backends = rank_backends(model)
+        if not backends:
+            raise Exception(f"Translation error: route {model} has no backend with an API key")
+
+        def stream_fn(backend: BaseProvider, backend_model: str) -> Iterator[str]:
+            return backend.translate_stream(text, backend_model, source_language, target_language)
+
+        last_error: Optional[Exception] = None
+        for position, backend in enumerate(backends):
+            hedge = self._attempt(backends[1], stream_fn) if position == 0 and len(backends) > 1 else None
+            received_any = False
+            try:
+                for piece in get_hedger().stream(self._attempt(backend, stream_fn), hedge):
+                    received_any = True
+                    yield piece
+                return
+            except Exception as e:
+                if received_any or is_cancellation(e) or is_deadline_exceeded(e):
+                    raise
+                increment("router_failovers", "/".join(backend))
+                print(f"Router: {'/'.join(backend)} failed, trying the next backend: {str(e)}")
+                last_error = e
+        raise Exception(f"Translation error: every backend of route {model} failed: {str(last_error)}")
@@ -0,0 +1,500 @@
+from typing import Callable, Iterator, List, Optional, Tuple, TypeVar
+
+from api.base import BaseProvider, PROMPT_VERSION, use_reference_translations
+from api.cancellation import is_cancelled
+from api.circuit import configure_circuit_breakers
+from api.deadline import get_remaining
+from api.errors import is_cancellation
+from api.hedging import configure_hedging, get_hedger
+from api.instances import get_configured_provider
+from api.metrics import increment
+from api.ratelimit import configure_rate_limits
+from api.retry import configure_retry_policy
+from api.router import configure_routing
+from api.singleflight import CallAbandoned, SingleFlight
+from api.transport import configure_transport
+from utils.chunking import estimate_tokens, split_into_chunks, translate_chunks
+from utils.dedup import dedupe_segments, fan_out
+from utils.fuzzy_memory import FuzzyMemory, adapt_translation
+from utils.language_detect import get_language_detector
+from utils.language_utils import AUTO_DETECT
+from utils.masking import ALL_KINDS, mask_text, placeholders_intact, unmask_stream, unmask_text
+from utils.segment_filter import get_skip_reason
+from utils.translation_memory import TranslationMemory
+
+
+T = TypeVar("T")
+
+# Identical translations requested at the same time (from server clients,
+# batch workers or the GUI) share one provider call
+_in_flight = SingleFlight()
+
+
+def _get_wait_timeout() -> Optional[float]:
+    """Seconds a coalesced caller may wait for the leader: its own remaining deadline."""
+    # A waiter's own deadline applies even when the leader's is later
+    remaining = get_remaining()
+    return max(0.0, remaining) if remaining is not None else None
+
+
+class Replacement(str):
+    """A piece from translate_stream that replaces everything streamed before it."""
+
+
+def _leader_gave_up(error: BaseException) -> bool:
+    """Check whether a shared call ended without an outcome for this caller, who should make it instead."""
+    # The leader was abandoned, or cancelled while this caller was not
+    return isinstance(error, CallAbandoned) or (is_cancellation(error) and not is_cancelled())
+
+
+def configure_provider_layer(settings) -> None:
+    """Apply transport, circuit breaker, rate limit, retry, routing and hedging settings to the shared provider layer."""
+    configure_transport(settings.get_http_settings())
+    configure_circuit_breakers(settings.get_circuit_breaker_settings())
+    configure_rate_limits(settings.get_rate_limits())
+    configure_retry_policy(settings.get_retry_settings())
+    configure_routing(settings)
+    configure_hedging(settings.get_hedging_settings())
+
+
+class TranslationService:
+    """Entry point for translations from the UI and batch tools.
+
+    Looks requests up in the translation memory first and only calls the
+    provider on a miss, storing the new translation for next time. Texts
+    longer than the provider's chunk budget are split on paragraph and
+    sentence boundaries and the chunks are translated in parallel.
+    Identical requests that overlap in time share a single provider call.
+
+    On an exact miss, short segments are looked up in the fuzzy memory: a
+    near-match that differs only in its numbers is reused directly, and other
+    near-matches are given to the provider as reference translations.
+
+    URLs, e-mail addresses, code, markup, format specifiers and numbers are
+    masked with placeholders before the cache lookup and the provider call,
+    and restored afterwards. A translation that loses a placeholder is never
+    cached, and the text is translated again without masking.
+
+    With the source language set to AUTO_DETECT, each text's language is
+    detected offline before anything else, so the cache, prompts and
+    filters all see the real source language. Text the detector cannot
+    place keeps AUTO_DETECT and the model works its language out.
+
+    Segments that need no model call (numbers, URLs, code, identifiers, text
+    already in the target script) are passed through unchanged, and the
+    reason is counted in the "skipped" metric.
+
+    With hedging enabled, a provider call that runs past its usual latency is
+    duplicated to the provider/model configured as its alternate.
+    """
+
+    def __init__(self, settings, memory: Optional[TranslationMemory] = None,
+                 fuzzy_memory: Optional[FuzzyMemory] = None):
+        self.settings = settings
+        self.memory = memory
+        self.fuzzy_memory = fuzzy_memory
+        self.chunk_workers = settings.get_chunk_workers()
+        self.skip_untranslatable = settings.get_skip_untranslatable()
+
+        masking_settings = settings.get_masking_settings()
+        self.mask_kinds = None
+        if masking_settings.get("enabled", True):
+            self.mask_kinds = tuple(kind for kind in ALL_KINDS if masking_settings.get(kind, True))
+
+        memory_settings = settings.get_translation_memory_settings()
+        self.fuzzy_examples = memory_settings.get("fuzzy_examples", 2)
+        if memory_settings.get("enabled", True):
+            if self.memory is None:
+                self.memory = TranslationMemory(
+                    settings.translation_memory_file,
+                    max_entries=memory_settings.get("max_entries", 100000)
+                )
+            if self.fuzzy_memory is None and memory_settings.get("fuzzy", True):
+                self.fuzzy_memory = FuzzyMemory(
+                    settings.fuzzy_memory_file,
+                    threshold=memory_settings.get("fuzzy_threshold", 0.75)
+                )
+
+    def get_provider(self, provider_name: str) -> BaseProvider:
+        """Get the configured provider instance for a provider name."""
+        return get_configured_provider(provider_name, self.settings)
+
+    def _lookup(self, provider_name: str, model: str, text: str,
+                source_language: str, target_language: str) -> Optional[str]:
+        """Look a request up in the translation memory."""
+        if self.memory is None:
+            return None
+        return self.memory.get(text, source_language, target_language,
+                               provider_name, model, PROMPT_VERSION)
+
+    def _store(self, provider_name: str, model: str, text: str,
+               source_language: str, target_language: str, translation: str) -> None:
+        """Store a finished translation in the translation memory."""
+        if not placeholders_intact(text, translation):
+            return
+        if self.memory is not None:
+            self.memory.put(text, source_language, target_language,
+                            provider_name, model, PROMPT_VERSION, translation)
+        if self.fuzzy_memory is not None:
+            self.fuzzy_memory.add(text, source_language, target_language,
+                                  provider_name, model, translation)
+
+    def _find_similar(self, provider_name: str, model: str, text: str, source_language: str,
+                      target_language: str) -> Tuple[Optional[str], List[Tuple[str, str]]]:
+        """Look for near-matches of text in the fuzzy memory.
+
+        Returns a reusable translation (a match from the same provider and
+        model that differs only in its numbers) or None, plus the reference
+        translations to include in the prompt otherwise.
+        """
+        if self.fuzzy_memory is None or not self.fuzzy_memory.accepts(text):
+            return None, []
+
+        matches = self.fuzzy_memory.search(text, source_language, target_language,
+                                           limit=max(1, self.fuzzy_examples))
+        for match in matches:
+            if match["provider"] == provider_name and match["model"] == model:
+                adapted = adapt_translation(text, match["source_text"], match["translation"])
+                if adapted is not None:
+                    increment("fuzzy_reused", f"{provider_name}/{model}")
+                    return adapted, []
+
+        examples = [(match["source_text"], match["translation"]) for match in matches[:self.fuzzy_examples]]
+        return None, examples
+
+    def _provider_translate(self, provider_name: str, model: str, text: str,
+                            source_language: str, target_language: str) -> str:
+        """Translate one segment with the provider, using fuzzy matches where there are any."""
+        reused, examples = self._find_similar(provider_name, model, text, source_language, target_language)
+        if reused is not None:
+            return reused
+
+        with use_reference_translations(examples):
+            return get_hedger().call(*self._attempts(
+                provider_name, model,
+                lambda backend, backend_model: backend.translate(
+                    text=text,
+                    model=backend_model,
+                    source_language=source_language,
+                    target_language=target_language
+                )
+            ))
+
+    def _attempts(self, provider_name: str, model: str, call_fn: Callable[[BaseProvider, str], T]):
+        """Bind call_fn to the provider and to its hedging alternate (None if it has none)."""
+        def bind(backend_name: str, backend_model: str):
+            return backend_name, backend_model, lambda: call_fn(self.get_provider(backend_name), backend_model)
+
+        alternate = get_hedger().get_alternate(provider_name, model)
+        return bind(provider_name, model), bind(*alternate) if alternate else None
+
+    @staticmethod
+    def _flight_key(provider_name: str, model: str, text: str,
+                    source_language: str, target_language: str) -> str:
+        """Key identifying identical requests for coalescing."""
+        return TranslationMemory.make_key(text, source_language, target_language,
+                                          provider_name, model, PROMPT_VERSION)
+
+    def _coalesce(self, provider_name: str, model: str, text: str,
+                  source_language: str, target_language: str, translate_fn) -> str:
+        """Run translate_fn, or share the result of an identical call already in flight."""
+        key = self._flight_key(provider_name, model, text, source_language, target_language)
+        while True:
+            try:
+                translation, shared = _in_flight.do(key, translate_fn, timeout=_get_wait_timeout())
+            except Exception as e:
+                if _leader_gave_up(e):
+                    continue  # Make the call ourselves
+                raise
+            if shared:
+                increment("coalesced", f"{provider_name}/{model}")
+            return translation
+
+    def _translate_chunk(self, provider_name: str, model: str, text: str,
+                         source_language: str, target_language: str) -> str:
+        """Translate a single chunk, going through the translation memory."""
+        if self._should_skip(text, source_language, target_language):
+            return text
+
+        cached = self._lookup(provider_name, model, text, source_language, target_language)
+        if cached is not None:
+            return cached
+
+        def translate_chunk():
+            translation = self._provider_translate(provider_name, model, text,
+                                                   source_language, target_language)
+            self._store(provider_name, model, text, source_language, target_language, translation)
+            return translation
+
+        return self._coalesce(provider_name, model, text, source_language, target_language, translate_chunk)
+
+    def _iter_translation(self, provider_name: str, model: str, text: str,
+                          source_language: str, target_language: str, stream: bool) -> Iterator[str]:
+        """Yield the translation of text in pieces, chunking long texts."""
+        provider = self.get_provider(provider_name)
+        pieces = split_into_chunks(text, provider.get_max_chunk_tokens(model))
+
+        chunks = [piece for piece, translatable in pieces if translatable]
+        if len(chunks) > 1:
+            # Long document: translate unique chunks in parallel, emit them in order
+            unique, _ = dedupe_segments(chunks)
+            if len(unique) < len(chunks):
+                increment("dedup_saved", f"{provider_name}/{model}", len(chunks) - len(unique))
+            yield from translate_chunks(
+                pieces,
+                lambda chunk: self._translate_chunk(provider_name, model, chunk,
+                                                    source_language, target_language),
+                max_workers=self.chunk_workers
+            )
+        elif stream:
+            reused, examples = self._find_similar(provider_name, model, text, source_language, target_language)
+            if reused is not None:
+                yield reused
+                return
+            with use_reference_translations(examples):
+                yield from get_hedger().stream(*self._attempts(
+                    provider_name, model,
+                    lambda backend, backend_model: backend.translate_stream(
+                        text=text,
+                        model=backend_model,
+                        source_language=source_language,
+                        target_language=target_language
+                    )
+                ))
+        else:
+            yield self._provider_translate(provider_name, model, text,
+                                           source_language, target_language)
+
+    def _resolve_source(self, text: str, source_language: str) -> str:
+        """Detect the source language of text when it is set to auto-detect."""
+        if source_language != AUTO_DETECT:
+            return source_language
+        # Text without letters, or too short to tell, keeps AUTO_DETECT and
+        # leaves the language to the model rather than guessing it here
+        language = get_language_detector().detect(text)
+        increment("language_detected", language or "undetected")
+        return language or source_language
+
+    def _should_skip(self, text: str, source_language: str, target_language: str) -> bool:
+        """Check whether text can be passed through without a model call, counting the reason."""
+        if not self.skip_untranslatable:
+            return False
+        reason = get_skip_reason(text, source_language, target_language)
+        if reason is None:
+            return False
+        increment("skipped", reason)
+        return True
+
+    def _mask(self, text: str):
+        """Mask protected spans in text when masking is enabled."""
+        if self.mask_kinds is None:
+            return text, []
+        return mask_text(text, self.mask_kinds)
+
+    def translate(self, provider_name: str, model: str, text: str,
+                  source_language: str, target_language: str) -> str:
+        """Translate text, reusing a previous translation when one exists."""
+        source_language = self._resolve_source(text, source_language)
+        if self._should_skip(text, source_language, target_language):
+            return text
+
+        masked, spans = self._mask(text)
+        if spans:
+            translation = self._translate_text(provider_name, model, masked, source_language, target_language)
+            if placeholders_intact(masked, translation):
+                return unmask_text(translation, spans)
+            increment("placeholders_lost", f"{provider_name}/{model}")
+
+        return self._translate_text(provider_name, model, text, source_language, target_language)
+
+    def _translate_text(self, provider_name: str, model: str, text: str,
+                        source_language: str, target_language: str) -> str:
+        """Translate text as-is through the cache, coalescing and chunking."""
+        cached = self._lookup(provider_name, model, text, source_language, target_language)
+        if cached is not None:
+            return cached
+
+        def translate_text():
+            translation = "".join(self._iter_translation(
+                provider_name, model, text, source_language, target_language, stream=False
+            ))
+            self._store(provider_name, model, text, source_language, target_language, translation)
+            return translation
+
+        return self._coalesce(provider_name, model, text, source_language, target_language, translate_text)
+
+    def translate_stream(self, provider_name: str, model: str, text: str,
+                         source_language: str, target_language: str) -> Iterator[str]:
+        """Translate text, yielding pieces as they arrive (or the cached translation at once).
+
+        A streamed translation that lost a placeholder is translated again
+        without masking, and the new translation is yielded as a final
+        Replacement piece that supersedes every piece before it.
+        """
+        source_language = self._resolve_source(text, source_language)
+        if self._should_skip(text, source_language, target_language):
+            yield text
+            return
+
+        masked, spans = self._mask(text)
+        if not spans:
+            yield from self._translate_text_stream(provider_name, model, text, source_language, target_language)
+            return
+
+        # Placeholders cannot be checked until the end; a lossy result is not cached
+        masked_pieces = []
+
+        def collect():
+            for piece in self._translate_text_stream(provider_name, model, masked,
+                                                     source_language, target_language):
+                masked_pieces.append(piece)
+                yield piece
+
+        yield from unmask_stream(collect(), spans)
+        if not placeholders_intact(masked, "".join(masked_pieces)):
+            increment("placeholders_lost", f"{provider_name}/{model}")
+            # What was shown may lack protected spans; translate again unmasked
+            yield Replacement(self._translate_text(provider_name, model, text, source_language, target_language))
+
+    def _translate_text_stream(self, provider_name: str, model: str, text: str,
+                               source_language: str, target_language: str) -> Iterator[str]:
+        """Stream the translation of text as-is through the cache, coalescing and chunking."""
+        cached = self._lookup(provider_name, model, text, source_language, target_language)
+        if cached is not None:
+            yield cached
+            return
+
+        # A request identical to one already streaming waits for its full result
+        key = self._flight_key(provider_name, model, text, source_language, target_language)
+        while True:
+            call, is_leader = _in_flight.begin(key)
+            if is_leader:
+                break
+            try:
+                translation = call.wait(_get_wait_timeout())
+            except Exception as e:
+                if _leader_gave_up(e):
+                    continue  # Stream it ourselves
+                raise
+            increment("coalesced", f"{provider_name}/{model}")
+            yield translation
+            return
+
+        translated_pieces = []
+        try:
+            for piece in self._iter_translation(
+                provider_name, model, text, source_language, target_language, stream=True
+            ):
+                translated_pieces.append(piece)
+                yield piece
+        except Exception as e:
+            _in_flight.finish(key, call, error=e)
+            raise
+        except BaseException:
+            # The caller stopped reading early; that is not a failure to share
+            _in_flight.abandon(key, call)
+            raise
+
+        translation = "".join(translated_pieces)
+        self._store(provider_name, model, text, source_language, target_language, translation)
+        _in_flight.finish(key, call, result=translation)
+
+    def translate_batch(self, provider_name: str, model: str, texts: List[str],
+                        source_language: str, target_language: str) -> List[str]:
+        """Translate many short texts, packing cache misses into shared requests.
+
+        Texts too long to pack are translated on their own (with chunking).
+        With auto-detect, texts are grouped by their detected language.
+        """
+        if source_language == AUTO_DETECT:
+            groups = {}
+            for index, language in enumerate(get_language_detector().detect_batch(texts)):
+                groups.setdefault(language, []).append(index)
+
+            results = list(texts)
+            for language, indexes in groups.items():
+                increment("language_detected", language or "undetected", len(indexes))
+                translations = self._translate_batch(provider_name, model, [texts[index] for index in indexes],
+                                                     language or AUTO_DETECT, target_language)
+                for index, translation in zip(indexes, translations):
+                    results[index] = translation
+            return results
+        return self._translate_batch(provider_name, model, texts, source_language, target_language)
+
+    def _translate_batch(self, provider_name: str, model: str, texts: List[str],
+                         source_language: str, target_language: str) -> List[str]:
+        """Translate many short texts from a known (or undetectable) source language."""
+        pending = [index for index, text in enumerate(texts)
+                   if not self._should_skip(text, source_language, target_language)]
+        masked_texts = []
+        spans_list = []
+        for index in pending:
+            masked, spans = self._mask(texts[index])
+            masked_texts.append(masked)
+            spans_list.append(spans)
+
+        results = list(texts)
+        translations = self._translate_texts(provider_name, model, masked_texts, source_language, target_language)
+        for index, masked, spans, translation in zip(pending, masked_texts, spans_list, translations):
+            results[index] = translation
+            if not spans:
+                continue
+            if placeholders_intact(masked, results[index]):
+                results[index] = unmask_text(results[index], spans)
+            else:
+                increment("placeholders_lost", f"{provider_name}/{model}")
+                results[index] = self._translate_text(provider_name, model, texts[index],
+                                                      source_language, target_language)
+        return results
+
+    def _translate_texts(self, provider_name: str, model: str, texts: List[str],
+                         source_language: str, target_language: str) -> List[str]:
+        """Translate many short texts as-is, packing cache misses into shared requests."""
+        provider = self.get_provider(provider_name)
+        max_tokens = provider.get_max_chunk_tokens(model)
+
+        results: List[Optional[str]] = [None] * len(texts)
+        short_misses = []
+        for index, text in enumerate(texts):
+            cached = self._lookup(provider_name, model, text, source_language, target_language)
+            if cached is None:
+                cached, _ = self._find_similar(provider_name, model, text, source_language, target_language)
+            if cached is not None:
+                results[index] = cached
+            elif estimate_tokens(text) > max_tokens:
+                results[index] = self._translate_text(provider_name, model, text, source_language, target_language)
+            else:
+                short_misses.append(index)
+
+        if short_misses:
+            # Send each distinct string once and copy it to every repeat
+            miss_texts = [texts[index] for index in short_misses]
+            unique, positions = dedupe_segments(miss_texts)
+            if len(unique) < len(miss_texts):
+                increment("dedup_saved", f"{provider_name}/{model}", len(miss_texts) - len(unique))
+
+            translations = fan_out(miss_texts, positions, get_hedger().call(*self._attempts(
+                provider_name, model,
+                lambda backend, backend_model: backend.translate_batch(
+                    unique,
+                    model=backend_model,
+                    source_language=source_language,
+                    target_language=target_language,
+                    max_workers=self.chunk_workers
+                )
+            )))
+            for index, translation in zip(short_misses, translations):
+                results[index] = translation
+                if texts[index].strip():
+                    self._store(provider_name, model, texts[index], source_language, target_language, translation)
+
+        return results
+
+    def get_cache_stats(self):
+        """Get translation memory hit/miss counters, or None if it is disabled."""
+        if self.memory is None:
+            return None
+        stats = self.memory.get_stats()
+        if self.fuzzy_memory is not None:
+            stats["fuzzy"] = self.fuzzy_memory.get_stats()
+        return stats
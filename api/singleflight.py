@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from api.cancellation import check_cancelled, get_cancel_token
+from api.errors import DeadlineExceeded
+
+
+T = TypeVar("T")
+
+# Seconds between cancellation checks while waiting for a leader
+_CANCEL_POLL_INTERVAL = 0.1
+
+
+class CallAbandoned(Exception):
+    """The leader stopped without an outcome (e.g. its caller stopped reading); a waiter should take over."""
+
+
+class _Call:
+    """One in-flight call and the outcome its waiters will share."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+    def wait(self, timeout: Optional[float] = None) -> Any:
+        """Block until the leader finishes, then return its result or raise its error.
+
+        Raises DeadlineExceeded if the leader is still running after timeout
+        seconds, and TranslationCancelled as soon as the waiter is cancelled.
+        """
+        cancellable = get_cancel_token() is not None
+        end = time.monotonic() + timeout if timeout is not None else None
+        while True:
+            wait = max(0.0, end - time.monotonic()) if end is not None else None
+            if cancellable:
+                # Poll so a cancelled waiter stops without disturbing the others
+                wait = _CANCEL_POLL_INTERVAL if wait is None else min(wait, _CANCEL_POLL_INTERVAL)
+            if self.done.wait(wait):
+                break
+            check_cancelled()
+            if end is not None and time.monotonic() >= end:
+                raise DeadlineExceeded("Deadline exceeded waiting for an identical request in flight")
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """Coalesce identical concurrent calls into one.
+
+    The first caller for a key becomes the leader and makes the call; callers
+    arriving while it is in flight wait and receive the same result or error.
+    Nothing is remembered once the call finishes, so this never serves stale
+    results; it only removes duplicate work that overlaps in time.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key: Hashable) -> Tuple[_Call, bool]:
+        """Join the in-flight call for key, or start one. Returns (call, is_leader)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                return call, False
+            call = _Call()
+            self._calls[key] = call
+            return call, True
+
+    def finish(self, key: Hashable, call: _Call, result: Any = None,
+               error: Optional[BaseException] = None) -> None:
+        """Publish the leader's outcome to every waiter and forget the key."""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+        call.result = result
+        call.error = error
+        call.done.set()
+
+    def abandon(self, key: Hashable, call: _Call) -> None:
+        """End a call that has no outcome, so its waiters make the call themselves."""
+        self.finish(key, call, error=CallAbandoned("The identical request in flight was abandoned"))
+
+    def do(self, key: Hashable, fn: Callable[[], T], timeout: Optional[float] = None) -> Tuple[T, bool]:
+        """Run fn once for all concurrent callers with the same key.
+
+        Returns (result, shared), where shared is True for callers that
+        received another caller's result. Waiters give up after timeout
+        seconds; the leader is bounded by its own deadline. A leader
+        interrupted by something other than an error (KeyboardInterrupt,
+        SystemExit) abandons the call, and its waiters get CallAbandoned.
+        """
+        call, is_leader = self.begin(key)
+        if not is_leader:
+            return call.wait(timeout), True
+
+        try:
+            result = fn()
+        except Exception as e:
+            self.finish(key, call, error=e)
+            raise
+        except BaseException:
+            self.abandon(key, call)
+            raise
+        self.finish(key, call, result=result)
+        return result, False
+
+    def in_flight(self) -> int:
+        """Get the number of distinct calls currently in flight."""
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,36 @@
+import pytest
+
+import api.circuit
+import api.health
+from api.base import PROVIDER_REGISTRY
+from api.instances import invalidate_provider_instances
+from api.tests.fakes import FakeProvider
+
+
+@pytest.fixture
+def settings(tmp_path, monkeypatch):
+    """Settings stored in a temporary home directory, with fast retries and the fake provider configured."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    from config.settings import AppSettings
+    from api.service import configure_provider_layer
+
+    app_settings = AppSettings()
+    app_settings.set_api_key("Fake", "key")
+    app_settings.settings["retry"] = {"base_delay": 0.01, "max_delay": 0.05}
+    configure_provider_layer(app_settings)
+    yield app_settings
+    configure_provider_layer(AppSettings())
+
+
+@pytest.fixture(autouse=True)
+def fake_provider(monkeypatch):
+    """Register FakeProvider as "Fake", with fresh answers, breakers and health for each test."""
+    monkeypatch.setitem(PROVIDER_REGISTRY, "Fake", ("api.tests.fakes", "FakeProvider"))
+    monkeypatch.setattr(FakeProvider, "answer", staticmethod(lambda text: f"<{text}>"))
+    monkeypatch.setattr(FakeProvider, "stream_answer", staticmethod(lambda text: [f"<{text}>"]))
+    monkeypatch.setattr(FakeProvider, "requests", [])
+    monkeypatch.setattr(api.circuit, "_breakers", {})
+    monkeypatch.setattr(api.health, "_health", {})
+    invalidate_provider_instances("Fake")
+    yield FakeProvider
+    invalidate_provider_instances("Fake")
@@ -0,0 +1,60 @@
+import threading
+from typing import Callable, Iterable, List
+
+from api.base import BaseProvider
+from api.errors import CALLER_ERRORS
+
+
+class FakeProvider(BaseProvider):
+    """Provider answering through functions set by a test, with the real call policies around them.
+
+    answer(text) returns a translation and stream_answer(text) returns its
+    pieces; either may raise. Every request made is recorded in requests.
+    """
+
+    answer: Callable[[str], str] = staticmethod(lambda text: f"<{text}>")
+    stream_answer: Callable[[str], Iterable[str]] = staticmethod(lambda text: [f"<{text}>"])
+    requests: List[str] = []
+    _requests_lock = threading.Lock()
+
+    @classmethod
+    def get_name(cls) -> str:
+        return "Fake"
+
+    @classmethod
+    def supports_streaming(cls) -> bool:
+        return True
+
+    def set_api_key(self, api_key: str) -> None:
+        self.api_key = api_key
+
+    def test_connection(self) -> bool:
+        return True
+
+    def _record(self, text: str) -> None:
+        with self._requests_lock:
+            type(self).requests.append(text)
+
+    def translate(self, text: str, model: str, source_language: str, target_language: str) -> str:
+        def request():
+            self._record(text)
+            return type(self).answer(text)
+
+        try:
+            return self._send_request(model, text, request)
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
+
+    def translate_stream(self, text: str, model: str, source_language: str, target_language: str):
+        def request():
+            self._record(text)
+            return iter(type(self).stream_answer(text))
+
+        try:
+            yield from self._stream_request(model, text, request)
+        except CALLER_ERRORS:
+            raise
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}")
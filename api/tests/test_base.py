@@ -0,0 +1,97 @@
+import pytest
+
+from api.base import (get_packing_prompt, get_provider_class, get_reference_prompt,
+                      translating_packed_segments, use_reference_translations)
+from api.cancellation import CancelToken, cancellation_scope
+from api.deadline import deadline_scope
+from api.errors import DeadlineExceeded, TranslationCancelled
+from api.tests.fakes import FakeProvider
+from utils.packing import unpack_segments
+
+
+def test_packed_batches_ask_to_keep_the_tags(settings, fake_provider, monkeypatch):
+    prompts = []
+
+    def answer(text):
+        prompts.append(get_packing_prompt())
+        if "<seg" in text:
+            return "\n".join(f'<seg id="{position + 1}">[{translation}]</seg>'
+                             for position, translation in sorted(unpack_segments(text, 3).items()))
+        return f"[{text}]"
+
+    monkeypatch.setattr(fake_provider, "answer", staticmethod(answer))
+    translations = FakeProvider().translate_batch(["One", " Two ", "Three"], "m", "English", "French")
+
+    assert translations == ["[One]", " [Two] ", "[Three]"]
+    assert len(prompts) == 1 and '<seg id="n">' in prompts[0]
+    # Single segments are sent without tags, so the prompt says nothing about them
+    assert FakeProvider().translate("One", "m", "English", "French") == "[One]"
+    assert prompts[-1] == ""
+
+
+def test_misaligned_segments_are_retried(settings, fake_provider, monkeypatch):
+    def answer(text):
+        if "<seg" in text:
+            # Every segment after the first is dropped
+            return f'<seg id="1">[{unpack_segments(text, 1)[0]}]</seg>'
+        return f"[{text}]"
+
+    monkeypatch.setattr(fake_provider, "answer", staticmethod(answer))
+    translations = FakeProvider().translate_batch(["One", "Two", "Three"], "m", "English", "French")
+
+    assert translations == ["[One]", "[Two]", "[Three]"]
+    # The batch, the two missing segments packed again, then the last one alone
+    assert len(fake_provider.requests) == 3
+
+
+def test_reference_prompt_lists_examples():
+    assert get_reference_prompt() == ""
+    with use_reference_translations([("Hello", "Bonjour")]):
+        assert "Source: Hello\nTranslation: Bonjour" in get_reference_prompt()
+    assert get_packing_prompt() == ""
+
+
+def get_system_message(provider_name: str) -> str:
+    """Build a provider's system message the way it is sent for a translation."""
+    provider = get_provider_class(provider_name)()
+    if provider_name == "ArliAI":
+        messages = provider._get_payload("Hello", "m", "English", "French", stream=False)["messages"]
+    else:
+        if provider_name == "AI21":
+            pytest.importorskip("ai21")
+        messages = provider._get_messages("Hello", "English", "French")
+    message = messages[0]
+    return message["content"] if isinstance(message, dict) else message.content
+
+
+@pytest.mark.parametrize("provider_name", ["OpenAI", "ArliAI", "AI21", "Mistral", "Deepseek",
+                                           "Featherless", "Openrouter"])
+def test_packing_prompt_is_sent_once(provider_name):
+    with translating_packed_segments():
+        prompt = get_packing_prompt()
+        assert get_system_message(provider_name).count(prompt) == 1
+    assert prompt not in get_system_message(provider_name)
+
+
+def test_caller_errors_are_not_wrapped(settings, fake_provider, monkeypatch):
+    with deadline_scope(0):
+        with pytest.raises(DeadlineExceeded):
+            FakeProvider().translate("One", "m", "English", "French")
+
+    token = CancelToken()
+    token.cancel()
+    with cancellation_scope(token):
+        with pytest.raises(TranslationCancelled):
+            list(FakeProvider().translate_stream("One", "m", "English", "French"))
+
+
+def test_errors_caused_by_a_deadline_become_deadline_exceeded(settings, fake_provider, monkeypatch):
+    def answer(text):
+        try:
+            raise DeadlineExceeded("out of time")
+        except DeadlineExceeded as e:
+            raise RuntimeError("SDK wrapper") from e
+
+    monkeypatch.setattr(fake_provider, "answer", staticmethod(answer))
+    with pytest.raises(DeadlineExceeded):
+        FakeProvider().translate("One", "m", "English", "French")
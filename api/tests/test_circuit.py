@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from api.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, is_endpoint_failure
+from api.errors import CircuitOpenError, ProviderHTTPError
+
+
+def test_endpoint_failures():
+    assert is_endpoint_failure(ProviderHTTPError(500, "error"))
+    assert is_endpoint_failure(ProviderHTTPError(408, "timeout"))
+    assert is_endpoint_failure(ConnectionError("refused"))
+    assert not is_endpoint_failure(ProviderHTTPError(429, "slow down"))
+    assert not is_endpoint_failure(ProviderHTTPError(400, "bad request"))
+    assert not is_endpoint_failure(ValueError("bad answer"))
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, open_interval=60)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_answered_errors_do_not_count():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+    breaker.record_error(ProviderHTTPError(400, "bad request"))
+    assert breaker.state == CLOSED
+    breaker.record_error(ProviderHTTPError(502, "bad gateway"))
+    assert breaker.state == OPEN
+
+
+def test_half_open_probe_closes_or_reopens():
+    breaker = CircuitBreaker("test", failure_threshold=1, open_interval=0.05, half_open_probes=1)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # Only one probe at a time
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    time.sleep(0.06)
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_released_probe_frees_its_slot():
+    breaker = CircuitBreaker("test", failure_threshold=1, open_interval=0.0)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+
+
+def test_disabled_breaker_never_opens():
+    breaker = CircuitBreaker("test", enabled=False, failure_threshold=1)
+    breaker.record_failure()
+    breaker.before_call()
+    assert breaker.state == CLOSED
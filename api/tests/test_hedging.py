@@ -0,0 +1,117 @@
+import threading
+import time
+
+from api.cancellation import CancelToken, cancellation_scope, get_cancel_token
+from api.errors import TranslationCancelled
+from api.health import get_backend_health
+from api.hedging import HedgeBudget, Hedger
+
+
+def make_hedger(latency: float = 0.05) -> Hedger:
+    """A hedger for Fake/primary with enough latency samples to hedge after 0.2s."""
+    for _ in range(20):
+        get_backend_health("Fake", "primary").record_success(latency, 10)
+    return Hedger({"enabled": True, "min_delay": 0.2, "budget": 1.0})
+
+
+def test_budget_caps_hedges():
+    budget = HedgeBudget(0.5, burst=1.0)
+    budget.record_request()
+    assert not budget.try_spend()
+    budget.record_request()
+    assert budget.try_spend()
+    assert not budget.try_spend()
+
+
+def test_fast_calls_are_not_hedged():
+    hedger = make_hedger()
+    secondary_calls = []
+    result = hedger.call(("Fake", "primary", lambda: "first"),
+                         ("Fake", "secondary", lambda: secondary_calls.append(1)))
+    assert result == "first"
+    assert secondary_calls == []
+
+
+def test_slow_call_is_hedged_and_the_loser_cancelled():
+    hedger = make_hedger()
+    cancelled = threading.Event()
+
+    def slow():
+        get_cancel_token().add_callback(cancelled.set)
+        time.sleep(1)
+        return "slow"
+
+    started = time.monotonic()
+    assert hedger.call(("Fake", "primary", slow), ("Fake", "secondary", lambda: "fast")) == "fast"
+    assert time.monotonic() - started < 0.8
+    assert cancelled.wait(1)
+
+
+def test_concurrent_calls_do_not_queue_into_hedges():
+    hedger = make_hedger()
+    secondary_calls = []
+    results = []
+
+    def call():
+        results.append(hedger.call(("Fake", "primary", lambda: time.sleep(0.12) or "first"),
+                                   ("Fake", "secondary", lambda: secondary_calls.append(1))))
+
+    threads = [threading.Thread(target=call) for _ in range(64)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["first"] * 64
+    assert secondary_calls == []
+
+
+def test_child_tokens_are_detached_from_the_caller():
+    hedger = make_hedger()
+    token = CancelToken()
+    with cancellation_scope(token):
+        for _ in range(5):
+            hedger.call(("Fake", "primary", lambda: "first"), ("Fake", "secondary", lambda: "second"))
+            list(hedger.stream(("Fake", "primary", lambda: iter(["a", "b"])),
+                               ("Fake", "secondary", lambda: iter(["c"]))))
+    assert token._callbacks == []
+
+
+def test_slow_stream_is_hedged():
+    hedger = make_hedger()
+
+    def slow_stream():
+        time.sleep(1)
+        yield "slow"
+
+    pieces = list(hedger.stream(("Fake", "primary", slow_stream), ("Fake", "secondary", lambda: iter(["fa", "st"]))))
+    assert pieces == ["fa", "st"]
+
+
+def test_cancelling_a_hedged_stream_ends_it():
+    hedger = make_hedger()
+    token = CancelToken()
+    pieces = []
+    errors = []
+
+    def ticking_stream():
+        for piece in ["a", "b", "c", "d"]:
+            yield piece
+            time.sleep(0.1)
+
+    def read():
+        with cancellation_scope(token):
+            try:
+                for piece in hedger.stream(("Fake", "primary", ticking_stream),
+                                           ("Fake", "secondary", lambda: iter(["x"]))):
+                    pieces.append(piece)
+                    token.cancel()
+            except Exception as e:
+                errors.append(e)
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    reader.join(2)
+    assert not reader.is_alive()
+    assert pieces == ["a"]
+    assert isinstance(errors[0], TranslationCancelled)
@@ -0,0 +1,49 @@
+from api.instances import get_configured_provider, get_provider_instance, invalidate_provider_instances
+from api.tests.fakes import FakeProvider
+
+
+def test_instances_are_reused_per_provider_and_key():
+    first = get_provider_instance("Fake", "key")
+    assert isinstance(first, FakeProvider)
+    assert first.api_key == "key"
+    assert get_provider_instance("Fake", "key") is first
+    assert get_provider_instance("Fake", "key", {}) is first
+
+    other = get_provider_instance("Fake", "other key")
+    assert other is not first
+    assert other.api_key == "other key"
+
+
+def test_additional_fields_are_applied_and_part_of_the_key(monkeypatch):
+    monkeypatch.setattr(FakeProvider, "set_region", lambda self, value: setattr(self, "region", value), raising=False)
+
+    eu = get_provider_instance("Fake", "key", {"region": "eu", "unknown": "ignored"})
+    assert eu.region == "eu"
+    assert get_provider_instance("Fake", "key", {"unknown": "ignored", "region": "eu"}) is eu
+    assert get_provider_instance("Fake", "key", {"region": "us"}) is not eu
+
+
+def test_changed_key_in_settings_gets_a_new_instance(settings):
+    first = get_configured_provider("Fake", settings)
+    assert get_configured_provider("Fake", settings) is first
+
+    settings.set_api_key("Fake", "new key")
+    second = get_configured_provider("Fake", settings)
+    assert second is not first
+    assert second.api_key == "new key"
+
+
+def test_invalidation_drops_instances_for_one_provider():
+    fake = get_provider_instance("Fake", "key")
+
+    invalidate_provider_instances("OpenAI")
+    assert get_provider_instance("Fake", "key") is fake
+
+    invalidate_provider_instances("Fake")
+    assert get_provider_instance("Fake", "key") is not fake
+
+
+def test_invalidation_without_a_provider_drops_everything():
+    fake = get_provider_instance("Fake", "key")
+    invalidate_provider_instances()
+    assert get_provider_instance("Fake", "key") is not fake
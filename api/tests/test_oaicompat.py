@@ -0,0 +1,104 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from api.circuit import OPEN, get_circuit_breaker
+from api.errors import CircuitOpenError, get_status_code, iter_error_chain
+from api.health import get_backend_health
+from api.oaicompat import OAICompatibleProvider
+
+
+class FakeServer:
+    """OpenAI-compatible server answering each path with a fixed (status, body)."""
+
+    def __init__(self):
+        self.responses = {"/v1/models": (200, {"data": [{"id": "local"}]})}
+        self.posts = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self):
+                status, body = server.responses.get(self.path, (404, {"error": "not found"}))
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._answer()
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                server.posts.append(self.path)
+                self._answer()
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, args=(0.05,), daemon=True).start()
+
+
+@pytest.fixture
+def server(settings):
+    fake_server = FakeServer()
+    yield fake_server
+    fake_server.httpd.shutdown()
+
+
+@pytest.fixture
+def provider(server):
+    oai_provider = OAICompatibleProvider()
+    oai_provider.set_api_url(server.url)
+    return oai_provider
+
+
+def test_translate_uses_chat_completions(server, provider):
+    server.responses["/v1/chat/completions"] = (200, {"choices": [{"message": {"content": " Bonjour "}}]})
+    assert provider.translate("Hello", "local", "English", "French") == "Bonjour"
+    assert server.posts == ["/v1/chat/completions"]
+
+
+def test_server_errors_are_retried_without_falling_back(server, provider):
+    server.responses["/v1/chat/completions"] = (500, {"error": "overloaded"})
+    with pytest.raises(Exception) as raised:
+        provider.translate("Hello", "local", "English", "French")
+    assert get_status_code(raised.value) == 500
+    # Every attempt of the retry policy went to chat completions
+    assert server.posts == ["/v1/chat/completions"] * 4
+
+
+def test_missing_chat_endpoint_falls_back_to_completions(server, provider):
+    server.responses["/v1/completions"] = (200, {"choices": [{"text": " Bonjour"}]})
+    assert provider.translate("Hello", "local", "English", "French") == "Bonjour"
+    assert server.posts == ["/v1/chat/completions", "/v1/completions"]
+
+
+def test_client_errors_are_not_retried(server, provider):
+    server.responses["/v1/chat/completions"] = (401, {"error": "bad key"})
+    with pytest.raises(Exception) as raised:
+        provider.translate("Hello", "local", "English", "French")
+    assert get_status_code(raised.value) == 401
+    assert server.posts == ["/v1/chat/completions"]
+
+
+def test_server_errors_open_the_circuit_and_count_as_failures(server, provider):
+    server.responses["/v1/chat/completions"] = (500, {"error": "overloaded"})
+    for _ in range(2):
+        with pytest.raises(Exception):
+            provider.translate("Hello", "local", "English", "French")
+
+    assert get_circuit_breaker(provider.get_endpoint()).get_stats()["state"] == OPEN
+    assert get_backend_health(provider.get_name(), "local").get_stats()["error_rate"] > 0.3
+
+    # An open circuit fails fast without calling the server
+    posts = len(server.posts)
+    with pytest.raises(Exception) as raised:
+        provider.translate("Hello", "local", "English", "French")
+    assert any(isinstance(error, CircuitOpenError) for error in iter_error_chain(raised.value))
+    assert len(server.posts) == posts
@@ -0,0 +1,132 @@
+import threading
+import time
+
+import pytest
+
+from api.cancellation import CancelToken, cancellation_scope
+from api.deadline import deadline_scope
+from api.errors import DeadlineExceeded, ProviderHTTPError, TranslationCancelled
+from api.ratelimit import RateLimiter, TokenBucket, configure_rate_limits, get_rate_limiter
+
+
+def test_throttling_halves_the_concurrency_limit():
+    limiter = RateLimiter(max_concurrency=8, min_concurrency=2)
+    for expected in (4, 2, 2):
+        limiter.acquire()
+        limiter.release(ProviderHTTPError(429, "slow down"))
+        assert limiter.concurrency_limit == expected
+    assert limiter.get_stats()["throttled"] == 3
+
+    # Other errors leave the limit alone
+    limiter.acquire()
+    limiter.release(ProviderHTTPError(500, "error"))
+    assert limiter.concurrency_limit == 2
+
+
+def test_successes_raise_the_limit_by_about_one_per_window():
+    limiter = RateLimiter(max_concurrency=4)
+    limiter.concurrency_limit = 2.0
+    for _ in range(2):
+        with limiter.limit():
+            pass
+    assert limiter.concurrency_limit == pytest.approx(2.9, abs=0.1)
+
+    for _ in range(20):
+        with limiter.limit():
+            pass
+    assert limiter.concurrency_limit == 4
+
+
+def test_retry_after_blocks_new_requests():
+    limiter = RateLimiter()
+    limiter.acquire()
+    limiter.release(ProviderHTTPError(429, "slow down", retry_after=0.2))
+
+    with deadline_scope(0.05):
+        with pytest.raises(DeadlineExceeded):
+            limiter.acquire()
+
+    started = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - started >= 0.1
+    limiter.release()
+
+
+def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(60)
+    bucket.tokens = 0.0
+    bucket.refill(bucket.updated + 0.5)
+    assert bucket.tokens == pytest.approx(0.5)
+    assert bucket.wait_time(1) == pytest.approx(0.5)
+    # Requests larger than the bucket only wait for a full bucket
+    assert bucket.wait_time(1000) == pytest.approx(59.5)
+    bucket.refill(bucket.updated + 3600)
+    assert bucket.tokens == 60
+
+
+def test_request_and_token_budgets_are_enforced():
+    limiter = RateLimiter(requests_per_minute=2)
+    for _ in range(2):
+        with limiter.limit():
+            pass
+    with deadline_scope(0.05):
+        with pytest.raises(DeadlineExceeded):
+            limiter.acquire()
+
+    limiter = RateLimiter(tokens_per_minute=1000)
+    with limiter.limit(tokens=900):
+        pass
+    with deadline_scope(0.05):
+        with pytest.raises(DeadlineExceeded):
+            limiter.acquire(tokens=200)
+
+
+def test_concurrency_cap_holds_requests_until_a_slot_frees():
+    limiter = RateLimiter(max_concurrency=2)
+    limiter.acquire()
+    limiter.acquire()
+
+    acquired = threading.Event()
+
+    def third():
+        limiter.acquire()
+        acquired.set()
+
+    thread = threading.Thread(target=third)
+    thread.start()
+    assert not acquired.wait(0.1)
+    limiter.release()
+    assert acquired.wait(1)
+    thread.join()
+    assert limiter.get_stats()["in_flight"] == 2
+
+
+def test_cancelling_wakes_a_waiting_request():
+    limiter = RateLimiter(max_concurrency=1)
+    limiter.acquire()
+    token = CancelToken()
+    errors = []
+
+    def wait():
+        with cancellation_scope(token):
+            try:
+                limiter.acquire()
+            except TranslationCancelled as e:
+                errors.append(e)
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    time.sleep(0.05)
+    token.cancel()
+    thread.join(1)
+    assert len(errors) == 1
+
+
+def test_models_with_their_own_limits_get_their_own_limiter():
+    configure_rate_limits({"Fake": {"max_concurrency": 3}, "Fake/big": {"max_concurrency": 1}})
+    try:
+        assert get_rate_limiter("Fake", "small") is get_rate_limiter("Fake", "other")
+        assert get_rate_limiter("Fake", "small").max_concurrency == 3
+        assert get_rate_limiter("Fake", "big").max_concurrency == 1
+    finally:
+        configure_rate_limits()
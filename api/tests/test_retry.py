@@ -0,0 +1,116 @@
+import pytest
+
+from api.cancellation import CancelToken, cancellation_scope
+from api.deadline import deadline_scope
+from api.errors import DeadlineExceeded, ProviderHTTPError, TranslationCancelled
+from api.retry import RetryPolicy, is_retryable
+
+
+class APIConnectionError(Exception):
+    """Stands in for the SDK error of the same name."""
+
+
+def test_transient_errors_are_retryable():
+    assert is_retryable(ProviderHTTPError(429, "slow down"))
+    assert is_retryable(ProviderHTTPError(503, "unavailable"))
+    assert is_retryable(ConnectionResetError("reset"))
+    assert is_retryable(TimeoutError("timed out"))
+    assert is_retryable(APIConnectionError("connection failed"))
+
+
+def test_permanent_errors_are_not_retryable():
+    assert not is_retryable(ProviderHTTPError(400, "bad request"))
+    assert not is_retryable(ProviderHTTPError(401, "unauthorized"))
+    assert not is_retryable(ValueError("bad answer"))
+    assert not is_retryable(DeadlineExceeded("out of time"))
+
+
+def test_wrapped_errors_are_classified_by_their_cause():
+    try:
+        try:
+            raise ProviderHTTPError(502, "bad gateway")
+        except Exception as e:
+            raise Exception(f"Translation error: {str(e)}") from e
+    except Exception as wrapped:
+        assert is_retryable(wrapped)
+
+
+def test_retry_after_sets_the_minimum_delay():
+    policy = RetryPolicy(base_delay=0.01, max_delay=0.01)
+    assert policy.get_delay(1, ProviderHTTPError(429, "slow down", retry_after=3.0)) == 3.0
+    assert policy.get_delay(5, ValueError()) <= 0.01
+
+
+def test_call_retries_transient_failures():
+    attempts = []
+
+    def request():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ProviderHTTPError(500, "error")
+        return "ok"
+
+    assert RetryPolicy(max_attempts=4, base_delay=0.001).call(request) == "ok"
+    assert len(attempts) == 3
+
+
+def test_call_gives_up_after_max_attempts():
+    attempts = []
+
+    def request():
+        attempts.append(1)
+        raise ProviderHTTPError(500, "error")
+
+    with pytest.raises(ProviderHTTPError):
+        RetryPolicy(max_attempts=2, base_delay=0.001).call(request)
+    assert len(attempts) == 2
+
+
+def test_call_does_not_retry_fatal_errors():
+    attempts = []
+
+    def request():
+        attempts.append(1)
+        raise ProviderHTTPError(401, "unauthorized")
+
+    with pytest.raises(ProviderHTTPError):
+        RetryPolicy(max_attempts=4, base_delay=0.001).call(request)
+    assert len(attempts) == 1
+
+
+def test_no_retry_once_the_deadline_is_too_close():
+    policy = RetryPolicy(max_attempts=4, base_delay=5, max_delay=5)
+    error = ProviderHTTPError(429, "slow down", retry_after=5)
+    with deadline_scope(1.0):
+        assert policy._should_retry(1, error, started=0) is None
+
+
+def test_no_retry_after_cancellation():
+    token = CancelToken()
+    attempts = []
+
+    def request():
+        attempts.append(1)
+        token.cancel()
+        raise ProviderHTTPError(500, "error")
+
+    with cancellation_scope(token):
+        with pytest.raises(TranslationCancelled):
+            RetryPolicy(max_attempts=4, base_delay=0.1).call(request)
+    assert len(attempts) == 1
+
+
+def test_stream_is_not_restarted_after_output():
+    calls = []
+
+    def stream():
+        calls.append(1)
+        yield "first"
+        raise ProviderHTTPError(500, "error")
+
+    pieces = []
+    with pytest.raises(ProviderHTTPError):
+        for piece in RetryPolicy(max_attempts=4, base_delay=0.001).stream(stream):
+            pieces.append(piece)
+    assert pieces == ["first"]
+    assert len(calls) == 1
@@ -0,0 +1,104 @@
+import time
+
+import pytest
+
+from api import router
+from api.errors import TranslationCancelled
+from api.health import get_backend_health
+from api.router import RouterProvider, configure_routing, rank_backends
+
+
+@pytest.fixture
+def route(settings, fake_provider, monkeypatch):
+    """Route "pair" over Fake/a, Fake/b and Fake/c, answering through answers[model]."""
+    settings.set_routing_settings({
+        "routes": {"pair": [["Fake", "a"], ["Fake", "b"], ["Fake", "c"]]},
+        "explore_probability": 0
+    })
+    configure_routing(settings)
+
+    answers = {model: (lambda text, model=model: f"{model}:{text}") for model in "abc"}
+    calls = []
+
+    def translate(self, text, model, source_language, target_language):
+        calls.append(model)
+        return self._send_request(model, text, lambda: answers[model](text))
+
+    monkeypatch.setattr(fake_provider, "translate", translate)
+    return answers, calls
+
+
+def record_latency(model: str, seconds: float, count: int = 5) -> None:
+    for _ in range(count):
+        get_backend_health("Fake", model).record_success(seconds, 10)
+
+
+def test_backends_are_ranked_by_average_latency(route):
+    record_latency("a", 0.5)
+    record_latency("b", 0.1)
+    # Untried backends go first so they get measured
+    assert rank_backends("pair") == [("Fake", "c"), ("Fake", "b"), ("Fake", "a")]
+
+    record_latency("c", 0.3)
+    assert rank_backends("pair") == [("Fake", "b"), ("Fake", "c"), ("Fake", "a")]
+
+
+def test_errors_inflate_the_expected_latency(route):
+    for model in "abc":
+        record_latency(model, 0.1 if model == "b" else 0.2)
+    get_backend_health("Fake", "b").error_rate = 0.6
+    get_backend_health("Fake", "b").last_failure = time.monotonic() - 3600
+    assert rank_backends("pair")[-1] == ("Fake", "b")
+
+
+def test_failing_backend_is_skipped_until_it_may_have_recovered(route):
+    for model in "abc":
+        record_latency(model, 0.1 if model == "a" else 0.2)
+    health = get_backend_health("Fake", "a")
+    for _ in range(5):
+        health.record_failure(0.1)
+    assert health.get_stats()["error_rate"] > 0.5
+    assert rank_backends("pair")[-1] == ("Fake", "a")
+
+    # After recovery_interval one request probes it again
+    health.last_failure = time.monotonic() - 31
+    health.latency = 0.05
+    assert rank_backends("pair")[0] == ("Fake", "a")
+
+
+def test_exploration_samples_another_healthy_backend(route, monkeypatch):
+    for model in "abc":
+        record_latency(model, {"a": 0.1, "b": 0.2, "c": 0.3}[model])
+    monkeypatch.setitem(router._routing, "explore_probability", 1.0)
+    monkeypatch.setattr(router.random, "randrange", lambda start, stop: stop - 1)
+    assert rank_backends("pair") == [("Fake", "c"), ("Fake", "a"), ("Fake", "b")]
+
+
+def test_failed_request_fails_over_to_the_next_backend(route):
+    answers, calls = route
+    record_latency("a", 0.1)
+    record_latency("b", 0.2)
+    record_latency("c", 0.3)
+
+    def down(text):
+        raise ConnectionRefusedError("down")
+
+    answers["a"] = down
+    assert RouterProvider().translate("Hello", "pair", "English", "French") == "b:Hello"
+    assert calls == ["a", "b"]
+    assert get_backend_health("Fake", "a").get_stats()["error_rate"] > 0
+
+
+def test_cancelled_request_does_not_fail_over(route):
+    answers, calls = route
+    record_latency("a", 0.1)
+    record_latency("b", 0.2)
+    record_latency("c", 0.3)
+
+    def cancelled(text):
+        raise TranslationCancelled("cancelled")
+
+    answers["a"] = cancelled
+    with pytest.raises(TranslationCancelled):
+        RouterProvider().translate("Hello", "pair", "English", "French")
+    assert calls == ["a"]
@@ -0,0 +1,173 @@
+import threading
+import time
+
+import pytest
+
+from api import service
+from api.cancellation import CancelToken, cancellation_scope
+from api.deadline import deadline_scope
+from api.errors import is_cancellation, is_deadline_exceeded
+from api.service import Replacement, TranslationService
+from utils.language_utils import AUTO_DETECT
+
+
+def wait_for_waiters(count: int = 1) -> None:
+    """Wait until count callers are waiting on the in-flight call."""
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        calls = list(service._in_flight._calls.values())
+        if calls and calls[0].waiters >= count:
+            return
+        time.sleep(0.01)
+    raise AssertionError("no caller joined the in-flight call")
+
+
+def wait_for_requests(provider, count: int) -> None:
+    """Wait until the provider has received count requests."""
+    deadline = time.monotonic() + 5
+    while len(provider.requests) < count:
+        if time.monotonic() > deadline:
+            raise AssertionError("the provider was not called")
+        time.sleep(0.01)
+
+
+def run_in_thread(fn):
+    """Run fn in a thread, returning the thread and a dict receiving its result or error."""
+    outcome = {}
+
+    def run():
+        try:
+            outcome["value"] = fn()
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, outcome
+
+
+def test_translate_caches_translations(settings, fake_provider):
+    translator = TranslationService(settings)
+    assert translator.translate("Fake", "m", "Good morning", "English", "French") == "<Good morning>"
+    assert translator.translate("Fake", "m", "Good morning", "English", "French") == "<Good morning>"
+    assert fake_provider.requests == ["Good morning"]
+
+
+def test_stream_waiter_takes_over_when_the_leader_stops_reading(settings, fake_provider, monkeypatch):
+    release = threading.Event()
+
+    def stream_answer(text):
+        yield "first "
+        release.wait(5)
+        yield "second"
+
+    monkeypatch.setattr(fake_provider, "stream_answer", staticmethod(stream_answer))
+    translator = TranslationService(settings)
+
+    leader = translator.translate_stream("Fake", "m", "Good evening", "English", "French")
+    assert next(leader) == "first "
+    thread, outcome = run_in_thread(lambda: "".join(
+        translator.translate_stream("Fake", "m", "Good evening", "English", "French")
+    ))
+    wait_for_waiters()
+    leader.close()
+    release.set()
+    thread.join(5)
+
+    assert outcome == {"value": "first second"}
+    assert len(fake_provider.requests) == 2
+
+
+def test_stream_waiter_takes_over_when_the_leader_is_cancelled(settings, fake_provider, monkeypatch):
+    def stream_answer(text):
+        yield "first "
+        time.sleep(0.3)
+        yield "second"
+
+    monkeypatch.setattr(fake_provider, "stream_answer", staticmethod(stream_answer))
+    translator = TranslationService(settings)
+    token = CancelToken()
+
+    def lead():
+        with cancellation_scope(token):
+            return "".join(translator.translate_stream("Fake", "m", "Good night", "English", "French"))
+
+    leader, leader_outcome = run_in_thread(lead)
+    wait_for_requests(fake_provider, 1)
+    waiter, waiter_outcome = run_in_thread(lambda: "".join(
+        translator.translate_stream("Fake", "m", "Good night", "English", "French")
+    ))
+    wait_for_waiters()
+    token.cancel()
+    leader.join(5)
+    waiter.join(5)
+
+    assert is_cancellation(leader_outcome["error"])
+    assert waiter_outcome == {"value": "first second"}
+
+
+def test_stream_waiter_keeps_its_own_deadline(settings, fake_provider, monkeypatch):
+    release = threading.Event()
+
+    def stream_answer(text):
+        release.wait(5)
+        yield "late"
+
+    monkeypatch.setattr(fake_provider, "stream_answer", staticmethod(stream_answer))
+    translator = TranslationService(settings)
+    leader, _ = run_in_thread(lambda: "".join(
+        translator.translate_stream("Fake", "m", "Good day", "English", "French")
+    ))
+    wait_for_requests(fake_provider, 1)
+
+    started = time.monotonic()
+    with deadline_scope(0.2), pytest.raises(Exception) as raised:
+        "".join(translator.translate_stream("Fake", "m", "Good day", "English", "French"))
+    assert is_deadline_exceeded(raised.value)
+    assert time.monotonic() - started < 2
+    release.set()
+    leader.join(5)
+
+
+def test_stream_replaces_a_translation_that_lost_a_placeholder(settings, fake_provider, monkeypatch):
+    def stream_answer(text):
+        if "⟦" in text:
+            return ["Visitez ", "maintenant"]  # The masked URL was dropped
+        return [f"<{text}>"]
+
+    monkeypatch.setattr(fake_provider, "stream_answer", staticmethod(stream_answer))
+    translator = TranslationService(settings)
+    pieces = list(translator.translate_stream("Fake", "m", "Visit https://example.com now", "English", "French"))
+
+    assert "".join(pieces[:-1]) == "Visitez maintenant"
+    assert isinstance(pieces[-1], Replacement)
+    assert pieces[-1] == "<Visit https://example.com now>"
+
+
+def test_stream_keeps_intact_placeholders(settings, fake_provider, monkeypatch):
+    monkeypatch.setattr(fake_provider, "stream_answer", staticmethod(lambda text: ["Visitez ", text[6:]]))
+    translator = TranslationService(settings)
+    pieces = list(translator.translate_stream("Fake", "m", "Visit https://example.com now", "English", "French"))
+
+    assert "".join(pieces) == "Visitez https://example.com now"
+    assert not any(isinstance(piece, Replacement) for piece in pieces)
+
+
+def test_undetected_text_keeps_auto_detect(settings, fake_provider, monkeypatch):
+    sources = []
+    translate = fake_provider.translate
+
+    def record_source(self, text, model, source_language, target_language):
+        sources.append(source_language)
+        return translate(self, text, model, source_language, target_language)
+
+    monkeypatch.setattr(fake_provider, "translate", record_source)
+    translator = TranslationService(settings)
+    assert translator.translate("Fake", "m", "Cancel", AUTO_DETECT, "French") == "<Cancel>"
+    assert translator.translate("Fake", "m", "Ciao, come stai?", AUTO_DETECT, "French") == "<Ciao, come stai?>"
+    assert sources == [AUTO_DETECT, "Italian"]
+
+    sources.clear()
+    translations = translator.translate_batch("Fake", "m", ["Save", "Hello, how are you?"], AUTO_DETECT, "French")
+    assert translations == ["<Save>", "<Hello, how are you?>"]
+    assert sorted(sources) == sorted([AUTO_DETECT, "English"])
@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from api.cancellation import CancelToken, cancellation_scope
+from api.errors import DeadlineExceeded, TranslationCancelled
+from api.singleflight import CallAbandoned, SingleFlight
+
+
+def start_leader(flight, key, release, result="done"):
+    """Start a leader in a thread that blocks until release is set."""
+    started = threading.Event()
+    outcome = {}
+
+    def leader():
+        def fn():
+            started.set()
+            release.wait(5)
+            if isinstance(result, BaseException):
+                raise result
+            return result
+        try:
+            outcome["value"] = flight.do(key, fn)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    assert started.wait(5)
+    return thread, outcome
+
+
+def test_waiters_share_the_leaders_result():
+    flight = SingleFlight()
+    release = threading.Event()
+    thread, outcome = start_leader(flight, "key", release)
+
+    call, is_leader = flight.begin("key")
+    assert not is_leader
+    release.set()
+    assert call.wait(5) == "done"
+    thread.join()
+    assert outcome["value"] == ("done", False)
+    assert flight.in_flight() == 0
+
+
+def test_waiters_share_the_leaders_error():
+    flight = SingleFlight()
+    release = threading.Event()
+    thread, _ = start_leader(flight, "key", release, result=ValueError("boom"))
+
+    call, _ = flight.begin("key")
+    release.set()
+    with pytest.raises(ValueError):
+        call.wait(5)
+    thread.join()
+
+
+def test_calls_are_not_remembered():
+    flight = SingleFlight()
+    calls = []
+    for _ in range(2):
+        assert flight.do("key", lambda: calls.append(1) or len(calls)) == (len(calls), False)
+    assert len(calls) == 2
+
+
+def test_waiter_times_out():
+    flight = SingleFlight()
+    release = threading.Event()
+    thread, _ = start_leader(flight, "key", release)
+
+    call, _ = flight.begin("key")
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        call.wait(0.1)
+    assert time.monotonic() - started < 1
+    release.set()
+    thread.join()
+
+
+def test_cancelled_waiter_stops_without_disturbing_the_leader():
+    flight = SingleFlight()
+    release = threading.Event()
+    thread, outcome = start_leader(flight, "key", release)
+
+    call, _ = flight.begin("key")
+    token = CancelToken()
+    threading.Timer(0.1, token.cancel).start()
+    with cancellation_scope(token), pytest.raises(TranslationCancelled):
+        call.wait(5)
+    release.set()
+    thread.join()
+    assert outcome["value"] == ("done", False)
+
+
+def test_interrupted_leader_abandons_the_call():
+    flight = SingleFlight()
+    release = threading.Event()
+    thread, outcome = start_leader(flight, "key", release, result=KeyboardInterrupt())
+
+    call, _ = flight.begin("key")
+    release.set()
+    with pytest.raises(CallAbandoned):
+        call.wait(5)
+    thread.join()
+    assert isinstance(outcome["error"], KeyboardInterrupt)
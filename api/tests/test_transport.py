@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+import api.transport
+from api.deadline import deadline_scope
+from api.service import configure_provider_layer
+from api.transport import DEFAULT_TRANSPORT_SETTINGS, configure_transport, get_transport, iter_sse_events
+
+
+@pytest.fixture(autouse=True)
+def fresh_transport(monkeypatch):
+    """Start each test without a shared transport."""
+    monkeypatch.setattr(api.transport, "_transport", None)
+    yield
+    if api.transport._transport is not None:
+        api.transport._transport.close()
+
+
+def test_shared_transport_is_reused():
+    transport = get_transport()
+    assert get_transport() is transport
+    assert transport.pool_maxsize == DEFAULT_TRANSPORT_SETTINGS["pool_maxsize"]
+    assert transport.get_timeout() == (10.0, 120.0)
+
+
+def test_sessions_per_thread_share_one_pool():
+    transport = get_transport()
+    sessions = [transport._get_session()]
+    thread = threading.Thread(target=lambda: sessions.append(transport._get_session()))
+    thread.start()
+    thread.join()
+
+    assert sessions[0] is transport._get_session()
+    assert sessions[0] is not sessions[1]
+    assert sessions[0].get_adapter("https://example.com") is sessions[1].get_adapter("https://example.com")
+
+
+def test_settings_override_the_defaults(settings):
+    settings.set_http_settings({"pool_maxsize": 32, "read_timeout": 30.0, "unknown": 1})
+    configure_provider_layer(settings)
+
+    transport = get_transport()
+    assert transport.pool_maxsize == 32
+    assert transport.pool_connections == DEFAULT_TRANSPORT_SETTINGS["pool_connections"]
+    assert transport.get_timeout() == (10.0, 30.0)
+
+
+def test_reconfiguring_replaces_and_closes_the_old_transport():
+    old = get_transport()
+    old._get_session()
+    assert old._adapter is not None
+
+    new = configure_transport({"pool_maxsize": 4})
+    assert new is not old
+    assert get_transport() is new
+    assert old._adapter is None
+
+
+def test_http2_falls_back_without_httpx(monkeypatch):
+    monkeypatch.setattr(api.transport.HttpTransport, "_create_http2_client", lambda self: None)
+    transport = configure_transport({"http2": True})
+    assert transport.http2
+    assert transport._http2_client is None
+
+
+def test_timeouts_are_capped_by_the_deadline():
+    transport = configure_transport({"connect_timeout": 5.0, "read_timeout": 60.0})
+    assert transport._resolve_timeout(2.0) == (2.0, 2.0)
+    assert transport._resolve_timeout((3.0, 7.0)) == (3.0, 7.0)
+
+    with deadline_scope(1.0):
+        connect_timeout, read_timeout = transport.get_timeout()
+    assert connect_timeout <= 1.0
+    assert read_timeout <= 1.0
+
+
+def test_sse_events_stop_at_done():
+    lines = ["", ": comment", 'data: {"a": 1}', "data:", 'data: {"b": 2}', "data: [DONE]", 'data: {"c": 3}']
+    assert list(iter_sse_events(lines)) == [{"a": 1}, {"b": 2}]
@@ -0,0 +1,233 @@
+import json
+import socket
+import threading
+from typing import Dict, Any, Optional, Tuple, Union, Iterator, Iterable
+
+from api.cancellation import on_cancel
+from api.deadline import bound_timeouts
+from api.errors import raise_for_status
+
+
+# Defaults for the shared HTTP transport (overridable from settings)
+DEFAULT_TRANSPORT_SETTINGS = {
+    "pool_connections": 10,   # Number of per-host pools to keep
+    "pool_maxsize": 10,       # Keep-alive connections per host
+    "connect_timeout": 10.0,  # Seconds to establish a connection
+    "read_timeout": 120.0,    # Seconds to wait between bytes of the response
+    "http2": False            # Use HTTP/2 multiplexing when httpx[http2] is installed
+}
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class HttpTransport:
+    """Shared keep-alive HTTP transport for providers that talk raw HTTP.
+
+    Connections are pooled per host and reused across calls and threads. When
+    HTTP/2 is requested and httpx with h2 support is available, requests are
+    multiplexed over a single connection per host instead.
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 connect_timeout: float = 10.0, read_timeout: float = 120.0,
+                 http2: bool = False):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.http2 = http2
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._adapter = None
+        self._http2_client = None
+
+        if http2:
+            self._http2_client = self._create_http2_client()
+
+    def _create_http2_client(self):
+        """Create an httpx client with HTTP/2 enabled, or None if unavailable."""
+        try:
+            import httpx
+            import h2  # noqa: F401 - required by httpx for HTTP/2
+        except ImportError:
+            print("HTTP/2 requested but httpx[http2] is not installed, using HTTP/1.1")
+            return None
+
+        return httpx.Client(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=self.pool_connections * self.pool_maxsize,
+                max_keepalive_connections=self.pool_maxsize
+            ),
+            timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        )
+
+    def _get_adapter(self):
+        """Get the connection-pooling adapter shared by all sessions."""
+        with self._lock:
+            if self._adapter is None:
+                from requests.adapters import HTTPAdapter
+                self._adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize
+                )
+            return self._adapter
+
+    def _get_session(self):
+        """Get this thread's session; all sessions share one set of pools."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            import requests
+            adapter = self._get_adapter()
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._local.session = session
+        return session
+
+    def get_timeout(self) -> Tuple[float, float]:
+        """Get the (connect, read) timeouts for a request, capped by the caller's deadline."""
+        return bound_timeouts(self.connect_timeout, self.read_timeout)
+
+    def _resolve_timeout(self, timeout: Optional[Timeout]) -> Tuple[float, float]:
+        """Turn a timeout argument into a (connect, read) pair, capped by the caller's deadline."""
+        if timeout is None:
+            return self.get_timeout()
+        if isinstance(timeout, tuple):
+            return bound_timeouts(*timeout)
+        return bound_timeouts(min(self.connect_timeout, timeout), timeout)
+
+    def request(self, method: str, url: str, timeout: Optional[Timeout] = None, **kwargs):
+        """Send an HTTP request over the pooled connections."""
+        connect_timeout, read_timeout = self._resolve_timeout(timeout)
+
+        if self._http2_client is not None:
+            import httpx
+            return self._http2_client.request(
+                method, url,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                **kwargs
+            )
+
+        return self._get_session().request(
+            method, url, timeout=(connect_timeout, read_timeout), **kwargs
+        )
+
+    def get(self, url: str, **kwargs):
+        """Send a GET request."""
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        """Send a POST request."""
+        return self.request("POST", url, **kwargs)
+
+    def stream_lines(self, method: str, url: str, timeout: Optional[Timeout] = None, **kwargs) -> Iterator[str]:
+        """Send a request and yield the response body line by line as it arrives.
+
+        Cancelling the current translation closes the response, aborting a
+        read that is waiting on the network.
+        """
+        connect_timeout, read_timeout = self._resolve_timeout(timeout)
+
+        if self._http2_client is not None:
+            import httpx
+            with self._http2_client.stream(
+                method, url,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                **kwargs
+            ) as response, on_cancel(response.close):
+                if response.status_code != 200:
+                    response.read()
+                    raise_for_status(response)
+                for line in response.iter_lines():
+                    yield line
+            return
+
+        response = self._get_session().request(
+            method, url, timeout=(connect_timeout, read_timeout), stream=True, **kwargs
+        )
+        try:
+            raise_for_status(response)
+            with on_cancel(lambda: _abort_response(response)):
+                for line in response.iter_lines():
+                    yield line.decode("utf-8", errors="replace")
+        finally:
+            # Closing the response returns (or drops) the connection
+            response.close()
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._lock:
+            if self._adapter is not None:
+                self._adapter.close()
+                self._adapter = None
+            if self._http2_client is not None:
+                self._http2_client.close()
+                self._http2_client = None
+        self._local = threading.local()
+
+
+def _abort_response(response) -> None:
+    """Close a streaming response from another thread, waking a read blocked on its socket.
+
+    Closing alone does not interrupt a blocked read, so the socket behind a
+    requests/urllib3 response is shut down first; the connection is dropped
+    rather than returned to the pool.
+    """
+    raw = getattr(response, "raw", None)
+    sock = getattr(getattr(raw, "_connection", None), "sock", None)
+    if sock is None:
+        # http.client drops the connection's socket once the response owns it;
+        # it is still reachable through the response's file object
+        body = getattr(getattr(raw, "_fp", None), "fp", None)
+        sock = getattr(getattr(body, "raw", None), "_sock", None)
+    if sock is not None:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass  # Already closed
+    response.close()
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """Parse server-sent event lines into JSON payloads, stopping at [DONE]."""
+    for line in lines:
+        if not line.startswith("data:"):
+            continue
+
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return
+        if data:
+            yield json.loads(data)
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def configure_transport(options: Optional[Dict[str, Any]] = None) -> HttpTransport:
+    """Replace the shared transport with one built from the given options."""
+    global _transport
+
+    transport_settings = dict(DEFAULT_TRANSPORT_SETTINGS)
+    for key, value in (options or {}).items():
+        if key in transport_settings:
+            transport_settings[key] = value
+
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+        _transport = HttpTransport(**transport_settings)
+        return _transport
+
+
+def get_transport() -> HttpTransport:
+    """Get the shared transport, creating it with default options if needed."""
+    global _transport
+
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport(**DEFAULT_TRANSPORT_SETTINGS)
+        return _transport
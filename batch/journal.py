@@ -0,0 +1,189 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.chunking import split_into_chunks, translate_chunks
+
+
+def make_job_id(inputs: List[str], **params: Any) -> str:
+    """Identify a job by its input files (path, size, mtime) and its parameters."""
+    parts = []
+    for path in inputs:
+        stat = os.stat(path)
+        parts.append([os.path.abspath(path), stat.st_size, int(stat.st_mtime)])
+    payload = json.dumps({"inputs": parts, "params": params}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def get_journal_path(app_dir: str, job_id: str) -> str:
+    """Get the journal database path for a job under the app directory."""
+    return os.path.join(app_dir, "journals", f"{job_id}.db")
+
+
+def get_segment_key(key: str, index: int) -> str:
+    """Get the journal key of one segment of a document, e.g. notes.txt#3."""
+    return f"{key}#{index}"
+
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BatchJournal:
+    """Durable progress journal for a bulk translation job.
+
+    Every segment's outcome (its translation or the error it failed with) is
+    recorded together with the provider and model that produced it. When a
+    job is restarted with the same inputs, finished segments are served from
+    the journal and only unfinished or failed segments are sent to the
+    provider again. Writes are committed in small batches so a crash loses at
+    most the last commit_interval seconds of work.
+    """
+
+    def __init__(self, db_path: str, provider: str, model: str,
+                 commit_every: int = 50, commit_interval: float = 1.0):
+        self.db_path = db_path
+        self.provider = provider
+        self.model = model
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+
+        self.reused = 0
+        self.recorded = 0
+
+        self._lock = threading.Lock()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            " key TEXT PRIMARY KEY,"
+            " source_hash TEXT NOT NULL,"
+            " status TEXT NOT NULL,"
+            " translation TEXT,"
+            " error TEXT,"
+            " provider TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " attempts INTEGER NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get_done(self, key: str, text: str) -> Optional[str]:
+        """Get the journaled translation of a finished segment, if its source is unchanged."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT translation FROM segments"
+                " WHERE key = ? AND source_hash = ? AND status = 'done'"
+                " AND provider = ? AND model = ?",
+                (key, _hash_text(text), self.provider, self.model)
+            ).fetchone()
+            if row is None:
+                return None
+            self.reused += 1
+            return row[0]
+
+    def _record(self, key: str, text: str, status: str,
+                translation: Optional[str], error: Optional[str]) -> None:
+        with self._lock:
+            self._connection.execute(
+                "INSERT INTO segments"
+                " (key, source_hash, status, translation, error, provider, model, attempts, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, 1, ?)"
+                " ON CONFLICT(key) DO UPDATE SET"
+                " source_hash = excluded.source_hash, status = excluded.status,"
+                " translation = excluded.translation, error = excluded.error,"
+                " provider = excluded.provider, model = excluded.model,"
+                " attempts = segments.attempts + 1, updated = excluded.updated",
+                (key, _hash_text(text), status, translation, error,
+                 self.provider, self.model, time.time())
+            )
+            self.recorded += 1
+            self._uncommitted += 1
+
+            now = time.monotonic()
+            if self._uncommitted >= self.commit_every or now - self._last_commit >= self.commit_interval:
+                self._connection.commit()
+                self._uncommitted = 0
+                self._last_commit = now
+
+    def mark_done(self, key: str, text: str, translation: str) -> None:
+        """Record a finished segment."""
+        self._record(key, text, "done", translation, None)
+
+    def mark_failed(self, key: str, text: str, error: str) -> None:
+        """Record a failed segment so the next run retries it."""
+        self._record(key, text, "failed", None, error)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get segment counts by status plus this run's reuse counter."""
+        with self._lock:
+            counts = dict(self._connection.execute(
+                "SELECT status, COUNT(*) FROM segments GROUP BY status"
+            ).fetchall())
+        return {
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "reused": self.reused,
+            "recorded": self.recorded
+        }
+
+    def flush(self) -> None:
+        """Commit any buffered writes."""
+        with self._lock:
+            self._connection.commit()
+            self._uncommitted = 0
+            self._last_commit = time.monotonic()
+
+    def close(self) -> None:
+        """Commit and close the database connection."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+    def discard(self) -> None:
+        """Close the journal and delete it from disk."""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            path = self.db_path + suffix
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def translate_document(journal: BatchJournal, key: str, text: str, translate_fn: Callable[[str], str],
+                       max_tokens: int, max_workers: int = 4) -> str:
+    """Translate a document chunk by chunk, journaling every chunk on its own.
+
+    Chunks are journaled under get_segment_key(key, index), so a document
+    interrupted partway through resumes from the chunks it had not finished.
+    Repeated chunks share the key of their first occurrence.
+    """
+    pieces = split_into_chunks(text, max_tokens)
+    segment_keys: Dict[str, str] = {}
+    chunks = [piece for piece, translatable in pieces if translatable]
+    for index, chunk in enumerate(chunks):
+        segment_keys.setdefault(chunk, get_segment_key(key, index))
+
+    def translate_chunk(chunk: str) -> str:
+        segment_key = segment_keys[chunk]
+        translation = journal.get_done(segment_key, chunk)
+        if translation is not None:
+            return translation
+
+        try:
+            translation = translate_fn(chunk)
+        except Exception as e:
+            journal.mark_failed(segment_key, chunk, str(e))
+            raise
+        journal.mark_done(segment_key, chunk, translation)
+        return translation
+
+    return "".join(translate_chunks(pieces, translate_chunk, max_workers=max_workers))
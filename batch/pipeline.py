@@ -0,0 +1,241 @@
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from batch.journal import BatchJournal
+from utils.chunking import estimate_tokens
+from utils.dedup import get_dedup_stats, segment_key, split_whitespace
+
+
+ERROR_FIELD = "_translation_error"
+
+
+def get_field(record: Any, path: str) -> Any:
+    """Get a value from a nested record by dotted path ("meta.title", "items.0.text")."""
+    value = record
+    for key in path.split("."):
+        if isinstance(value, list):
+            if not key.isdigit() or int(key) >= len(value):
+                return None
+            value = value[int(key)]
+        elif isinstance(value, dict):
+            if key not in value:
+                return None
+            value = value[key]
+        else:
+            return None
+    return value
+
+
+def set_field(record: Any, path: str, new_value: Any) -> None:
+    """Set a value in a nested record by dotted path (parents must exist)."""
+    keys = path.split(".")
+    parent = record
+    for key in keys[:-1]:
+        parent = parent[int(key)] if isinstance(parent, list) else parent[key]
+
+    last = keys[-1]
+    if isinstance(parent, list):
+        parent[int(last)] = new_value
+    else:
+        parent[last] = new_value
+
+
+class PipelineStats:
+    """Running counters for a bulk translation job."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.records = 0
+        self.segments = 0
+        self.tokens = 0
+        self.errors = 0
+        self.duplicates = 0
+
+    def get_summary(self) -> Dict[str, float]:
+        """Get the counters plus throughput rates and dedup savings."""
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        summary = {
+            "records": self.records,
+            "errors": self.errors,
+            "elapsed": round(elapsed, 2),
+            "records_per_sec": round(self.records / elapsed, 2),
+            "tokens_per_sec": round(self.tokens / elapsed, 2)
+        }
+        summary.update(get_dedup_stats(self.segments, self.segments - self.duplicates))
+        return summary
+
+    def format(self) -> str:
+        """Format the summary as a one-line progress message."""
+        summary = self.get_summary()
+        return (
+            f"{summary['records']} records ({summary['errors']} errors) in {summary['elapsed']}s, "
+            f"{summary['records_per_sec']} records/s, {summary['tokens_per_sec']} tokens/s, "
+            f"{summary['calls_saved']} duplicate segments reused ({summary['dedup_ratio']:.1%})"
+        )
+
+
+class JsonlPipeline:
+    """Stream JSONL records through a translation function with bounded memory.
+
+    Records are read lazily, translated on a bounded worker pool and written
+    out either in input order or in completion order. At most max_pending
+    records are held in memory at once; reading pauses until the writer
+    catches up, so memory stays flat regardless of the input size.
+
+    Segments that repeat across records are sent to the provider once and the
+    result is copied to every occurrence, keeping each one's outer whitespace.
+    The most recent max_dedup_entries distinct segments are remembered.
+
+    With a journal, each field's outcome is recorded under its line number and
+    path, and segments finished by an earlier run are reused instead of being
+    translated again.
+    """
+
+    def __init__(self, translate_fn: Callable[[str], str], fields: List[str],
+                 max_workers: int = 8, max_pending: Optional[int] = None,
+                 ordered: bool = True, output_suffix: str = "",
+                 progress_interval: float = 5.0, progress_stream: Optional[TextIO] = None,
+                 journal: Optional[BatchJournal] = None, max_dedup_entries: int = 100000):
+        self.translate_fn = translate_fn
+        self.fields = fields
+        self.max_workers = max_workers
+        self.max_pending = max_pending or max_workers * 4
+        self.ordered = ordered
+        self.output_suffix = output_suffix
+        self.progress_interval = progress_interval
+        self.progress_stream = progress_stream if progress_stream is not None else sys.stderr
+        self.journal = journal
+        self.max_dedup_entries = max_dedup_entries
+        self.stats = PipelineStats()
+        self._seen: OrderedDict = OrderedDict()
+        self._seen_lock = threading.Lock()
+        self._last_progress = time.monotonic()
+
+    def _translate_unique(self, text: str) -> str:
+        """Translate a segment, sharing the result with every repeat of it in the job."""
+        leading, core, trailing = split_whitespace(text)
+        key = segment_key(core)
+
+        with self._seen_lock:
+            future = self._seen.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._seen[key] = future
+                if len(self._seen) > self.max_dedup_entries:
+                    self._seen.popitem(last=False)
+            else:
+                self._seen.move_to_end(key)
+                self.stats.duplicates += 1
+
+        if is_owner:
+            try:
+                future.set_result(self.translate_fn(core).strip())
+            except Exception as e:
+                future.set_exception(e)
+                # Forget the failure so a later repeat tries again
+                with self._seen_lock:
+                    if self._seen.get(key) is future:
+                        del self._seen[key]
+        return leading + future.result() + trailing
+
+    def _translate_segment(self, key: str, text: str) -> str:
+        """Translate one field value, going through the journal if there is one."""
+        if self.journal is None:
+            return self._translate_unique(text)
+
+        translation = self.journal.get_done(key, text)
+        if translation is not None:
+            return translation
+
+        try:
+            translation = self._translate_unique(text)
+        except Exception as e:
+            self.journal.mark_failed(key, text, str(e))
+            raise
+        self.journal.mark_done(key, text, translation)
+        return translation
+
+    def translate_record(self, line: str, line_number: int = 0) -> Tuple[Dict[str, Any], int, int]:
+        """Translate the configured fields of one JSONL line.
+
+        Returns the output record, the number of segments translated and the
+        estimated source tokens. Errors are recorded on the record itself.
+        """
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            return {"_raw": line.rstrip("\n"), ERROR_FIELD: f"Invalid JSON: {str(e)}"}, 0, 0
+
+        segments = 0
+        tokens = 0
+        try:
+            for path in self.fields:
+                value = get_field(record, path)
+                if not isinstance(value, str) or not value.strip():
+                    continue
+                translation = self._translate_segment(f"{line_number}:{path}", value)
+                set_field(record, path + self.output_suffix, translation)
+                segments += 1
+                tokens += estimate_tokens(value)
+        except Exception as e:
+            record[ERROR_FIELD] = str(e)
+        return record, segments, tokens
+
+    def _write(self, output: TextIO, result: Tuple[Dict[str, Any], int, int]) -> None:
+        """Write one finished record and update the counters."""
+        record, segments, tokens = result
+        output.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        self.stats.records += 1
+        self.stats.segments += segments
+        self.stats.tokens += tokens
+        if isinstance(record, dict) and ERROR_FIELD in record:
+            self.stats.errors += 1
+
+        now = time.monotonic()
+        if self.progress_interval and now - self._last_progress >= self.progress_interval:
+            self._last_progress = now
+            print(self.stats.format(), file=self.progress_stream, flush=True)
+
+    def run(self, lines: Iterable[str], output: TextIO) -> Dict[str, float]:
+        """Translate every non-blank line and write the results; returns the summary."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = deque()
+            for line_number, line in enumerate(lines):
+                if not line.strip():
+                    continue
+
+                # Backpressure: wait for room before reading further
+                while len(pending) >= self.max_pending:
+                    self._drain(pending, output, block=True)
+
+                pending.append(executor.submit(self.translate_record, line, line_number))
+                self._drain(pending, output, block=False)
+
+            while pending:
+                self._drain(pending, output, block=True)
+
+        output.flush()
+        if self.journal is not None:
+            self.journal.flush()
+        return self.stats.get_summary()
+
+    def _drain(self, pending: deque, output: TextIO, block: bool) -> None:
+        """Write finished records (in input order if ordered)."""
+        if self.ordered:
+            if block:
+                self._write(output, pending.popleft().result())
+            while pending and pending[0].done():
+                self._write(output, pending.popleft().result())
+            return
+
+        done, _ = wait(pending, timeout=None if block else 0, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+            self._write(output, future.result())
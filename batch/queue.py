@@ -0,0 +1,337 @@
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from api.errors import is_deadline_exceeded
+from api.retry import is_retryable
+
+
+class Job:
+    """A leased job, as handed to a worker."""
+
+    def __init__(self, job_id: int, payload: Dict[str, Any], attempts: int):
+        self.id = job_id
+        self.payload = payload
+        self.attempts = attempts
+
+
+class JobQueue:
+    """Persistent priority queue of translation jobs in SQLite.
+
+    Producers enqueue documents or segments; workers in any number of local
+    processes lease them for a visibility timeout, translate them and commit
+    the result. A lease that is not completed or extended in time is treated
+    as abandoned (the worker crashed or hung) and the job becomes available
+    again. Failed jobs are retried with backoff until max_attempts.
+    """
+
+    def __init__(self, db_path: str, busy_timeout: float = 30.0):
+        self.db_path = db_path
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # Autocommit mode so writes can use explicit BEGIN IMMEDIATE transactions
+        self._connection = sqlite3.connect(db_path, timeout=busy_timeout,
+                                           isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " priority INTEGER NOT NULL,"
+            " status TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " result TEXT,"
+            " error TEXT,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " max_attempts INTEGER NOT NULL,"
+            " available_at REAL NOT NULL,"
+            " lease_owner TEXT,"
+            " lease_expires REAL,"
+            " created REAL NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (status, priority DESC, id)"
+        )
+
+    def _transaction(self, statements):
+        """Run statements(cursor) in a write transaction and return its result."""
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(cursor)
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            cursor.execute("COMMIT")
+            return result
+
+    def enqueue(self, text: str, provider: str, model: str, source_language: str,
+                target_language: str, priority: int = 0, max_attempts: int = 3,
+                metadata: Optional[Dict[str, Any]] = None) -> int:
+        """Add one job; higher priority jobs are leased first. Returns the job ID."""
+        return self.enqueue_many([{
+            "text": text, "provider": provider, "model": model,
+            "source_language": source_language, "target_language": target_language,
+            "metadata": metadata or {}
+        }], priority=priority, max_attempts=max_attempts)[0]
+
+    def enqueue_many(self, payloads: List[Dict[str, Any]], priority: int = 0,
+                     max_attempts: int = 3) -> List[int]:
+        """Add many jobs in a single transaction. Returns their IDs."""
+        now = time.time()
+
+        def insert(cursor):
+            job_ids = []
+            for payload in payloads:
+                cursor.execute(
+                    "INSERT INTO jobs (priority, status, payload, max_attempts, available_at, created, updated)"
+                    " VALUES (?, 'queued', ?, ?, ?, ?, ?)",
+                    (priority, json.dumps(payload, ensure_ascii=False), max_attempts, now, now, now)
+                )
+                job_ids.append(cursor.lastrowid)
+            return job_ids
+
+        return self._transaction(insert)
+
+    def lease(self, worker_id: str, visibility_timeout: float = 600.0, limit: int = 1) -> List[Job]:
+        """Lease up to limit ready jobs, reclaiming expired leases first."""
+        now = time.time()
+
+        def take(cursor):
+            self._reclaim(cursor, now)
+            rows = cursor.execute(
+                "SELECT id, payload, attempts FROM jobs"
+                " WHERE status = 'queued' AND available_at <= ?"
+                " ORDER BY priority DESC, id LIMIT ?",
+                (now, limit)
+            ).fetchall()
+            for job_id, _, _ in rows:
+                cursor.execute(
+                    "UPDATE jobs SET status = 'leased', lease_owner = ?, lease_expires = ?,"
+                    " attempts = attempts + 1, updated = ? WHERE id = ?",
+                    (worker_id, now + visibility_timeout, now, job_id)
+                )
+            return [Job(job_id, json.loads(payload), attempts + 1) for job_id, payload, attempts in rows]
+
+        return self._transaction(take)
+
+    @staticmethod
+    def _reclaim(cursor, now: float) -> int:
+        """Return jobs with expired leases to the queue (or fail them if out of attempts)."""
+        cursor.execute(
+            "UPDATE jobs SET status = 'failed', error = 'Lease expired', lease_owner = NULL,"
+            " updated = ? WHERE status = 'leased' AND lease_expires < ? AND attempts >= max_attempts",
+            (now, now)
+        )
+        cursor.execute(
+            "UPDATE jobs SET status = 'queued', lease_owner = NULL, lease_expires = NULL,"
+            " updated = ? WHERE status = 'leased' AND lease_expires < ?",
+            (now, now)
+        )
+        return cursor.rowcount
+
+    def reclaim_expired(self) -> int:
+        """Requeue jobs whose leases have expired. Returns how many were requeued."""
+        return self._transaction(lambda cursor: self._reclaim(cursor, time.time()))
+
+    def extend_leases(self, worker_id: str, job_ids: List[int], visibility_timeout: float) -> None:
+        """Push back the lease expiry of jobs this worker still holds."""
+        if not job_ids:
+            return
+        now = time.time()
+
+        def extend(cursor):
+            cursor.executemany(
+                "UPDATE jobs SET lease_expires = ?, updated = ?"
+                " WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                [(now + visibility_timeout, now, job_id, worker_id) for job_id in job_ids]
+            )
+
+        self._transaction(extend)
+
+    def complete(self, job_id: int, worker_id: str, result: str) -> bool:
+        """Commit a job's result. Returns False if the lease was lost to another worker."""
+        now = time.time()
+
+        def finish(cursor):
+            cursor.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_owner = NULL,"
+                " updated = ? WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (result, now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+
+        return self._transaction(finish)
+
+    def fail(self, job_id: int, worker_id: str, error: str, retryable: bool = True,
+             backoff: float = 5.0) -> bool:
+        """Record a failed attempt; the job is requeued with backoff while attempts remain."""
+        now = time.time()
+
+        def record(cursor):
+            row = cursor.execute(
+                "SELECT attempts, max_attempts FROM jobs"
+                " WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (job_id, worker_id)
+            ).fetchone()
+            if row is None:
+                return False
+
+            attempts, max_attempts = row
+            if retryable and attempts < max_attempts:
+                cursor.execute(
+                    "UPDATE jobs SET status = 'queued', error = ?, lease_owner = NULL,"
+                    " lease_expires = NULL, available_at = ?, updated = ? WHERE id = ?",
+                    (error, now + backoff * (2 ** (attempts - 1)), now, job_id)
+                )
+            else:
+                cursor.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, lease_owner = NULL,"
+                    " updated = ? WHERE id = ?",
+                    (error, now, job_id)
+                )
+            return True
+
+        return self._transaction(record)
+
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job's status, payload, result and error."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status, payload, result, error, attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        status, payload, result, error, attempts = row
+        return {"id": job_id, "status": status, "payload": json.loads(payload),
+                "result": result, "error": error, "attempts": attempts}
+
+    def get_counts(self) -> Dict[str, int]:
+        """Get job counts by status."""
+        with self._lock:
+            counts = dict(self._connection.execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall())
+        return {status: counts.get(status, 0) for status in ("queued", "leased", "done", "failed")}
+
+    def is_drained(self) -> bool:
+        """Check whether no job is queued or leased."""
+        counts = self.get_counts()
+        return counts["queued"] == 0 and counts["leased"] == 0
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def write_job_output(job: Job, translation: str) -> None:
+    """Write a finished job to the output file named in its metadata, if any."""
+    output_path = job.payload.get("metadata", {}).get("output_path")
+    if not output_path:
+        return
+    directory = os.path.dirname(output_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write(translation)
+
+
+def _run_worker_process(db_path: str, threads: int, visibility_timeout: float,
+                        wait: bool, poll_interval: float) -> None:
+    """Worker process entry point: lease, translate and commit until the queue drains."""
+    # Imported in the worker process so producers never load settings or keys
+    from config.settings import AppSettings
+    from api.deadline import deadline_scope, get_deadline
+    from api.service import TranslationService, configure_provider_layer
+
+    settings = AppSettings()
+    configure_provider_layer(settings)
+    service = TranslationService(settings)
+    queue = JobQueue(db_path)
+    job_deadline = get_deadline(settings, "document")
+
+    process_id = f"{socket.gethostname()}:{os.getpid()}"
+    held = {}
+    held_lock = threading.Lock()
+    stopping = threading.Event()
+
+    def heartbeat():
+        # Keep leases on long documents alive while they are being translated
+        while not stopping.wait(visibility_timeout / 3):
+            with held_lock:
+                owners = dict(held)
+            for job_id, worker_id in owners.items():
+                queue.extend_leases(worker_id, [job_id], visibility_timeout)
+
+    def work(thread_number: int):
+        worker_id = f"{process_id}:{thread_number}"
+        while True:
+            jobs = queue.lease(worker_id, visibility_timeout)
+            if not jobs:
+                if not wait and queue.is_drained():
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            job = jobs[0]
+            with held_lock:
+                held[job.id] = worker_id
+            try:
+                payload = job.payload
+                with deadline_scope(job_deadline):
+                    translation = service.translate(
+                        payload["provider"], payload["model"], payload["text"],
+                        payload["source_language"], payload["target_language"]
+                    )
+                write_job_output(job, translation)
+                if not queue.complete(job.id, worker_id, translation):
+                    print(f"Job {job.id}: lease lost, result discarded")
+            except Exception as e:
+                print(f"Job {job.id} failed (attempt {job.attempts}): {str(e)}")
+                # A job that ran out of time may well finish on another attempt
+                queue.fail(job.id, worker_id, str(e), retryable=is_retryable(e) or is_deadline_exceeded(e))
+            finally:
+                with held_lock:
+                    held.pop(job.id, None)
+
+    heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+    heartbeat_thread.start()
+
+    workers = [threading.Thread(target=work, args=(number,)) for number in range(max(1, threads))]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    stopping.set()
+    queue.close()
+
+
+def run_workers(db_path: str, processes: int = 0, threads: int = 4,
+                visibility_timeout: float = 600.0, wait: bool = False,
+                poll_interval: float = 1.0) -> None:
+    """Run worker processes against a queue (processes=0 means one per CPU core).
+
+    Each process runs threads workers. Without wait, workers exit once no job
+    is queued or leased; with wait, they keep polling for new work.
+    """
+    processes = processes or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    workers = [
+        context.Process(target=_run_worker_process,
+                        args=(db_path, threads, visibility_timeout, wait, poll_interval))
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
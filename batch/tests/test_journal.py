@@ -0,0 +1,60 @@
+import pytest
+
+from batch.journal import BatchJournal, get_segment_key, translate_document
+
+DOCUMENT = "\n\n".join(f"Paragraph number {i} of the document." for i in range(6))
+
+
+@pytest.fixture
+def journal_path(tmp_path):
+    return str(tmp_path / "job.db")
+
+
+def test_resume_skips_finished_segments(journal_path):
+    calls = []
+
+    def failing(chunk):
+        calls.append(chunk)
+        if len(calls) == 3:
+            raise RuntimeError("quota exceeded")
+        return chunk.upper()
+
+    journal = BatchJournal(journal_path, "Fake", "fake-model")
+    with pytest.raises(RuntimeError):
+        translate_document(journal, "notes.txt", DOCUMENT, failing, max_tokens=12, max_workers=1)
+    journal.close()
+    finished = len(calls) - 1
+
+    resumed = []
+
+    def translate(chunk):
+        resumed.append(chunk)
+        return chunk.upper()
+
+    journal = BatchJournal(journal_path, "Fake", "fake-model")
+    translation = translate_document(journal, "notes.txt", DOCUMENT, translate, max_tokens=12, max_workers=1)
+    journal.close()
+
+    assert translation == DOCUMENT.upper()
+    assert calls[finished] in resumed
+    assert not set(calls[:finished]) & set(resumed)
+
+
+def test_changed_source_is_translated_again(journal_path):
+    journal = BatchJournal(journal_path, "Fake", "fake-model")
+    journal.mark_done(get_segment_key("notes.txt", 0), "Old text.", "OLD TEXT.")
+
+    translation = translate_document(journal, "notes.txt", "New text.", str.upper, max_tokens=100)
+    journal.close()
+
+    assert translation == "NEW TEXT."
+
+
+def test_other_model_is_translated_again(journal_path):
+    journal = BatchJournal(journal_path, "Fake", "other-model")
+    journal.mark_done(get_segment_key("notes.txt", 0), "Some text.", "stale")
+    journal.close()
+
+    journal = BatchJournal(journal_path, "Fake", "fake-model")
+    assert translate_document(journal, "notes.txt", "Some text.", str.upper, max_tokens=100) == "SOME TEXT."
+    journal.close()
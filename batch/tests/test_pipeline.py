@@ -0,0 +1,89 @@
+import io
+import json
+import random
+import time
+
+from batch.pipeline import ERROR_FIELD, JsonlPipeline, get_field, set_field
+
+
+def make_lines(count: int):
+    return [json.dumps({"id": index, "text": f"segment {index}"}) + "\n" for index in range(count)]
+
+
+def read_output(output: io.StringIO):
+    return [json.loads(line) for line in output.getvalue().splitlines()]
+
+
+def test_dotted_paths():
+    record = {"meta": {"title": "Hi"}, "items": [{"text": "a"}]}
+    assert get_field(record, "meta.title") == "Hi"
+    assert get_field(record, "items.0.text") == "a"
+    assert get_field(record, "items.3.text") is None
+    set_field(record, "items.0.text_fr", "b")
+    assert record["items"][0] == {"text": "a", "text_fr": "b"}
+
+
+def test_output_keeps_input_order_with_parallel_workers():
+    def translate(text):
+        time.sleep(random.uniform(0, 0.01))
+        return text.upper()
+
+    output = io.StringIO()
+    summary = JsonlPipeline(translate, ["text"], max_workers=8, progress_interval=0).run(make_lines(50), output)
+
+    records = read_output(output)
+    assert [record["id"] for record in records] == list(range(50))
+    assert records[7]["text"] == "SEGMENT 7"
+    assert summary["records"] == 50
+
+
+def test_unordered_output_has_every_record():
+    output = io.StringIO()
+    JsonlPipeline(str.upper, ["text"], max_workers=4, ordered=False, progress_interval=0).run(make_lines(20), output)
+    assert sorted(record["id"] for record in read_output(output)) == list(range(20))
+
+
+def test_reading_pauses_while_max_pending_records_are_in_flight():
+    peak_read_ahead = 0
+    read = 0
+    written = []
+
+    def lines():
+        nonlocal read, peak_read_ahead
+        for line in make_lines(40):
+            read += 1
+            peak_read_ahead = max(peak_read_ahead, read - len(written))
+            yield line
+
+    def translate(text):
+        time.sleep(0.005)
+        return text
+
+    class Output(io.StringIO):
+        def write(self, text):
+            written.append(text)
+            return super().write(text)
+
+    JsonlPipeline(translate, ["text"], max_workers=2, max_pending=4, progress_interval=0).run(lines(), Output())
+    assert len(written) == 40
+    # At most max_pending records are held, plus the one just read
+    assert peak_read_ahead <= 5
+
+
+def test_failures_are_recorded_on_their_own_lines():
+    def translate(text):
+        if text == "segment 2":
+            raise RuntimeError("quota exceeded")
+        return text.upper()
+
+    lines = make_lines(4) + ["not json\n", "\n"]
+    output = io.StringIO()
+    summary = JsonlPipeline(translate, ["text"], max_workers=2, progress_interval=0).run(lines, output)
+
+    records = read_output(output)
+    assert len(records) == 5
+    assert records[2][ERROR_FIELD] == "quota exceeded"
+    assert ERROR_FIELD not in records[3] and records[3]["text"] == "SEGMENT 3"
+    assert records[4]["_raw"] == "not json"
+    assert records[4][ERROR_FIELD].startswith("Invalid JSON")
+    assert summary["errors"] == 2
@@ -0,0 +1,75 @@
+import time
+
+import pytest
+
+from batch.queue import JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "queue.db"))
+    yield queue
+    queue.close()
+
+
+def enqueue(queue, text, **kwargs):
+    return queue.enqueue(text, "Fake", "fake-model", "English", "French", **kwargs)
+
+
+def test_jobs_are_leased_by_priority(queue):
+    low = enqueue(queue, "low")
+    high = enqueue(queue, "high", priority=5)
+
+    jobs = queue.lease("worker-1", limit=1)
+    assert [job.id for job in jobs] == [high]
+    assert jobs[0].payload["text"] == "high"
+    assert jobs[0].attempts == 1
+    assert [job.id for job in queue.lease("worker-2", limit=5)] == [low]
+    assert queue.lease("worker-3") == []
+
+
+def test_expired_lease_is_reclaimed(queue):
+    job_id = enqueue(queue, "text")
+    [job] = queue.lease("crashed", visibility_timeout=0.01)
+    time.sleep(0.02)
+
+    [job] = queue.lease("worker-2")
+    assert job.id == job_id
+    assert job.attempts == 2
+    # The crashed worker lost its lease and cannot commit any more
+    assert not queue.complete(job_id, "crashed", "late")
+    assert queue.complete(job_id, "worker-2", "texte")
+    assert queue.get_job(job_id)["result"] == "texte"
+
+
+def test_extended_lease_is_not_reclaimed(queue):
+    enqueue(queue, "text")
+    [job] = queue.lease("worker-1", visibility_timeout=0.05)
+    queue.extend_leases("worker-1", [job.id], visibility_timeout=60)
+    time.sleep(0.06)
+    assert queue.reclaim_expired() == 0
+    assert queue.lease("worker-2") == []
+
+
+def test_expired_lease_out_of_attempts_fails(queue):
+    job_id = enqueue(queue, "text", max_attempts=1)
+    queue.lease("crashed", visibility_timeout=0.01)
+    time.sleep(0.02)
+
+    assert queue.lease("worker-2") == []
+    job = queue.get_job(job_id)
+    assert job["status"] == "failed"
+    assert job["error"] == "Lease expired"
+
+
+def test_failed_job_is_requeued_with_backoff(queue):
+    job_id = enqueue(queue, "text", max_attempts=2)
+    [job] = queue.lease("worker-1")
+    assert queue.fail(job.id, "worker-1", "rate limited", backoff=0.05)
+    assert queue.lease("worker-1") == []
+
+    time.sleep(0.06)
+    [job] = queue.lease("worker-1")
+    assert queue.fail(job.id, "worker-1", "rate limited", backoff=0.05)
+    assert queue.get_job(job_id)["status"] == "failed"
+    assert queue.is_drained()
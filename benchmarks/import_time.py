@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the provider layer.
+
+Runs `python -X importtime` in a fresh interpreter for the application's
+startup chain (the modules main.py imports: ui.main_window, api.service and
+the settings) and for the same chain with every provider SDK imported up
+front, as the old startup did, then prints the slowest imports of each.
+Without PySide6 the chain starts at api.service, which the window imports.
+"""
+
+import os
+import subprocess
+import sys
+
+
+# The imports main.py makes before showing the window, then the model lists the window fills
+STARTUP = (
+    "try:\n"
+    "    import ui.main_window\n"
+    "except ImportError as e:\n"
+    "    print(f'{e.name} not installed, timing api.service without the window')\n"
+    "import api.service\n"
+    "from config.settings import AppSettings\n"
+    "from utils.encryption import initialize_encryption\n"
+    "from api.base import get_provider_list, get_provider_class\n"
+    "for name in get_provider_list():\n"
+    "    get_provider_class(name).get_models()\n"
+)
+
+EAGER_SDK_IMPORTS = (
+    "import importlib\n"
+    "for module in ['anthropic', 'openai', 'google.generativeai', 'cohere', 'mistralai', 'ai21']:\n"
+    "    try:\n"
+    "        importlib.import_module(module)\n"
+    "    except ImportError:\n"
+    "        print(f'{module} not installed, skipped')\n"
+)
+
+# Code executed in the child interpreter for each scenario
+SCENARIOS = {
+    "application startup": STARTUP,
+    "startup with eager SDK imports (old startup)": EAGER_SDK_IMPORTS + STARTUP
+}
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure(code):
+    """Run code under -X importtime and return [(cumulative_us, self_us, module)]."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True
+    )
+    
+    # Surface notes from the child (e.g. SDKs that are not installed)
+    for line in result.stdout.splitlines():
+        print(f"  note: {line}")
+    
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+            entries.append((int(cumulative_us), int(self_us), module.rstrip()))
+        except ValueError:
+            continue
+    return entries
+
+
+def report(name, entries, top=10):
+    """Print the total import time and the slowest top-level imports."""
+    total_us = sum(self_us for _, self_us, _ in entries)
+    print(f"{name}: {total_us / 1000:.1f} ms across {len(entries)} modules")
+    
+    # Top-level imports have no leading indentation in the module column
+    top_level = [entry for entry in entries if not entry[2].startswith("  ")]
+    for cumulative_us, _, module in sorted(top_level, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module.strip()}")
+    print()
+    return total_us
+
+
+def main():
+    totals = {}
+    for name, code in SCENARIOS.items():
+        totals[name] = report(name, measure(code))
+    
+    startup_us, eager_us = totals.values()
+    if startup_us:
+        print(
+            f"Lazy SDK imports save {(eager_us - startup_us) / 1000:.1f} ms of imports "
+            f"({eager_us / startup_us:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
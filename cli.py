@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Headless command-line translator.
+
+Uses the same settings, encrypted API keys, provider registry and
+translation memory as the GUI, but never imports Qt, so it can run on
+servers and batch workers.
+
+File inputs are journaled under ~/.translator_app/journals while a job
+runs; if it is interrupted, running the same command again resumes it and
+only translates what is unfinished or failed.
+
+Examples:
+    python cli.py --provider OpenAI --target Spanish README.md
+    python cli.py --target de --output-dir out/ "docs/**/*.txt"
+    python cli.py --source auto --target en mixed/*.txt
+    echo "Hello" | python cli.py --provider Anthropic --target French
+    python cli.py --jsonl --field title --field body.text -j 16 -O out.jsonl records.jsonl
+    python cli.py --enqueue --target fr --output-dir out/ "docs/**/*.md"
+    python cli.py --work --processes 4 -j 8
+"""
+
+import argparse
+import glob
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+
+from config.settings import AppSettings
+from api.base import get_provider_list, get_provider_class
+from api.deadline import deadline_scope, get_deadline
+from api.metrics import get_metrics
+from api.service import TranslationService, configure_provider_layer
+from batch.journal import BatchJournal, get_journal_path, make_job_id, translate_document
+from batch.pipeline import JsonlPipeline
+from batch.queue import JobQueue, run_workers
+from utils.language_utils import find_language, find_source_language, get_language_code
+
+
+def resolve_language(value: str) -> str:
+    """Accept a language name ("German") or ISO code ("de") and return the name."""
+    language = find_language(value)
+    if language is None:
+        raise argparse.ArgumentTypeError(f"Unknown language: {value}")
+    return language
+
+
+def resolve_source_language(value: str) -> str:
+    """Like resolve_language, but also accept "auto" to detect each text's language."""
+    language = find_source_language(value)
+    if language is None:
+        raise argparse.ArgumentTypeError(f"Unknown language: {value}")
+    return language
+
+
+def resolve_model(settings: AppSettings, provider: str, model: Optional[str]) -> str:
+    """Use the given model, else the last one used in the GUI, else the provider's first."""
+    if model:
+        return model
+    saved_model = settings.get_model(provider)
+    if saved_model:
+        return saved_model
+    models = get_provider_class(provider).get_models()
+    if models:
+        return next(iter(models.values()))
+    raise SystemExit(f"No model given and none known for {provider}; use --model")
+
+
+def expand_inputs(patterns: List[str]) -> List[str]:
+    """Expand file paths and glob patterns ("-" means stdin)."""
+    paths = []
+    for pattern in patterns:
+        if pattern == "-":
+            paths.append(pattern)
+            continue
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            raise SystemExit(f"No files match: {pattern}")
+        paths.extend(path for path in matches if os.path.isfile(path))
+    return paths
+
+
+def iter_lines(paths: List[str]) -> Iterator[str]:
+    """Lazily yield lines from each input in turn ("-" means stdin)."""
+    for path in paths:
+        if path == "-":
+            yield from sys.stdin
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            yield from f
+
+
+def output_path_for(path: str, target_language: str, output_dir: Optional[str]) -> str:
+    """Build the output file name, e.g. notes.txt -> notes.es.txt."""
+    base, extension = os.path.splitext(os.path.basename(path))
+    file_name = f"{base}.{get_language_code(target_language)}{extension}"
+    directory = output_dir if output_dir else os.path.dirname(path)
+    return os.path.join(directory, file_name)
+
+
+def open_journal(args, settings: AppSettings, paths: List[str], provider: str, model: str,
+                 source_language: str, target_language: str) -> Optional[BatchJournal]:
+    """Open the progress journal for this job (None when reading stdin)."""
+    if not paths or "-" in paths:
+        return None
+
+    job_id = make_job_id(
+        paths,
+        mode="jsonl" if args.jsonl else "files",
+        provider=provider,
+        model=model,
+        source=source_language,
+        target=target_language,
+        fields=(args.fields or ["text"]) if args.jsonl else None
+    )
+    journal_path = get_journal_path(settings.app_dir, job_id)
+    if args.no_resume and os.path.exists(journal_path):
+        BatchJournal(journal_path, provider, model).discard()
+
+    journal = BatchJournal(journal_path, provider, model)
+    stats = journal.get_stats()
+    if stats["done"] or stats["failed"]:
+        print(f"Resuming job {job_id}: {stats['done']} segments done, "
+              f"{stats['failed']} failed", file=sys.stderr)
+    return journal
+
+
+def close_journal(journal: Optional[BatchJournal], exit_code: int) -> None:
+    """Delete the journal after a clean run, keep it for resuming otherwise."""
+    if journal is None:
+        return
+    if exit_code == 0:
+        journal.discard()
+    else:
+        journal.close()
+        print("Progress saved; run the same command again to resume.", file=sys.stderr)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Translate files or stdin with any configured AI provider (no GUI)."
+    )
+    parser.add_argument("inputs", nargs="*", default=["-"],
+                        help="Files or glob patterns to translate ('-' or nothing reads stdin)")
+    parser.add_argument("-p", "--provider", choices=get_provider_list(),
+                        help="Provider to use (default: the one last used in the GUI)")
+    parser.add_argument("-m", "--model", help="Model ID (default: last used for the provider)")
+    parser.add_argument("-s", "--source", type=resolve_source_language,
+                        help="Source language name or code, or 'auto' to detect it (default: from settings)")
+    parser.add_argument("-t", "--target", type=resolve_language,
+                        help="Target language name or code (default: from settings)")
+    parser.add_argument("-o", "--output-dir",
+                        help="Write translations here instead of next to the inputs")
+    parser.add_argument("--stdout", action="store_true",
+                        help="Print translations to stdout even for file inputs")
+    parser.add_argument("-j", "--concurrency", type=int, default=4,
+                        help="Number of files translated at the same time (default: 4)")
+    parser.add_argument("--timeout", type=float,
+                        help="Seconds each file or JSONL record may take, retries included "
+                             "(default: the document or request deadline from settings)")
+    
+    jsonl_group = parser.add_argument_group("JSONL pipeline mode")
+    jsonl_group.add_argument("--jsonl", action="store_true",
+                             help="Treat inputs as JSONL and translate fields of each record")
+    jsonl_group.add_argument("-f", "--field", action="append", dest="fields",
+                             help="Dotted path of a field to translate, repeatable (default: text)")
+    jsonl_group.add_argument("-O", "--output", help="Output JSONL file (default: stdout)")
+    jsonl_group.add_argument("--unordered", action="store_true",
+                             help="Write records as they finish instead of in input order")
+    jsonl_group.add_argument("--suffix", default="",
+                             help="Write translations to <field><suffix> instead of replacing the field")
+    
+    queue_group = parser.add_argument_group("Job queue mode")
+    queue_group.add_argument("--enqueue", action="store_true",
+                             help="Add the input files to the job queue instead of translating them")
+    queue_group.add_argument("--work", action="store_true",
+                             help="Run queue workers until the queue is drained")
+    queue_group.add_argument("--queue", help="Queue database (default: ~/.translator_app/queue.db)")
+    queue_group.add_argument("--priority", type=int, default=0,
+                             help="Priority of enqueued jobs; higher runs first (default: 0)")
+    queue_group.add_argument("--processes", type=int, default=0,
+                             help="Worker processes, each running --concurrency threads (default: one per core)")
+    queue_group.add_argument("--wait", action="store_true",
+                             help="Keep workers polling for new jobs instead of exiting when drained")
+    
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Start over, discarding progress saved by an interrupted run")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Bypass the translation memory")
+    parser.add_argument("--stats", action="store_true",
+                        help="Print cache and retry statistics to stderr when done")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+
+    settings = AppSettings()
+    configure_provider_layer(settings)
+    queue_path = args.queue or os.path.join(settings.app_dir, "queue.db")
+
+    if args.work:
+        run_workers(queue_path, processes=args.processes, threads=max(1, args.concurrency), wait=args.wait)
+        queue = JobQueue(queue_path)
+        print(f"Queue: {queue.get_counts()}", file=sys.stderr)
+        queue.close()
+        return 0
+
+    provider = args.provider or settings.get_provider()
+    model = resolve_model(settings, provider, args.model)
+    source_language = args.source or settings.get_source_language()
+    target_language = args.target or settings.get_target_language()
+
+    if get_provider_class(provider).requires_api_key() and not settings.get_api_key(provider):
+        print(f"API key for {provider} is not set. Set it in the GUI's API Settings first.", file=sys.stderr)
+        return 2
+
+    if args.no_cache:
+        settings.set_translation_memory_settings({"enabled": False})
+    service = TranslationService(settings)
+
+    def translate(text: str, deadline_kind: str = "request") -> str:
+        with deadline_scope(args.timeout or get_deadline(settings, deadline_kind)):
+            return service.translate(provider, model, text, source_language, target_language)
+
+    paths = expand_inputs(args.inputs)
+    
+    if args.enqueue:
+        return enqueue_files(args, queue_path, paths, provider, model, source_language, target_language)
+    
+    journal = open_journal(args, settings, paths, provider, model, source_language, target_language)
+    
+    if args.jsonl:
+        exit_code = run_jsonl(args, paths, translate, service, journal)
+        close_journal(journal, exit_code)
+        return exit_code
+    
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    def translate_path(path: str) -> Optional[str]:
+        if path == "-":
+            return translate(sys.stdin.read(), "document")
+
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+
+        if journal is None:
+            translation = translate(text, "document")
+        else:
+            # Journal each chunk so an interrupted file resumes where it stopped
+            with deadline_scope(args.timeout or get_deadline(settings, "document")):
+                translation = translate_document(
+                    journal,
+                    path,
+                    text,
+                    lambda chunk: translate(chunk, "document"),
+                    max_tokens=get_provider_class(provider).get_max_chunk_tokens(model),
+                    max_workers=service.chunk_workers
+                )
+
+        if args.stdout:
+            return translation
+
+        output_path = output_path_for(path, target_language, args.output_dir)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(translation)
+        print(f"{path} -> {output_path}", file=sys.stderr)
+        return None
+
+    exit_code = 0
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as executor:
+        futures = [(path, executor.submit(translate_path, path)) for path in paths]
+        for path, future in futures:
+            try:
+                translation = future.result()
+            except Exception as e:
+                print(f"{path}: {str(e)}", file=sys.stderr)
+                exit_code = 1
+                continue
+            if translation is not None:
+                sys.stdout.write(translation)
+                if not translation.endswith("\n"):
+                    sys.stdout.write("\n")
+                sys.stdout.flush()
+
+    if args.stats:
+        print(f"Translation memory: {service.get_cache_stats()}", file=sys.stderr)
+        print(f"Provider metrics: {get_metrics()}", file=sys.stderr)
+
+    close_journal(journal, exit_code)
+    return exit_code
+
+
+def enqueue_files(args, queue_path: str, paths: List[str], provider: str, model: str,
+                  source_language: str, target_language: str) -> int:
+    """Add each input file to the job queue as one document job."""
+    payloads = []
+    for path in paths:
+        if path == "-":
+            text = sys.stdin.read()
+            metadata = {}
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            metadata = {"source_path": path,
+                        "output_path": output_path_for(path, target_language, args.output_dir)}
+        payloads.append({
+            "text": text, "provider": provider, "model": model,
+            "source_language": source_language, "target_language": target_language,
+            "metadata": metadata
+        })
+
+    queue = JobQueue(queue_path)
+    job_ids = queue.enqueue_many(payloads, priority=args.priority)
+    print(f"Enqueued {len(job_ids)} jobs; queue: {queue.get_counts()}", file=sys.stderr)
+    queue.close()
+    return 0
+
+
+def run_jsonl(args, paths: List[str], translate, service: TranslationService,
+              journal: Optional[BatchJournal] = None) -> int:
+    """Run the streaming JSONL pipeline over the inputs."""
+    pipeline = JsonlPipeline(
+        translate,
+        fields=args.fields or ["text"],
+        max_workers=max(1, args.concurrency),
+        ordered=not args.unordered,
+        output_suffix=args.suffix,
+        journal=journal
+    )
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            summary = pipeline.run(iter_lines(paths), output)
+    else:
+        summary = pipeline.run(iter_lines(paths), sys.stdout)
+    
+    print(f"Done: {pipeline.stats.format()}", file=sys.stderr)
+    if args.stats:
+        print(f"Translation memory: {service.get_cache_stats()}", file=sys.stderr)
+        print(f"Provider metrics: {get_metrics()}", file=sys.stderr)
+        if journal is not None:
+            print(f"Journal: {journal.get_stats()}", file=sys.stderr)
+    return 1 if summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,8 @@ class AppSettings:
         self.app_dir = os.path.join(os.path.expanduser("~"), ".translator_app")
         self.settings_file = os.path.join(self.app_dir, "settings.json")
         self.api_keys_file = os.path.join(self.app_dir, "api_keys.enc")
+        self.translation_memory_file = os.path.join(self.app_dir, "translation_memory.db")
+        self.fuzzy_memory_file = os.path.join(self.app_dir, "fuzzy_memory.db")
         
         # Create directory if it doesn't exist
         os.makedirs(self.app_dir, exist_ok=True)
@@ -21,7 +23,46 @@ class AppSettings:
             "provider": "Anthropic",
             "source_language": "English",
             "target_language": "Spanish",
-            "models": {}  # Store last used model for each provider
+            "models": {},  # Store last used model for each provider
+            "http": {},  # Overrides for the shared HTTP transport (pool sizes, timeouts, http2)
+            "rate_limits": {},  # Per-provider (or "provider/model") request and token budgets
+            "retry": {},  # Overrides for the retry policy (max_attempts, base_delay, max_delay, deadline)
+            "chunk_workers": 4,  # Parallel requests when translating long documents in chunks
+            "translation_memory": {
+                "enabled": True,
+                "max_entries": 100000,
+                "fuzzy": True,  # Near-match lookups for short segments
+                "fuzzy_threshold": 0.75,  # Minimum trigram similarity of a near-match
+                "fuzzy_examples": 2  # Near-matches given to the provider as reference translations
+            },
+            "masking": {"enabled": True},  # Placeholder masking; set a span kind (e.g. "number") to false to keep it
+            "skip_untranslatable": True,  # Pass numbers, URLs, code and text already in the target script through
+            "server": {},  # Overrides for the HTTP server mode (host, port, queue size, per-provider caps)
+            "routing": {
+                "routes": {},  # Route name -> equivalent [provider, model] backends for the Router provider
+                "ewma_alpha": 0.2,  # Weight of the newest sample in the latency/error/throughput averages
+                "max_error_rate": 0.5,  # Backends above this error rate are skipped...
+                "recovery_interval": 30.0,  # ...until this many seconds after their last failure
+                "explore_probability": 0.05  # Share of requests sent to a random backend to keep stats fresh
+            },
+            "deadlines": {
+                "request": 120.0,  # Seconds a GUI, server or JSONL translation may take, retries and chunks included
+                "document": 1800.0  # Seconds a CLI file or queued document job may take
+            },
+            "circuit_breaker": {
+                "enabled": True,
+                "failure_threshold": 5,  # Consecutive connection errors, timeouts or 5xx that open an endpoint's circuit
+                "open_interval": 30.0,  # Seconds to fail fast before a probe request is let through
+                "half_open_probes": 1  # Probe requests allowed at once before the endpoint has recovered
+            },
+            "hedging": {
+                "enabled": False,
+                "percentile": 95,  # Send a duplicate request once the first has run longer than this latency percentile
+                "min_delay": 0.25,  # Never hedge sooner than this many seconds
+                "min_samples": 20,  # Latency samples needed before a backend is hedged
+                "budget": 0.05,  # Extra requests allowed, as a share of all requests
+                "alternates": {}  # "provider/model" -> [provider, model] to hedge with (routes hedge between their backends)
+            }
         }
         
         # API keys (encrypted)
@@ -116,6 +157,114 @@ class AppSettings:
         """Set the target language."""
         self.settings["target_language"] = language
     
+    # HTTP transport settings
+    def get_http_settings(self):
+        """Get the HTTP transport overrides (pool sizes, timeouts, http2)."""
+        return self.settings.get("http", {})
+    
+    def set_http_settings(self, http_settings):
+        """Set the HTTP transport overrides."""
+        self.settings["http"] = http_settings
+    
+    # Rate limit settings
+    def get_rate_limits(self):
+        """Get per-provider rate limits (requests_per_minute, tokens_per_minute, max_concurrency)."""
+        return self.settings.get("rate_limits", {})
+    
+    def set_rate_limits(self, rate_limits):
+        """Set per-provider rate limits."""
+        self.settings["rate_limits"] = rate_limits
+    
+    # Retry settings
+    def get_retry_settings(self):
+        """Get the retry policy overrides."""
+        return self.settings.get("retry", {})
+    
+    def set_retry_settings(self, retry_settings):
+        """Set the retry policy overrides."""
+        self.settings["retry"] = retry_settings
+    
+    # Chunked translation settings
+    def get_chunk_workers(self):
+        """Get the number of chunks of a long document translated in parallel."""
+        return self.settings.get("chunk_workers", 4)
+    
+    def set_chunk_workers(self, chunk_workers):
+        """Set the number of chunks translated in parallel."""
+        self.settings["chunk_workers"] = chunk_workers
+    
+    # Translation memory settings
+    def get_translation_memory_settings(self):
+        """Get the translation memory (cache) settings."""
+        return self.settings.get("translation_memory", {"enabled": True, "max_entries": 100000, "fuzzy": True})
+    
+    def set_translation_memory_settings(self, memory_settings):
+        """Set the translation memory (cache) settings."""
+        self.settings["translation_memory"] = memory_settings
+    
+    # Placeholder masking settings
+    def get_masking_settings(self):
+        """Get the placeholder masking settings (enabled, plus per-kind switches)."""
+        return self.settings.get("masking", {"enabled": True})
+    
+    def set_masking_settings(self, masking_settings):
+        """Set the placeholder masking settings."""
+        self.settings["masking"] = masking_settings
+    
+    # Untranslatable segment settings
+    def get_skip_untranslatable(self):
+        """Get whether segments that need no translation skip the provider."""
+        return self.settings.get("skip_untranslatable", True)
+    
+    def set_skip_untranslatable(self, skip_untranslatable):
+        """Set whether segments that need no translation skip the provider."""
+        self.settings["skip_untranslatable"] = skip_untranslatable
+    
+    # Server mode settings
+    def get_server_settings(self):
+        """Get the HTTP server overrides (host, port, max_queue, provider_concurrency)."""
+        return self.settings.get("server", {})
+    
+    def set_server_settings(self, server_settings):
+        """Set the HTTP server overrides."""
+        self.settings["server"] = server_settings
+    
+    # Provider routing settings
+    def get_routing_settings(self):
+        """Get the Router provider's routes and health tracking options."""
+        return self.settings.get("routing", {})
+    
+    def set_routing_settings(self, routing_settings):
+        """Set the Router provider's routes and health tracking options."""
+        self.settings["routing"] = routing_settings
+    
+    # Deadline settings
+    def get_deadline_settings(self):
+        """Get the end-to-end deadlines for requests and whole documents, in seconds."""
+        return self.settings.get("deadlines", {})
+    
+    def set_deadline_settings(self, deadline_settings):
+        """Set the end-to-end deadlines for requests and whole documents, in seconds."""
+        self.settings["deadlines"] = deadline_settings
+    
+    # Circuit breaker settings
+    def get_circuit_breaker_settings(self):
+        """Get the per-endpoint circuit breaker options."""
+        return self.settings.get("circuit_breaker", {})
+    
+    def set_circuit_breaker_settings(self, circuit_settings):
+        """Set the per-endpoint circuit breaker options."""
+        self.settings["circuit_breaker"] = circuit_settings
+    
+    # Hedged request settings
+    def get_hedging_settings(self):
+        """Get the options for hedging slow requests to a second backend."""
+        return self.settings.get("hedging", {})
+    
+    def set_hedging_settings(self, hedging_settings):
+        """Set the options for hedging slow requests to a second backend."""
+        self.settings["hedging"] = hedging_settings
+    
     # API key management
     def get_api_key(self, provider):
         """Get the API key for a provider."""
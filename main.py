@@ -6,6 +6,7 @@ from PySide6.QtCore import QFile, QTextStream, QResource
 from PySide6.QtGui import QPalette, QColor
 from ui.main_window import MainWindow
 from config.settings import AppSettings
+from api.service import configure_provider_layer
 from utils.encryption import initialize_encryption
 
 
@@ -437,6 +438,9 @@ def main():
         # Load application settings
         settings = AppSettings()
         
+        # Configure connection pools, rate limits and retries
+        configure_provider_layer(settings)
+        
         # Set up the theme
         setup_theme(app, settings)
         
@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Local HTTP translation service.
+
+Exposes the translator to other tools over HTTP using the same settings,
+encrypted API keys, provider registry and translation memory as the GUI.
+Requests from all clients share per-provider worker pools, so throughput
+scales with concurrent clients up to each provider's concurrency cap.
+
+Endpoints:
+    GET  /health            liveness check
+    GET  /providers         provider names
+    GET  /metrics           counters, gauges, cache and queue statistics
+    POST /translate         {"text", "provider"?, "model"?, "source_language"?, "target_language"?, "timeout"?}
+    POST /translate/batch   {"texts": [...], ...same optional fields}
+    POST /translate/stream  same body as /translate; answers with server-sent events
+                            ({"text"} pieces, or a {"replace"} superseding earlier pieces)
+
+A source_language of "auto" detects each text's language offline. Each
+request must finish within the request deadline from settings, queueing
+included; a "timeout" field (seconds) can shorten it. Requests that run out
+of time get a 504.
+
+Example:
+    python server.py --port 8765
+    curl -s localhost:8765/translate -d '{"text": "Hello", "target_language": "fr"}'
+"""
+
+import argparse
+import contextvars
+import json
+import logging
+import queue
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config.settings import AppSettings
+from api.base import get_provider_list, get_provider_class
+from api.cancellation import CancelToken, cancellation_scope
+from api.circuit import get_circuit_snapshot
+from api.deadline import deadline_scope, get_deadline
+from api.errors import is_deadline_exceeded
+from api.metrics import get_metrics, set_gauge
+from api.service import Replacement, TranslationService, configure_provider_layer
+from utils.language_utils import find_language, find_source_language
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVER_SETTINGS = {
+    "host": "127.0.0.1",
+    "port": 8765,
+    "max_queue": 256,              # Requests in flight or waiting, across all providers
+    "default_concurrency": 8,      # Concurrent provider calls per provider
+    "provider_concurrency": {},    # Per-provider overrides, e.g. {"OpenAI": 32}
+    "max_batch_size": 256          # Texts accepted by one /translate/batch request
+}
+
+_STREAM_END = object()
+
+
+class QueueFullError(Exception):
+    """Raised when the server already holds max_queue requests."""
+
+
+class BadRequestError(Exception):
+    """Raised for malformed or invalid request bodies."""
+
+
+class ProviderPools:
+    """Per-provider worker pools with a shared bound on queued requests.
+
+    Each provider gets its own executor sized to its concurrency cap, so a
+    slow or throttled provider never holds up requests for the others.
+    """
+
+    def __init__(self, provider_concurrency: Dict[str, int], default_concurrency: int, max_queue: int):
+        self.provider_concurrency = provider_concurrency
+        self.default_concurrency = default_concurrency
+        self.max_queue = max_queue
+
+        self._executors: Dict[str, ThreadPoolExecutor] = {}
+        self._pool_sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def _get_executor(self, provider_name: str) -> ThreadPoolExecutor:
+        with self._lock:
+            executor = self._executors.get(provider_name)
+            if executor is None:
+                workers = max(1, self.provider_concurrency.get(provider_name, self.default_concurrency))
+                executor = ThreadPoolExecutor(max_workers=workers,
+                                              thread_name_prefix=f"{provider_name}-worker")
+                self._executors[provider_name] = executor
+                self._pool_sizes[provider_name] = workers
+            return executor
+
+    def submit(self, provider_name: str, fn: Callable, *args) -> Future:
+        """Queue fn on the provider's pool, or raise QueueFullError."""
+        executor = self._get_executor(provider_name)
+        with self._lock:
+            if self._pending >= self.max_queue:
+                raise QueueFullError(f"Server busy: {self._pending} requests queued")
+            self._pending += 1
+            set_gauge("server_pending", "", self._pending)
+
+        # Run in a copy of the handler's context so the request's deadline follows it
+        future = executor.submit(contextvars.copy_context().run, fn, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            set_gauge("server_pending", "", self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the queue depth and the size of each provider pool."""
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "max_queue": self.max_queue,
+                "pools": dict(self._pool_sizes)
+            }
+
+    def shutdown(self) -> None:
+        """Stop all pools, letting running requests finish."""
+        with self._lock:
+            executors = list(self._executors.values())
+            self._executors.clear()
+        for executor in executors:
+            executor.shutdown(wait=True)
+
+
+class TranslationServer(ThreadingHTTPServer):
+    """HTTP server holding the shared translation service and worker pools."""
+
+    daemon_threads = True
+    request_queue_size = 128  # Listen backlog; the default of 5 drops connection bursts
+
+    def __init__(self, settings: AppSettings, server_settings: Dict[str, Any]):
+        self.settings = settings
+        self.server_settings = server_settings
+        self.service = TranslationService(settings)
+        self.pools = ProviderPools(
+            server_settings["provider_concurrency"],
+            server_settings["default_concurrency"],
+            server_settings["max_queue"]
+        )
+        super().__init__((server_settings["host"], server_settings["port"]), TranslationRequestHandler)
+
+    def resolve_request(self, body: Dict[str, Any]) -> Dict[str, str]:
+        """Fill in provider, model and languages from settings where the body omits them."""
+        provider = body.get("provider") or self.settings.get_provider()
+        if provider not in get_provider_list():
+            raise BadRequestError(f"Unknown provider: {provider}")
+        if get_provider_class(provider).requires_api_key() and not self.settings.get_api_key(provider):
+            raise BadRequestError(f"API key for {provider} is not set")
+
+        model = body.get("model") or self.settings.get_model(provider)
+        if not model:
+            models = get_provider_class(provider).get_models()
+            if not models:
+                raise BadRequestError(f"No model given and none known for {provider}")
+            model = next(iter(models.values()))
+
+        languages = {}
+        for field, default, find in (
+            ("source_language", self.settings.get_source_language(), find_source_language),
+            ("target_language", self.settings.get_target_language(), find_language)
+        ):
+            language = find(body.get(field) or default)
+            if language is None:
+                raise BadRequestError(f"Unknown language: {body.get(field)}")
+            languages[field] = language
+
+        return {"provider_name": provider, "model": model, **languages}
+
+    def get_timeout(self, body: Dict[str, Any]) -> Optional[float]:
+        """Seconds a request may take: the request deadline, shortened by a "timeout" field."""
+        timeout = get_deadline(self.settings, "request")
+        requested = body.get("timeout")
+        if requested is not None:
+            if isinstance(requested, bool) or not isinstance(requested, (int, float)) or requested <= 0:
+                raise BadRequestError("'timeout' must be a positive number of seconds")
+            timeout = min(timeout, requested) if timeout else requested
+        return timeout
+
+    def translate(self, text: str, request: Dict[str, str]) -> Future:
+        """Queue a translation on the provider's pool."""
+        return self.pools.submit(request["provider_name"], self.service.translate,
+                                 request["provider_name"], request["model"], text,
+                                 request["source_language"], request["target_language"])
+
+    def translate_batch(self, texts: List[str], request: Dict[str, str]) -> Future:
+        """Queue a packed batch translation on the provider's pool."""
+        return self.pools.submit(request["provider_name"], self.service.translate_batch,
+                                 request["provider_name"], request["model"], texts,
+                                 request["source_language"], request["target_language"])
+
+    def translate_stream(self, text: str, request: Dict[str, str]) -> Iterator[str]:
+        """Run a streaming translation on the provider's pool and yield its pieces."""
+        pieces = queue.Queue()
+
+        def produce():
+            try:
+                for piece in self.service.translate_stream(
+                    request["provider_name"], request["model"], text,
+                    request["source_language"], request["target_language"]
+                ):
+                    pieces.put(piece)
+            except Exception as e:
+                pieces.put(e)
+            pieces.put(_STREAM_END)
+
+        # Submit before returning so a full queue is reported before any response is sent
+        self.pools.submit(request["provider_name"], produce)
+
+        def consume():
+            while True:
+                piece = pieces.get()
+                if piece is _STREAM_END:
+                    return
+                if isinstance(piece, Exception):
+                    raise piece
+                yield piece
+
+        return consume()
+
+    def server_close(self):
+        super().server_close()
+        self.pools.shutdown()
+
+
+class TranslationRequestHandler(BaseHTTPRequestHandler):
+    """Handle one client connection (kept alive across requests)."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "MultiLLMTranslator"
+
+    def log_message(self, format, *args):
+        # Keep the console quiet; errors are reported separately
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError as e:
+            raise BadRequestError(f"Invalid JSON: {str(e)}")
+        if not isinstance(body, dict):
+            raise BadRequestError("Request body must be a JSON object")
+        return body
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/providers":
+            self._send_json(200, {"providers": get_provider_list()})
+        elif self.path == "/metrics":
+            self._send_json(200, {
+                "metrics": get_metrics(),
+                "circuits": get_circuit_snapshot(),
+                "translation_memory": self.server.service.get_cache_stats(),
+                "queue": self.server.pools.get_stats()
+            })
+        else:
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+
+    def do_POST(self):
+        handlers = {
+            "/translate": self._handle_translate,
+            "/translate/batch": self._handle_batch,
+            "/translate/stream": self._handle_stream
+        }
+        handler = handlers.get(self.path)
+        if handler is None:
+            self._send_json(404, {"error": f"Not found: {self.path}"})
+            return
+
+        try:
+            body = self._read_json()
+            with deadline_scope(self.server.get_timeout(body)):
+                handler(body)
+        except BadRequestError as e:
+            self._send_json(400, {"error": str(e)})
+        except QueueFullError as e:
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "1"})
+        except Exception as e:
+            self._send_json(504 if is_deadline_exceeded(e) else 502, {"error": str(e)})
+
+    def _get_text(self, body: Dict[str, Any]) -> str:
+        text = body.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise BadRequestError("'text' must be a non-empty string")
+        return text
+
+    def _handle_translate(self, body: Dict[str, Any]) -> None:
+        text = self._get_text(body)
+        request = self.server.resolve_request(body)
+        translation = self.server.translate(text, request).result()
+        self._send_json(200, {"translation": translation, **request})
+
+    def _handle_batch(self, body: Dict[str, Any]) -> None:
+        texts = body.get("texts")
+        if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+            raise BadRequestError("'texts' must be a list of strings")
+        if len(texts) > self.server.server_settings["max_batch_size"]:
+            raise BadRequestError(f"At most {self.server.server_settings['max_batch_size']} texts per batch")
+        request = self.server.resolve_request(body)
+
+        # Short strings are packed into shared provider requests
+        translations = self.server.translate_batch(texts, request).result()
+        self._send_json(200, {"translations": translations, **request})
+
+    def _write_chunk(self, data: str) -> None:
+        encoded = data.encode("utf-8")
+        self.wfile.write(f"{len(encoded):X}\r\n".encode("ascii") + encoded + b"\r\n")
+        self.wfile.flush()
+
+    def _handle_stream(self, body: Dict[str, Any]) -> None:
+        text = self._get_text(body)
+        request = self.server.resolve_request(body)
+        token = CancelToken()
+        with cancellation_scope(token):
+            pieces = self.server.translate_stream(text, request)
+
+        # Server-sent events over chunked encoding, so the connection stays reusable
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        try:
+            for piece in pieces:
+                # A replacement supersedes every piece sent before it
+                field = "replace" if isinstance(piece, Replacement) else "text"
+                self._write_chunk(f"data: {json.dumps({field: piece}, ensure_ascii=False)}\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # The client went away; stop generating (and paying for) the rest.
+            # Headers are already sent, so there is nobody to report an error to
+            token.cancel()
+            self.close_connection = True
+            logger.debug("Client %s disconnected during a stream; translation cancelled", self.client_address[0])
+            return
+        except Exception as e:
+            self._write_chunk(f"data: {json.dumps({'error': str(e)}, ensure_ascii=False)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def get_server_settings(settings: AppSettings) -> Dict[str, Any]:
+    """Merge the saved server overrides over the defaults."""
+    server_settings = dict(DEFAULT_SERVER_SETTINGS)
+    for key, value in settings.get_server_settings().items():
+        if key in server_settings:
+            server_settings[key] = value
+    return server_settings
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    settings = AppSettings()
+    server_settings = get_server_settings(settings)
+
+    parser = argparse.ArgumentParser(description="Serve translations over HTTP (no GUI).")
+    parser.add_argument("--host", default=server_settings["host"],
+                        help=f"Interface to listen on (default: {server_settings['host']})")
+    parser.add_argument("--port", type=int, default=server_settings["port"],
+                        help=f"Port to listen on (default: {server_settings['port']})")
+    parser.add_argument("--max-queue", type=int, default=server_settings["max_queue"],
+                        help="Requests held before answering 503 (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=server_settings["default_concurrency"],
+                        help="Concurrent provider calls per provider (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    server_settings.update({
+        "host": args.host,
+        "port": args.port,
+        "max_queue": args.max_queue,
+        "default_concurrency": args.concurrency
+    })
+
+    configure_provider_layer(settings)
+    server = TranslationServer(settings, server_settings)
+    print(f"Serving translations on http://{args.host}:{args.port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
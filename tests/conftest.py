@@ -0,0 +1,2 @@
+# The temporary settings and fake provider fixtures are shared with the api tests
+from api.tests.conftest import fake_provider, settings  # noqa: F401
@@ -0,0 +1,94 @@
+import io
+import os
+import subprocess
+import sys
+
+import pytest
+
+import cli
+from utils.language_utils import AUTO_DETECT
+
+
+@pytest.fixture
+def saved_settings(settings):
+    """Settings saved to disk, where cli.main loads them from."""
+    settings.save()
+    return settings
+
+
+def reject_broken(text):
+    if text == "Broken":
+        raise ValueError("rejected")
+    return f"<{text}>"
+
+
+def run(*argv):
+    return cli.main(["--provider", "Fake", "--model", "m", "--source", "en", "--target", "fr", *argv])
+
+
+def test_importing_the_cli_never_loads_qt():
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = "import sys, cli; print(any(name.startswith('PySide6') for name in sys.modules))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            check=True, cwd=root).stdout
+    assert output.strip() == "False"
+
+
+def test_argument_parsing():
+    args = cli.build_parser().parse_args(["-t", "de", "-s", "auto", "-j", "8", "--jsonl", "-f", "a.b", "x.jsonl"])
+    assert args.target == "German"
+    assert args.source == AUTO_DETECT
+    assert args.concurrency == 8
+    assert args.fields == ["a.b"]
+    assert args.inputs == ["x.jsonl"]
+    assert cli.build_parser().parse_args([]).inputs == ["-"]
+
+    with pytest.raises(SystemExit) as raised:
+        cli.build_parser().parse_args(["--target", "Klingon"])
+    assert raised.value.code == 2
+
+
+def test_output_file_names():
+    assert cli.output_path_for("docs/notes.txt", "Spanish", None) == os.path.join("docs", "notes.es.txt")
+    assert cli.output_path_for("docs/notes.txt", "German", "out") == os.path.join("out", "notes.de.txt")
+
+
+def test_files_are_translated_next_to_their_inputs(saved_settings, tmp_path):
+    (tmp_path / "a.txt").write_text("Hello", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("Bye", encoding="utf-8")
+
+    assert run(str(tmp_path / "*.txt")) == 0
+    assert (tmp_path / "a.fr.txt").read_text(encoding="utf-8") == "<Hello>"
+    assert (tmp_path / "b.fr.txt").read_text(encoding="utf-8") == "<Bye>"
+
+
+def test_stdin_is_translated_to_stdout(saved_settings, monkeypatch, capsys):
+    monkeypatch.setattr(sys, "stdin", io.StringIO("Hello"))
+    assert run() == 0
+    assert capsys.readouterr().out == "<Hello>\n"
+
+
+def test_a_failed_file_exits_with_1_and_keeps_progress(saved_settings, fake_provider, monkeypatch, tmp_path, capsys):
+    monkeypatch.setattr(fake_provider, "answer", staticmethod(reject_broken))
+    (tmp_path / "good.txt").write_text("Hello", encoding="utf-8")
+    (tmp_path / "bad.txt").write_text("Broken", encoding="utf-8")
+
+    assert run(str(tmp_path / "*.txt")) == 1
+    assert (tmp_path / "good.fr.txt").exists()
+    assert not (tmp_path / "bad.fr.txt").exists()
+    assert "rejected" in capsys.readouterr().err
+    assert os.listdir(os.path.join(saved_settings.app_dir, "journals"))
+
+
+def test_jsonl_errors_exit_with_1(saved_settings, fake_provider, monkeypatch, tmp_path):
+    monkeypatch.setattr(fake_provider, "answer", staticmethod(reject_broken))
+    (tmp_path / "in.jsonl").write_text('{"text": "Hello"}\n{"text": "Broken"}\n', encoding="utf-8")
+    output = tmp_path / "out.jsonl"
+
+    assert run("--jsonl", "-O", str(output), str(tmp_path / "in.jsonl")) == 1
+    assert output.read_text(encoding="utf-8").splitlines()[0] == '{"text": "<Hello>"}'
+
+
+def test_missing_api_key_exits_with_2(saved_settings, capsys):
+    assert cli.main(["--provider", "OpenAI", "--model", "gpt-4o-mini", "--target", "fr"]) == 2
+    assert "API key for OpenAI is not set" in capsys.readouterr().err
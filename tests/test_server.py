@@ -0,0 +1,69 @@
+import json
+import socket
+import threading
+import time
+from urllib.request import Request, urlopen
+
+import pytest
+
+from api.cancellation import get_cancel_token
+from server import TranslationServer, get_server_settings
+
+
+@pytest.fixture
+def server(settings):
+    server_settings = get_server_settings(settings)
+    server_settings.update({"port": 0})
+    translation_server = TranslationServer(settings, server_settings)
+    translation_server.errors = []
+    translation_server.handle_error = lambda request, address: translation_server.errors.append(address)
+    threading.Thread(target=translation_server.serve_forever, args=(0.05,), daemon=True).start()
+    yield translation_server
+    translation_server.shutdown()
+    translation_server.server_close()
+
+
+def post(server, path, body):
+    request = Request(f"http://127.0.0.1:{server.server_address[1]}{path}",
+                      data=json.dumps(body).encode("utf-8"), method="POST")
+    with urlopen(request, timeout=5) as response:
+        return response.status, response.read().decode("utf-8")
+
+
+def test_translate(server):
+    status, body = post(server, "/translate", {"text": "Hello", "provider": "Fake", "model": "m",
+                                               "source_language": "English", "target_language": "French"})
+    assert status == 200
+    assert json.loads(body)["translation"] == "<Hello>"
+
+
+def test_stream(server, fake_provider, monkeypatch):
+    monkeypatch.setattr(fake_provider, "stream_answer", staticmethod(lambda text: ["Bon", "jour"]))
+    status, body = post(server, "/translate/stream", {"text": "Hello", "provider": "Fake", "model": "m",
+                                                      "source_language": "English", "target_language": "French"})
+    assert status == 200
+    assert '"text": "Bon"' in body and '"text": "jour"' in body and "[DONE]" in body
+
+
+def test_client_disconnect_cancels_the_stream_quietly(server, fake_provider, monkeypatch):
+    cancelled = threading.Event()
+
+    def stream_answer(text):
+        get_cancel_token().add_callback(cancelled.set)
+        for _ in range(100):
+            yield "piece " * 100
+            time.sleep(0.05)
+
+    monkeypatch.setattr(fake_provider, "stream_answer", staticmethod(stream_answer))
+    body = json.dumps({"text": "Hello", "provider": "Fake", "model": "m",
+                       "source_language": "English", "target_language": "French"}).encode("utf-8")
+    client = socket.create_connection(("127.0.0.1", server.server_address[1]))
+    client.sendall(b"POST /translate/stream HTTP/1.1\r\nHost: test\r\n"
+                   + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body)
+    assert client.recv(1024).startswith(b"HTTP/1.1 200")
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, b"\x01\x00\x00\x00\x00\x00\x00\x00")
+    client.close()
+
+    assert cancelled.wait(5)
+    time.sleep(0.2)
+    assert server.errors == []
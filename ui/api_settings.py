@@ -6,6 +6,7 @@ from PySide6.QtWidgets import (
 from PySide6.QtCore import Qt, Signal, Slot
 
 from api.base import get_provider_list, get_provider_class
+from api.instances import invalidate_provider_instances
 
 
 class ApiKeyInput(QWidget):
@@ -250,6 +251,9 @@ class ApiSettingsDialog(QDialog):
         self.provider_widgets = {}
         
         for provider in providers:
+            # Providers without keys of their own (the router) have nothing to enter
+            if not get_provider_class(provider).requires_api_key():
+                continue
             provider_widget = ApiKeyInput(provider, self.settings)
             self.tab_widget.addTab(provider_widget, provider)
             self.provider_widgets[provider] = provider_widget
@@ -265,7 +269,12 @@ class ApiSettingsDialog(QDialog):
     def accept(self):
         """Save all API keys when the dialog is accepted."""
         for provider, widget in self.provider_widgets.items():
+            previous_credentials = dict(self.settings.api_keys.get(provider, {}))
             widget.save_api_key()
+            
+            # Drop warm provider instances only if the credentials changed
+            if self.settings.api_keys.get(provider, {}) != previous_credentials:
+                invalidate_provider_instances(provider)
         
         # Ensure settings are saved
         self.settings.save()
@@ -4,39 +4,64 @@ from PySide6.QtWidgets import (
     QStatusBar, QToolBar, QDialog, QTabWidget,
     QSplitter, QFrame, QMenu, QMessageBox,QApplication
 )
-from PySide6.QtCore import Qt, QSize, Signal, Slot, QThread
+from PySide6.QtCore import Qt, QSize, Signal, Slot, QThread, QTimer
 from PySide6.QtGui import QAction, QIcon, QKeySequence, QTextCursor
 
 from ui.api_settings import ApiSettingsDialog
 from ui.theme_manager import ThemeSettingsDialog
 from api.base import get_provider_list, get_provider_class
-from utils.language_utils import get_language_list, get_language_name, get_language_code
+from api.cancellation import CancelToken, cancellation_scope
+from api.circuit import HALF_OPEN, OPEN, get_circuit_snapshot
+from api.deadline import deadline_scope, get_deadline
+from api.service import Replacement, TranslationService
+from utils.language_detect import get_language_detector
+from utils.language_utils import AUTO_DETECT, get_language_list, get_language_name, get_language_code
 
 
 class TranslationWorker(QThread):
     """Worker thread for running translations without blocking the UI."""
     finished = Signal(str, bool)  # Result, success/failure
+    chunk_received = Signal(str)  # Partial translation text while streaming
+    translation_replaced = Signal(str)  # Text replacing everything streamed so far
     
-    def __init__(self, provider, model, source_text, source_lang, target_lang):
+    def __init__(self, service, provider, model, source_text, source_lang, target_lang):
         super().__init__()
+        self.service = service
         self.provider = provider
         self.model = model
         self.source_text = source_text
         self.source_lang = source_lang
         self.target_lang = target_lang
+        self.cancel_token = CancelToken()
+        
+    def cancel(self):
+        """Stop the translation, closing its provider stream or connection."""
+        self.cancel_token.cancel()
         
     def run(self):
         try:
-            api_instance = get_provider_class(self.provider)()
-            result = api_instance.translate(
-                text=self.source_text,
-                model=self.model,
-                source_language=self.source_lang,
-                target_language=self.target_lang
-            )
-            self.finished.emit(result, True)
+            # Stream pieces to the UI as they arrive (cache hits arrive in one piece);
+            # the deadline keeps a hung connection from holding this worker forever
+            pieces = []
+            with cancellation_scope(self.cancel_token), \
+                    deadline_scope(get_deadline(self.service.settings, "request")):
+                for piece in self.service.translate_stream(
+                    provider_name=self.provider,
+                    model=self.model,
+                    text=self.source_text,
+                    source_language=self.source_lang,
+                    target_language=self.target_lang
+                ):
+                    if isinstance(piece, Replacement):
+                        pieces = [piece]
+                        self.translation_replaced.emit(piece)
+                    else:
+                        pieces.append(piece)
+                        self.chunk_received.emit(piece)
+            self.finished.emit("".join(pieces), True)
         except Exception as e:
-            self.finished.emit(str(e), False)
+            if not self.cancel_token.cancelled:
+                self.finished.emit(str(e), False)
 
 
 class MainWindow(QMainWindow):
@@ -44,6 +69,9 @@ class MainWindow(QMainWindow):
         super().__init__()
         self.settings = settings
         self.translation_worker = None
+        self.cancelled_workers = []  # Cancelled workers still winding down
+        self.streamed_translation = False
+        self.translation_service = TranslationService(settings)
         
         # Set up the UI
         self.setup_ui()
@@ -78,6 +106,25 @@ class MainWindow(QMainWindow):
         self.setStatusBar(self.statusBar)
         self.statusBar.showMessage("Ready")
         
+        # Endpoints whose circuit breaker is failing fast, kept at the right of the status bar
+        self.circuit_label = QLabel()
+        self.circuit_label.setVisible(False)
+        self.statusBar.addPermanentWidget(self.circuit_label)
+        self.circuit_timer = QTimer(self)
+        self.circuit_timer.timeout.connect(self.update_circuit_status)
+        self.circuit_timer.start(1000)
+        
+    def update_circuit_status(self):
+        """Show the endpoints whose circuit breaker is open or probing."""
+        parts = []
+        for endpoint, stats in get_circuit_snapshot().items():
+            if stats["state"] == OPEN:
+                parts.append(f"{endpoint}: unavailable, retry in {stats['retry_in']:.0f}s")
+            elif stats["state"] == HALF_OPEN:
+                parts.append(f"{endpoint}: recovering")
+        self.circuit_label.setText(" | ".join(parts))
+        self.circuit_label.setVisible(bool(parts))
+        
     def setup_toolbar(self):
         """Set up the application toolbar."""
         self.toolbar = QToolBar("Main Toolbar")
@@ -94,6 +141,13 @@ class MainWindow(QMainWindow):
         self.theme_settings_action.triggered.connect(self.show_theme_settings)
         self.toolbar.addAction(self.theme_settings_action)
         
+        # Cancel action, enabled while a translation is running
+        self.cancel_action = QAction(QIcon.fromTheme("process-stop"), "Cancel Translation", self)
+        self.cancel_action.setShortcut(QKeySequence(Qt.Key_Escape))
+        self.cancel_action.setEnabled(False)
+        self.cancel_action.triggered.connect(self.cancel_translation)
+        self.toolbar.addAction(self.cancel_action)
+        
         # Add separator
         self.toolbar.addSeparator()
         
@@ -132,6 +186,7 @@ class MainWindow(QMainWindow):
         # Source language selection
         language_layout.addWidget(QLabel("From:"))
         self.source_language_combo = QComboBox()
+        self.source_language_combo.addItem(AUTO_DETECT)
         self.source_language_combo.addItems(get_language_list())
         language_layout.addWidget(self.source_language_combo)
         
@@ -156,10 +211,16 @@ class MainWindow(QMainWindow):
         self.source_text = QTextEdit()
         source_layout.addWidget(self.source_text)
         
-        # Create translate button
+        # Create translate and cancel buttons
+        button_layout = QHBoxLayout()
         self.translate_button = QPushButton("Translate")
         self.translate_button.clicked.connect(self.translate_text)
-        source_layout.addWidget(self.translate_button)
+        button_layout.addWidget(self.translate_button)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_translation)
+        button_layout.addWidget(self.cancel_button)
+        source_layout.addLayout(button_layout)
         
         # Target text area
         self.target_text_frame = QFrame()
@@ -295,11 +356,18 @@ class MainWindow(QMainWindow):
     @Slot()
     def swap_languages(self):
         """Swap source and target languages."""
-        source_index = self.source_language_combo.currentIndex()
-        target_index = self.target_language_combo.currentIndex()
+        source_lang = self.source_language_combo.currentText()
+        target_lang = self.target_language_combo.currentText()
         
-        self.source_language_combo.setCurrentIndex(target_index)
-        self.target_language_combo.setCurrentIndex(source_index)
+        # Auto-detect has no target equivalent; swap in the detected language instead
+        if source_lang == AUTO_DETECT:
+            source_lang = get_language_detector().detect(self.source_text.toPlainText())
+            if source_lang is None:
+                self.statusBar.showMessage("Could not detect the language of the source text", 3000)
+                return
+        
+        self.source_language_combo.setCurrentText(target_lang)
+        self.target_language_combo.setCurrentText(source_lang)
         
         # Also swap text if there's content in both fields
         source_text = self.source_text.toPlainText()
@@ -339,8 +407,8 @@ class MainWindow(QMainWindow):
         api_key = self.settings.get_api_key(provider)
         print(f"DEBUG: API key from settings: {'[SET]' if api_key else '[NOT SET]'}")
 
-        # Check if API key is set in settings
-        if not api_key:
+        # Check if API key is set in settings (the router uses its backends' keys)
+        if not api_key and get_provider_class(provider).requires_api_key():
             print("DEBUG: API key is missing, showing settings dialog")
             QMessageBox.warning(
                 self,
@@ -377,38 +445,103 @@ class MainWindow(QMainWindow):
             self.show_api_settings()
             return
 
-        # Debug: Check if provider class can see the API key
+        # Warm up (or reuse) the configured provider instance for these credentials
         try:
-            provider_instance = provider_class()
-            provider_instance.set_api_key(api_key)
-            for field_name in additional_fields.keys():
-                field_value = self.settings.get_api_field(provider, field_name)
-                if hasattr(provider_instance, f"set_{field_name}"):
-                    getattr(provider_instance, f"set_{field_name}")(field_value)
-
-            print(f"DEBUG: Provider instance created with API key")
+            self.translation_service.get_provider(provider)
         except Exception as e:
-            print(f"DEBUG: Error creating provider instance: {str(e)}")
+            self.statusBar.showMessage(f"Error creating provider: {str(e)}", 5000)
+            QMessageBox.critical(self, "Provider Error", str(e))
+            return
 
+        # A new translation supersedes one still running
+        self.abort_translation_worker()
+        
         # Update UI during translation
-        self.translate_button.setEnabled(False)
-        self.statusBar.showMessage(f"Translating with {provider} {model}...")
+        self.set_translation_running(True)
+        if source_lang == AUTO_DETECT:
+            detected_lang = get_language_detector().detect(source_text)
+            self.statusBar.showMessage(f"Translating from {detected_lang or 'unknown language'} "
+                                       f"with {provider} {model}...")
+        else:
+            self.statusBar.showMessage(f"Translating with {provider} {model}...")
         self.target_text.setPlainText("Translating...")
+        self.streamed_translation = False
 
         # Start worker thread
         self.translation_worker = TranslationWorker(
-            provider, model, source_text, source_lang, target_lang
+            self.translation_service, provider, model, source_text, source_lang, target_lang
         )
         self.translation_worker.finished.connect(self.on_translation_finished)
+        self.translation_worker.chunk_received.connect(self.on_translation_chunk)
+        self.translation_worker.translation_replaced.connect(self.on_translation_replaced)
         self.translation_worker.start()
         
+    def set_translation_running(self, running):
+        """Enable the cancel controls while a translation is running."""
+        self.cancel_button.setEnabled(running)
+        self.cancel_action.setEnabled(running)
+        
+    def abort_translation_worker(self):
+        """Cancel the running translation, if any, and ignore anything it still reports."""
+        # Forget workers that have wound down since the last abort
+        self.cancelled_workers = [worker for worker in self.cancelled_workers if worker.isRunning()]
+        
+        worker = self.translation_worker
+        self.translation_worker = None
+        if worker is None:
+            return False
+        
+        # Disconnect even a finished worker, in case its last signals are still queued
+        worker.finished.disconnect(self.on_translation_finished)
+        worker.chunk_received.disconnect(self.on_translation_chunk)
+        worker.translation_replaced.disconnect(self.on_translation_replaced)
+        if not worker.isRunning():
+            return False
+        
+        worker.cancel()
+        # Keep a reference until the thread exits so Qt does not destroy it while running
+        self.cancelled_workers.append(worker)
+        return True
+    
+    @Slot()
+    def cancel_translation(self):
+        """Cancel the running translation at the user's request."""
+        if not self.abort_translation_worker():
+            return
+        
+        self.set_translation_running(False)
+        if not self.streamed_translation:
+            self.target_text.clear()  # Drop the "Translating..." placeholder
+        self.statusBar.showMessage("Translation cancelled", 3000)
+    
+    @Slot(str)
+    def on_translation_chunk(self, chunk):
+        """Append a streamed piece of the translation to the target pane."""
+        if not self.streamed_translation:
+            # First piece replaces the "Translating..." placeholder
+            self.target_text.clear()
+            self.streamed_translation = True
+        
+        # Insert at the end instead of resetting the whole document
+        cursor = QTextCursor(self.target_text.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(chunk)
+    
+    @Slot(str)
+    def on_translation_replaced(self, translation):
+        """Replace the streamed text, e.g. with a retranslation after a placeholder was lost."""
+        self.target_text.setPlainText(translation)
+        self.streamed_translation = True
+    
     @Slot(str, bool)
     def on_translation_finished(self, result, success):
         """Handle the translation process completion."""
-        self.translate_button.setEnabled(True)
+        self.set_translation_running(False)
         
         if success:
-            self.target_text.setPlainText(result)
+            # Streamed translations are already in the pane
+            if not self.streamed_translation:
+                self.target_text.setPlainText(result)
             self.statusBar.showMessage("Translation completed", 3000)
         else:
             self.target_text.setPlainText("")
@@ -0,0 +1,149 @@
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Tuple
+
+from utils.dedup import dedupe_segments
+
+
+# Boundaries to split on, from coarsest to finest. Each pattern has one
+# capturing group so re.split keeps the separators.
+_PARAGRAPH_RE = re.compile(r"(\n[ \t]*\n\s*)")
+_SENTENCE_RE = re.compile(r"((?<=[.!?;:])\s+|(?<=[。！？；])\s*)")
+_WORD_RE = re.compile(r"(\s+)")
+_SPLIT_LEVELS = [_PARAGRAPH_RE, _SENTENCE_RE, _WORD_RE]
+
+# A piece of text and whether it should be sent for translation.
+# Whitespace between chunks is kept as-is and never translated.
+Piece = Tuple[str, bool]
+
+
+def estimate_tokens(text: str) -> int:
+    """Roughly estimate the number of tokens in text.
+
+    Latin-script text averages about four characters per token, while CJK
+    and most other non-ASCII scripts are closer to one token per character.
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def _split(text: str, level: int) -> List[str]:
+    """Split text at a boundary level into [content, separator, content, ...]."""
+    return _SPLIT_LEVELS[level].split(text)
+
+
+def _hard_split(text: str, max_tokens: int) -> List[Piece]:
+    """Split text with no usable boundaries into fixed-size pieces."""
+    pieces = []
+    start = 0
+    ascii_chars = other_chars = 0
+    for index, char in enumerate(text):
+        if ord(char) < 128:
+            ascii_chars += 1
+        else:
+            other_chars += 1
+
+        if (ascii_chars + 3) // 4 + other_chars > max_tokens and index > start:
+            pieces.append((text[start:index], True))
+            start = index
+            ascii_chars, other_chars = (1, 0) if ord(char) < 128 else (0, 1)
+
+    pieces.append((text[start:], True))
+    return pieces
+
+
+def _chunk(text: str, max_tokens: int, level: int) -> List[Piece]:
+    """Chunk text that has no leading or trailing whitespace."""
+    if estimate_tokens(text) <= max_tokens:
+        return [(text, True)]
+    if level >= len(_SPLIT_LEVELS):
+        return _hard_split(text, max_tokens)
+
+    parts = _split(text, level)
+    if len(parts) == 1:
+        return _chunk(text, max_tokens, level + 1)
+
+    pieces = []
+    current = ""
+    for index in range(0, len(parts), 2):
+        content = parts[index]
+        separator = parts[index - 1] if index > 0 else ""
+
+        if current and estimate_tokens(current + separator + content) <= max_tokens:
+            current += separator + content
+            continue
+
+        # Close the chunk being built and keep the separator untranslated
+        if current:
+            pieces.append((current, True))
+        if separator:
+            pieces.append((separator, False))
+
+        if estimate_tokens(content) <= max_tokens:
+            current = content
+        else:
+            pieces.extend(_chunk(content, max_tokens, level + 1))
+            current = ""
+
+    if current:
+        pieces.append((current, True))
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int) -> List[Piece]:
+    """Split text into translatable chunks of at most max_tokens each.
+
+    Chunks are cut at paragraph boundaries where possible, then sentences,
+    then words. Joining the text of all returned pieces reproduces the input
+    exactly, including all whitespace.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return [(text, False)] if text else []
+
+    start = text.index(stripped)
+    leading = text[:start]
+    trailing = text[start + len(stripped):]
+
+    pieces = []
+    if leading:
+        pieces.append((leading, False))
+    pieces.extend(_chunk(stripped, max_tokens, 0))
+    if trailing:
+        pieces.append((trailing, False))
+    return pieces
+
+
+def translate_chunks(pieces: List[Piece], translate_fn: Callable[[str], str],
+                     max_workers: int = 4) -> Iterator[str]:
+    """Translate chunks concurrently, yielding output pieces in the original order.
+
+    Each output piece is yielded as soon as it and everything before it are
+    done, so callers can show progress while later chunks are still running.
+    Chunks that repeat within the document are translated once.
+    """
+    unique, positions = dedupe_segments([text for text, translatable in pieces if translatable])
+    if len(unique) <= 1 or max_workers <= 1:
+        translations = {}
+        chunk_positions = iter(positions)
+        for text, translatable in pieces:
+            if not translatable:
+                yield text
+                continue
+            position = next(chunk_positions)
+            if position not in translations:
+                translations[position] = translate_fn(unique[position]).strip()
+            yield translations[position]
+        return
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique))) as executor:
+        # Copy the caller's context so per-call state follows each chunk
+        futures = [executor.submit(contextvars.copy_context().run, translate_fn, text) for text in unique]
+        try:
+            chunk_positions = iter(positions)
+            for text, translatable in pieces:
+                yield futures[next(chunk_positions)].result().strip() if translatable else text
+        finally:
+            for future in futures:
+                future.cancel()
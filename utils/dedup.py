@@ -0,0 +1,64 @@
+import hashlib
+from typing import Dict, List, Optional, Tuple
+
+from utils.translation_memory import normalize_text
+
+
+def segment_key(text: str) -> str:
+    """Content hash of a segment, ignoring whitespace differences."""
+    return hashlib.sha1(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def split_whitespace(text: str) -> Tuple[str, str, str]:
+    """Split text into (leading whitespace, content, trailing whitespace)."""
+    core = text.strip()
+    if not core:
+        return text, "", ""
+    start = text.index(core)
+    return text[:start], core, text[start + len(core):]
+
+
+def dedupe_segments(texts: List[str]) -> Tuple[List[str], List[Optional[int]]]:
+    """Collapse repeated segments before dispatch.
+
+    Returns the unique segment contents (first occurrence wins, without outer
+    whitespace) and, for each input, the index of its unique segment, or None
+    for blank inputs that need no translation.
+    """
+    unique: List[str] = []
+    positions: List[Optional[int]] = []
+    seen: Dict[str, int] = {}
+    for text in texts:
+        leading, core, trailing = split_whitespace(text)
+        if not core:
+            positions.append(None)
+            continue
+
+        key = segment_key(core)
+        if key not in seen:
+            seen[key] = len(unique)
+            unique.append(core)
+        positions.append(seen[key])
+    return unique, positions
+
+
+def fan_out(texts: List[str], positions: List[Optional[int]], translations: List[str]) -> List[str]:
+    """Map unique translations back onto every occurrence, keeping each one's outer whitespace."""
+    results = []
+    for text, position in zip(texts, positions):
+        if position is None:
+            results.append(text)
+            continue
+        leading, _, trailing = split_whitespace(text)
+        results.append(leading + translations[position].strip() + trailing)
+    return results
+
+
+def get_dedup_stats(total: int, unique: int) -> Dict[str, float]:
+    """Summarize a dedup pass: segments, unique segments, ratio and calls saved."""
+    return {
+        "segments": total,
+        "unique_segments": unique,
+        "dedup_ratio": round(1 - unique / total, 4) if total else 0.0,
+        "calls_saved": total - unique
+    }
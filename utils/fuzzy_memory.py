@@ -0,0 +1,236 @@
+import hashlib
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Set
+
+from utils.language_utils import get_language_code
+from utils.translation_memory import normalize_text
+
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+
+# MinHash signature layout: NUM_BANDS bands of ROWS_PER_BAND values. Two
+# segments become candidates when any band matches exactly, which happens
+# with probability 1 - (1 - s^ROWS_PER_BAND)^NUM_BANDS for similarity s
+# (about 0.98 at s = 0.8 and 0.10 at s = 0.3).
+NUM_BANDS = 8
+ROWS_PER_BAND = 4
+_NUM_PERMUTATIONS = NUM_BANDS * ROWS_PER_BAND
+_MERSENNE_PRIME = (1 << 61) - 1
+
+_permutation_random = random.Random(1729)
+_PERMUTATIONS = [
+    (_permutation_random.randrange(1, _MERSENNE_PRIME), _permutation_random.randrange(0, _MERSENNE_PRIME))
+    for _ in range(_NUM_PERMUTATIONS)
+]
+
+
+def _mask_numbers(text: str) -> str:
+    return _NUMBER_RE.sub("#", text)
+
+
+def get_shingles(text: str, size: int = 3) -> Set[str]:
+    """Character n-grams of the normalized, lower-cased text with numbers masked."""
+    text = _mask_numbers(normalize_text(text).lower())
+    if len(text) <= size:
+        return {text}
+    return {text[index:index + size] for index in range(len(text) - size + 1)}
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+def get_signature(shingles: Set[str]) -> List[int]:
+    """MinHash signature of a shingle set."""
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles]
+    return [min((a * value + b) % _MERSENNE_PRIME for value in hashes) for a, b in _PERMUTATIONS]
+
+
+def get_band_keys(signature: List[int], source_code: str, target_code: str) -> List[int]:
+    """Hash each band of a signature (scoped to the language pair) into a 63-bit key."""
+    keys = []
+    for band in range(NUM_BANDS):
+        rows = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            f"{source_code}>{target_code}:{band}:{rows}".encode("ascii"), digest_size=8
+        ).digest()
+        keys.append(int.from_bytes(digest, "big") >> 1)
+    return keys
+
+
+def adapt_translation(text: str, match_source: str, match_translation: str) -> Optional[str]:
+    """Reuse a near-match's translation for text by swapping in text's numbers.
+
+    Only applies when the two sources are identical apart from their numbers
+    and the match's numbers appear in its translation in the same order.
+    Returns None when the translation cannot be safely adapted.
+    """
+    if _mask_numbers(normalize_text(text)) != _mask_numbers(normalize_text(match_source)):
+        return None
+
+    new_numbers = _NUMBER_RE.findall(text)
+    if _NUMBER_RE.findall(match_source) != _NUMBER_RE.findall(match_translation):
+        return None
+
+    replacements = iter(new_numbers)
+    return _NUMBER_RE.sub(lambda match: next(replacements), match_translation)
+
+
+class FuzzyMemory:
+    """Near-match index over previously translated segments.
+
+    Segments are indexed by MinHash LSH over character trigrams, so a lookup
+    costs a handful of indexed band-key queries no matter how many segments
+    are stored. Candidates are then verified by exact Jaccard similarity.
+    Numbers are masked before hashing so segments that differ only in their
+    numbers are treated as identical.
+    """
+
+    def __init__(self, db_path: str, threshold: float = 0.75, max_entries: int = 1000000,
+                 max_segment_chars: int = 1000, max_candidates: int = 200):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_segment_chars = max_segment_chars
+        self.max_candidates = max_candidates
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " source_key TEXT UNIQUE NOT NULL,"
+            " source_text TEXT NOT NULL,"
+            " translation TEXT NOT NULL,"
+            " source_code TEXT NOT NULL,"
+            " target_code TEXT NOT NULL,"
+            " provider TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS bands (band_key INTEGER NOT NULL, segment_id INTEGER NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS bands_key ON bands (band_key)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS bands_segment ON bands (segment_id)")
+        self._connection.commit()
+        self._entry_count = self._connection.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    def accepts(self, text: str) -> bool:
+        """Check whether a segment is short enough to index and look up."""
+        return bool(text.strip()) and len(text) <= self.max_segment_chars
+
+    def add(self, text: str, source_language: str, target_language: str,
+            provider: str, model: str, translation: str) -> None:
+        """Index a finished translation."""
+        if not self.accepts(text):
+            return
+
+        source_code = get_language_code(source_language)
+        target_code = get_language_code(target_language)
+        # Variants differing only in numbers share one entry; adapt_translation covers the rest
+        source_key = hashlib.sha256("\x1f".join(
+            [_mask_numbers(normalize_text(text)), source_code, target_code, provider, model or ""]
+        ).encode("utf-8")).hexdigest()
+        band_keys = get_band_keys(get_signature(get_shingles(text)), source_code, target_code)
+
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO segments"
+                " (source_key, source_text, translation, source_code, target_code, provider, model, created)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (source_key, text, translation, source_code, target_code, provider, model or "", time.time())
+            )
+            if cursor.rowcount != 1:
+                return
+
+            segment_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO bands (band_key, segment_id) VALUES (?, ?)",
+                [(band_key, segment_id) for band_key in band_keys]
+            )
+            self._entry_count += 1
+            if self._entry_count > self.max_entries:
+                self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        """Drop the oldest segments until the index is back under 90% of max_entries."""
+        excess = self._entry_count - int(self.max_entries * 0.9)
+        cutoff = self._connection.execute(
+            "SELECT id FROM segments ORDER BY id LIMIT 1 OFFSET ?", (excess - 1,)
+        ).fetchone()[0]
+        self._connection.execute("DELETE FROM bands WHERE segment_id <= ?", (cutoff,))
+        self._connection.execute("DELETE FROM segments WHERE id <= ?", (cutoff,))
+        self._entry_count -= excess
+
+    def search(self, text: str, source_language: str, target_language: str,
+               limit: int = 3) -> List[Dict[str, Any]]:
+        """Find the most similar translated segments at or above the threshold.
+
+        Returns up to limit matches, most similar first, each with its
+        source_text, translation, similarity, provider and model.
+        """
+        if not self.accepts(text):
+            return []
+
+        shingles = get_shingles(text)
+        band_keys = get_band_keys(get_signature(shingles),
+                                  get_language_code(source_language), get_language_code(target_language))
+
+        # Segments sharing more bands are likelier to be similar, so with more
+        # candidates than max_candidates those are the ones scored
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT s.source_text, s.translation, s.provider, s.model"
+                " FROM (SELECT segment_id, COUNT(*) AS matched FROM bands"
+                f"       WHERE band_key IN ({','.join('?' * len(band_keys))})"
+                "       GROUP BY segment_id ORDER BY matched DESC, segment_id DESC LIMIT ?) c"
+                " JOIN segments s ON s.id = c.segment_id",
+                band_keys + [self.max_candidates]
+            ).fetchall()
+
+        matches = []
+        for source_text, translation, provider, model in rows:
+            similarity = jaccard(shingles, get_shingles(source_text))
+            if similarity >= self.threshold:
+                matches.append({
+                    "source_text": source_text,
+                    "translation": translation,
+                    "similarity": round(similarity, 4),
+                    "provider": provider,
+                    "model": model
+                })
+        matches.sort(key=lambda match: match["similarity"], reverse=True)
+
+        with self._lock:
+            if matches:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return matches[:limit]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get near-hit/miss counters and the number of indexed segments."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": self._entry_count}
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
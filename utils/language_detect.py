@@ -0,0 +1,222 @@
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from utils.language_utils import LANGUAGE_CODES, get_language_name, get_language_scripts, get_script
+
+
+_RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources")
+MODEL_PATH = os.path.join(_RESOURCES_DIR, "language_model.json")
+SAMPLES_PATH = os.path.join(_RESOURCES_DIR, "language_samples.txt")
+
+NGRAM_SIZES = (1, 2, 3)  # Must start with 1
+PRIOR_WEIGHT = 1.0
+# Log-odds the best language needs over the runner-up; closer calls are
+# reported as undetected rather than guessed
+MIN_MARGIN = 4.0
+# Texts scored per numpy gather, bounding its temporary array
+_BATCH_SIZE = 256
+_NON_LETTER_RE = re.compile(r"[\W\d_]+")
+
+
+def get_ngrams(text: str, max_chars: int = 256) -> List[str]:
+    """Character 1- to 3-grams of the lower-cased letters, with words padded by spaces."""
+    text = " " + _NON_LETTER_RE.sub(" ", text[:max_chars].lower()).strip() + " "
+    ngrams = [char for char in text if char != " "]
+    for size in NGRAM_SIZES[1:]:
+        ngrams.extend([text[index:index + size] for index in range(len(text) - size + 1)])
+    return ngrams
+
+
+def get_main_script(text: str, max_chars: int = 256) -> Optional[str]:
+    """The script most of the text's letters are written in (Kana wins over Han), or None."""
+    counts = Counter(get_script(char) for char in text[:max_chars] if char.isalpha())
+    if not counts:
+        return None
+    if "Kana" in counts:
+        return "Kana"
+    return counts.most_common(1)[0][0]
+
+
+def build_model(samples_path: str = SAMPLES_PATH, model_path: str = MODEL_PATH,
+                max_ngrams: int = 300, floor: float = 1e-4) -> None:
+    """Build the n-gram model from the training samples and write it as JSON.
+
+    For each n-gram size, a language keeps the log relative frequencies of
+    its max_ngrams most frequent n-grams. Every other n-gram gets the same
+    floor in every language, so languages with less training text are not
+    favoured.
+    """
+    counts: Dict[str, Counter] = defaultdict(Counter)
+    with open(samples_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            code, text = line.rstrip("\n").split("\t", 1)
+            counts[code].update(get_ngrams(text, max_chars=len(text)))
+
+    languages = {}
+    for code, ngram_counts in sorted(counts.items()):
+        ngrams = {}
+        for size in NGRAM_SIZES:
+            sized = Counter({ngram: count for ngram, count in ngram_counts.items() if len(ngram) == size})
+            total = sum(sized.values())
+            for ngram, count in sized.most_common(max_ngrams):
+                ngrams[ngram] = round(math.log(count / total), 3)
+        languages[code] = ngrams
+
+    with open(model_path, "w", encoding="utf-8") as f:
+        json.dump({"ngram_sizes": list(NGRAM_SIZES), "floor": round(math.log(floor), 3), "languages": languages},
+                  f, ensure_ascii=False, separators=(",", ":"))
+
+
+def _import_numpy():
+    """Import numpy on first use, keeping it off the startup path; None if it is not installed."""
+    try:
+        import numpy
+    except ImportError:  # Batches are scored in pure Python instead
+        return None
+    return numpy
+
+
+def _pick(codes: List[str], best: int, margin: float) -> Optional[str]:
+    """The best code, or None when it does not beat the runner-up by MIN_MARGIN."""
+    return codes[best] if margin >= MIN_MARGIN else None
+
+
+class _ScriptGroup:
+    """Scoring table for the languages sharing one script."""
+
+    def __init__(self, codes: List[str], languages: Dict[str, Dict[str, float]], floor: float,
+                 priors: List[float]):
+        self.codes = codes
+        self.priors = priors
+        vocabulary = sorted({ngram for code in codes for ngram in languages[code]})
+        self.index = {ngram: position for position, ngram in enumerate(vocabulary)}
+        self.rows = [[languages[code].get(ngram, floor) for code in codes] for ngram in vocabulary]
+        self.numpy = _import_numpy()
+        self.matrix = self.numpy.array(self.rows, dtype=self.numpy.float32) if self.numpy is not None else None
+
+    def get_features(self, text: str) -> List[int]:
+        return [self.index[ngram] for ngram in get_ngrams(text) if ngram in self.index]
+
+    def _score_chunk(self, features: List[List[int]]) -> List[Optional[str]]:
+        """Score a chunk of feature lists with one gather and one segmented sum."""
+        results: List[Optional[str]] = [None] * len(features)
+        present = [position for position, indexes in enumerate(features) if indexes]
+        if not present:
+            return results
+
+        numpy = self.numpy
+        lengths = [len(features[position]) for position in present]
+        offsets = numpy.cumsum([0] + lengths[:-1])
+        flat = numpy.fromiter((index for position in present for index in features[position]),
+                              dtype=numpy.int64, count=sum(lengths))
+        scores = numpy.add.reduceat(self.matrix[flat], offsets, axis=0) + self.priors
+        if len(self.codes) > 1:
+            top_two = numpy.partition(scores, -2, axis=1)[:, -2:]
+            margins = top_two[:, 1] - top_two[:, 0]
+        else:
+            margins = numpy.full(len(present), numpy.inf)
+        for position, best, margin in zip(present, scores.argmax(axis=1), margins):
+            results[position] = _pick(self.codes, best, margin)
+        return results
+
+    def score_batch(self, features: List[List[int]]) -> List[Optional[str]]:
+        """Pick the most likely language for each feature list (None when it has no features or is a close call)."""
+        if self.matrix is not None:
+            results: List[Optional[str]] = []
+            for start in range(0, len(features), _BATCH_SIZE):
+                results.extend(self._score_chunk(features[start:start + _BATCH_SIZE]))
+            return results
+
+        results = []
+        for indexes in features:
+            if not indexes:
+                results.append(None)
+                continue
+            totals = [sum(column, prior) for column, prior
+                      in zip(zip(*[self.rows[index] for index in indexes]), self.priors)]
+            ranked = sorted(range(len(totals)), key=totals.__getitem__, reverse=True)
+            margin = totals[ranked[0]] - totals[ranked[1]] if len(ranked) > 1 else math.inf
+            results.append(_pick(self.codes, ranked[0], margin))
+        return results
+
+
+class LanguageDetector:
+    """Offline language identification for the supported languages.
+
+    The script of the letters settles most languages outright; languages
+    sharing a script (Latin, Cyrillic, Arabic, ...) are told apart by a naive
+    Bayes model over character n-grams, precomputed from
+    resources/language_samples.txt. Batches are scored together with numpy
+    when it is installed.
+    """
+
+    def __init__(self, model_path: str = MODEL_PATH):
+        with open(model_path, "r", encoding="utf-8") as f:
+            model = json.load(f)
+        languages = model["languages"]
+
+        # LANGUAGE_CODES lists the most widely spoken languages first; a mild
+        # prior by that rank breaks near-ties such as Spanish and Galician
+        ranks: Dict[str, int] = {}
+        for code in LANGUAGE_CODES.values():
+            ranks.setdefault(code, len(ranks))
+        by_script: Dict[str, List[str]] = defaultdict(list)
+        for code in ranks:
+            by_script[get_language_scripts(code)[0]].append(code)
+
+        self._single: Dict[str, str] = {}
+        self._groups: Dict[str, _ScriptGroup] = {}
+        for script, codes in by_script.items():
+            modeled = [code for code in codes if code in languages]
+            if len(codes) == 1:
+                self._single[script] = codes[0]
+            elif modeled:
+                priors = [-PRIOR_WEIGHT * math.log(ranks[code] + 1) for code in modeled]
+                self._groups[script] = _ScriptGroup(modeled, languages, model["floor"], priors)
+
+    def detect(self, text: str) -> Optional[str]:
+        """Detect the language of text; returns its name, or None if it has no letters or is too ambiguous."""
+        return self.detect_batch([text])[0]
+
+    def detect_batch(self, texts: Sequence[str]) -> List[Optional[str]]:
+        """Detect the language of each text, scoring texts of the same script together."""
+        codes: List[Optional[str]] = [None] * len(texts)
+        pending: Dict[str, List[Tuple[int, List[int]]]] = defaultdict(list)
+        for position, text in enumerate(texts):
+            script = get_main_script(text)
+            if script in self._single:
+                codes[position] = self._single[script]
+            elif script in self._groups:
+                pending[script].append((position, self._groups[script].get_features(text)))
+
+        for script, items in pending.items():
+            results = self._groups[script].score_batch([features for _, features in items])
+            for (position, _), code in zip(items, results):
+                codes[position] = code
+
+        return [get_language_name(code) if code else None for code in codes]
+
+
+_detector: Optional[LanguageDetector] = None
+_detector_lock = threading.Lock()
+
+
+def get_language_detector() -> LanguageDetector:
+    """Get the shared detector, loading the model on first use."""
+    global _detector
+    with _detector_lock:
+        if _detector is None:
+            _detector = LanguageDetector()
+        return _detector
+
+
+if __name__ == "__main__":
+    build_model()
+    print(f"Wrote {MODEL_PATH}")
@@ -1,3 +1,5 @@
+from bisect import bisect_right
+
 # Map of language names to ISO 639-1 codes
 LANGUAGE_CODES = {
     "English": "en",
@@ -110,6 +112,55 @@ LANGUAGE_CODES = {
 # Reverse map for looking up names from codes
 LANGUAGE_NAMES = {code: name for name, code in LANGUAGE_CODES.items()}
 
+# Source language option that detects the language of each text
+AUTO_DETECT = "Auto-detect"
+
+# Letter ranges of the non-Latin scripts, keyed by script name
+_SCRIPT_RANGES = {
+    "Cyrillic": [(0x0400, 0x052F)],
+    "Greek": [(0x0370, 0x03FF)],
+    "Armenian": [(0x0530, 0x058F)],
+    "Hebrew": [(0x0590, 0x05FF)],
+    "Arabic": [(0x0600, 0x06FF), (0x0750, 0x077F), (0xFB50, 0xFDFF), (0xFE70, 0xFEFF)],
+    "Devanagari": [(0x0900, 0x097F)],
+    "Bengali": [(0x0980, 0x09FF)],
+    "Gurmukhi": [(0x0A00, 0x0A7F)],
+    "Gujarati": [(0x0A80, 0x0AFF)],
+    "Odia": [(0x0B00, 0x0B7F)],
+    "Tamil": [(0x0B80, 0x0BFF)],
+    "Telugu": [(0x0C00, 0x0C7F)],
+    "Kannada": [(0x0C80, 0x0CFF)],
+    "Malayalam": [(0x0D00, 0x0D7F)],
+    "Sinhala": [(0x0D80, 0x0DFF)],
+    "Thai": [(0x0E00, 0x0E7F)],
+    "Lao": [(0x0E80, 0x0EFF)],
+    "Myanmar": [(0x1000, 0x109F)],
+    "Georgian": [(0x10A0, 0x10FF)],
+    "Hangul": [(0x1100, 0x11FF), (0x3130, 0x318F), (0xAC00, 0xD7AF)],
+    "Ethiopic": [(0x1200, 0x137F)],
+    "Khmer": [(0x1780, 0x17FF)],
+    "Kana": [(0x3040, 0x30FF)],
+    "Han": [(0x3400, 0x4DBF), (0x4E00, 0x9FFF), (0xF900, 0xFAFF)],
+}
+
+# The same ranges sorted by start, for binary search
+_SCRIPT_BOUNDS = sorted((start, end, script) for script, ranges in _SCRIPT_RANGES.items() for start, end in ranges)
+_SCRIPT_STARTS = [start for start, _, _ in _SCRIPT_BOUNDS]
+
+# Scripts a language is written in, main script first (languages not listed use Latin script)
+_LANGUAGE_SCRIPTS = {
+    "ru": ("Cyrillic",), "uk": ("Cyrillic",), "bg": ("Cyrillic",), "sr": ("Cyrillic",),
+    "mk": ("Cyrillic",), "mn": ("Cyrillic",), "kk": ("Cyrillic",), "ky": ("Cyrillic",),
+    "tg": ("Cyrillic",), "el": ("Greek",), "hy": ("Armenian",), "he": ("Hebrew",),
+    "yi": ("Hebrew",), "ar": ("Arabic",), "fa": ("Arabic",), "ur": ("Arabic",),
+    "ps": ("Arabic",), "sd": ("Arabic",), "hi": ("Devanagari",), "mr": ("Devanagari",),
+    "ne": ("Devanagari",), "bn": ("Bengali",), "as": ("Bengali",), "pa": ("Gurmukhi",),
+    "gu": ("Gujarati",), "or": ("Odia",), "ta": ("Tamil",), "te": ("Telugu",),
+    "kn": ("Kannada",), "ml": ("Malayalam",), "si": ("Sinhala",), "th": ("Thai",),
+    "lo": ("Lao",), "my": ("Myanmar",), "ka": ("Georgian",), "ko": ("Hangul",),
+    "am": ("Ethiopic",), "km": ("Khmer",), "ja": ("Kana", "Han"), "zh": ("Han",),
+}
+
 
 def get_language_list():
     """Get a list of all supported language names."""
@@ -129,3 +180,38 @@ def get_language_name(language_code):
 def is_valid_language(language_name):
     """Check if a language name is supported."""
     return language_name in LANGUAGE_CODES
+
+
+def find_language(value):
+    """Find a supported language by name or ISO code, ignoring case; None if unknown."""
+    if value in LANGUAGE_CODES:
+        return value
+    if value in LANGUAGE_NAMES:
+        return LANGUAGE_NAMES[value]
+    for name in LANGUAGE_CODES:
+        if name.lower() == value.lower():
+            return name
+    return None
+
+
+def find_source_language(value):
+    """Like find_language, but also accepts "auto" for language auto-detection."""
+    if value.lower() in ("auto", AUTO_DETECT.lower()):
+        return AUTO_DETECT
+    return find_language(value)
+
+
+def get_script(char):
+    """Name the script of a letter ("Latin" for anything not in a listed range)."""
+    code_point = ord(char)
+    if code_point < _SCRIPT_STARTS[0]:
+        return "Latin"
+    position = bisect_right(_SCRIPT_STARTS, code_point) - 1
+    if position >= 0 and code_point <= _SCRIPT_BOUNDS[position][1]:
+        return _SCRIPT_BOUNDS[position][2]
+    return "Latin"
+
+
+def get_language_scripts(language_code):
+    """Get the scripts a language is written in, main script first."""
+    return _LANGUAGE_SCRIPTS.get(language_code, ("Latin",))
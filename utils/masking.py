@@ -0,0 +1,107 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+# Protected spans, in priority order. Each is swapped for a placeholder the
+# model copies through untouched, so it costs a couple of tokens instead of
+# its full length and templated segments share one cache entry.
+_PROTECTED_PATTERNS = [
+    ("code_block", r"```.*?```"),
+    ("inline_code", r"`[^`\n]+`"),
+    ("url", r"\b(?:https?://|www\.)[^\s<>\"']*[^\s<>\"'.,;:!?)\]]"),
+    ("email", r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b"),
+    ("format", r"\{[\w.:!\[\]-]*\}|%\d+\$[sd]|%(?:\(\w+\))?[-#0+]*\d*(?:\.\d+)?[sdifFeEgGxXoc]"),
+    ("markup", r"</?[A-Za-z][\w:-]*(?:\s[^<>]*)?/?>|&(?:[A-Za-z]+|#\d+);"),
+    ("datetime", r"\b\d{4}-\d{2}-\d{2}(?:[T ]\d{2}:\d{2}(?::\d{2})?)?\b|\b\d{1,2}:\d{2}(?::\d{2})?\b"),
+    ("number", r"(?<![\w.,])\d+(?:[.,]\d+)*(?![.,]?\w)"),
+]
+
+_PLACEHOLDER_OPEN = "⟦"
+_PLACEHOLDER_CLOSE = "⟧"
+_PLACEHOLDER_RE = re.compile(rf"{_PLACEHOLDER_OPEN}\s*(\d+)\s*{_PLACEHOLDER_CLOSE}")
+
+
+ALL_KINDS = tuple(kind for kind, _ in _PROTECTED_PATTERNS)
+_pattern_cache: Dict[Tuple[str, ...], "re.Pattern"] = {}
+
+
+def _get_pattern(kinds: Tuple[str, ...]) -> "re.Pattern":
+    """Compile (once) the combined pattern for a set of span kinds."""
+    pattern = _pattern_cache.get(kinds)
+    if pattern is None:
+        pattern = re.compile(
+            "|".join(f"(?:{regex})" for kind, regex in _PROTECTED_PATTERNS if kind in kinds),
+            re.DOTALL
+        )
+        _pattern_cache[kinds] = pattern
+    return pattern
+
+
+def make_placeholder(number: int) -> str:
+    """The placeholder text for a protected span."""
+    return f"{_PLACEHOLDER_OPEN}{number}{_PLACEHOLDER_CLOSE}"
+
+
+def mask_text(text: str, kinds: Iterable[str] = ALL_KINDS) -> Tuple[str, List[str]]:
+    """Swap protected spans for numbered placeholders.
+
+    Returns the masked text and the original spans (placeholder n restores
+    spans[n - 1]). Repeats of the same span share a placeholder, so the same
+    template always masks to the same text. Text that already contains the
+    placeholder brackets is returned unmasked.
+    """
+    if _PLACEHOLDER_OPEN in text or _PLACEHOLDER_CLOSE in text:
+        return text, []
+
+    spans: List[str] = []
+    numbers: Dict[str, int] = {}
+
+    def replace(match):
+        span = match.group(0)
+        if span not in numbers:
+            spans.append(span)
+            numbers[span] = len(spans)
+        return make_placeholder(numbers[span])
+
+    masked = _get_pattern(tuple(kinds)).sub(replace, text)
+    return masked, spans
+
+
+def placeholders_intact(masked_source: str, translation: str) -> bool:
+    """Check that the translation kept every placeholder exactly as often as the source."""
+    expected = Counter(_PLACEHOLDER_RE.findall(masked_source))
+    return Counter(_PLACEHOLDER_RE.findall(translation)) == expected
+
+
+def unmask_text(translation: str, spans: List[str]) -> str:
+    """Restore the original spans in a masked translation."""
+    if not spans:
+        return translation
+
+    def restore(match):
+        number = int(match.group(1))
+        return spans[number - 1] if 1 <= number <= len(spans) else match.group(0)
+
+    return _PLACEHOLDER_RE.sub(restore, translation)
+
+
+def unmask_stream(pieces: Iterable[str], spans: List[str]) -> Iterator[str]:
+    """Restore spans in a streamed translation, holding back a placeholder split across pieces."""
+    if not spans:
+        yield from pieces
+        return
+
+    pending = ""
+    for piece in pieces:
+        pending += piece
+        cut = pending.rfind(_PLACEHOLDER_OPEN)
+        if cut != -1 and _PLACEHOLDER_CLOSE not in pending[cut:]:
+            ready, pending = pending[:cut], pending[cut:]
+        else:
+            ready, pending = pending, ""
+        if ready:
+            yield unmask_text(ready, spans)
+
+    if pending:
+        yield unmask_text(pending, spans)
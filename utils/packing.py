@@ -0,0 +1,62 @@
+import re
+from typing import Dict, List
+
+from utils.chunking import estimate_tokens
+
+
+# Each packed segment is wrapped in a numbered tag. Translators reliably
+# carry markup through unchanged, so the tags show which output belongs to
+# which input and a dropped or merged segment is detected rather than
+# silently shifting every translation after it.
+_SEGMENT_RE = re.compile(r'<seg id="(\d+)">(.*?)</seg>', re.DOTALL)
+
+# Overhead of the tags around each segment, in estimated tokens
+_TAG_TOKENS = 8
+
+
+def can_pack(text: str) -> bool:
+    """Check whether a segment can be packed (it must not contain the delimiter itself)."""
+    return "<seg" not in text and "</seg>" not in text
+
+
+def plan_batches(texts: List[str], max_tokens: int, max_segments: int) -> List[List[int]]:
+    """Group segment indexes into batches of at most max_tokens and max_segments."""
+    batches = []
+    current = []
+    current_tokens = 0
+    for index, text in enumerate(texts):
+        tokens = estimate_tokens(text) + _TAG_TOKENS
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_segments):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+        current.append(index)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+    return batches
+
+
+def pack_segments(texts: List[str]) -> str:
+    """Pack segments into one text, numbering them from 1."""
+    return "\n".join(f'<seg id="{number}">{text}</seg>' for number, text in enumerate(texts, 1))
+
+
+def unpack_segments(response: str, count: int) -> Dict[int, str]:
+    """Parse a packed translation into {position: translation}.
+
+    Only segments that line up are returned: each number from 1 to count
+    that appears exactly once with non-empty content. Callers retry the
+    positions that are missing.
+    """
+    found: Dict[int, List[str]] = {}
+    for match in _SEGMENT_RE.finditer(response):
+        found.setdefault(int(match.group(1)), []).append(match.group(2).strip())
+
+    aligned = {}
+    for number in range(1, count + 1):
+        matches = found.get(number, [])
+        if len(matches) == 1 and matches[0]:
+            aligned[number - 1] = matches[0]
+    return aligned
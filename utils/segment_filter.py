@@ -0,0 +1,78 @@
+import re
+from typing import Optional
+
+from utils.language_utils import get_language_code, get_language_scripts, get_script
+from utils.masking import mask_text
+
+
+# Segments that are nothing but these need no translation
+_NUMBER_RE = re.compile(r"[\s\d.,:;/+\-−–%()#°€$£¥₹]*\d[\s\d.,:;/+\-−–%()#°€$£¥₹]*")
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+")
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+# One fenced block or one inline code span; fullmatch must not join two blocks
+# and the prose between them
+_CODE_BLOCK_RE = re.compile(r"```(?:(?!```).)*```|`[^`\n]+`", re.DOTALL)
+# Paths, file names and code names; a single slash between words ("Yes/No",
+# "km/h") is ordinary text
+_PATH_RE = re.compile(r"(?:/|\.{1,2}/|~/|[A-Za-z]:[/\\])[\w./\\-]*|[\w.-]+\\[\w.\\-]+")
+_FILE_NAME_RE = re.compile(r"(?:[\w.-]+[/\\])*[\w-]{2,}\.[a-z0-9]{1,5}")
+_CODE_NAME_RE = re.compile(r"[\w.-]*_[\w.-]*")
+_NESTED_PATH_RE = re.compile(r"[\w.-]+(?:/[\w.-]+){2,}")
+_PLACEHOLDER_RE = re.compile(r"⟦\d+⟧")
+
+def is_in_target_script(text: str, source_language: str, target_language: str) -> bool:
+    """Check whether text is already written entirely in the target language's script.
+
+    Only conclusive when the source and target languages use different
+    scripts, so it never fires for pairs like Russian to Ukrainian.
+    """
+    target_scripts = get_language_scripts(get_language_code(target_language))
+    if set(target_scripts) & set(get_language_scripts(get_language_code(source_language))):
+        return False
+
+    letters = [char for char in text if char.isalpha()]
+    return bool(letters) and all(get_script(char) in target_scripts for char in letters)
+
+
+def is_identifier(text: str) -> bool:
+    """Check whether text is a path, file name or code name, e.g. /usr/bin, src/main.py or user_id."""
+    if _PATH_RE.fullmatch(text) or _FILE_NAME_RE.fullmatch(text) or _CODE_NAME_RE.fullmatch(text):
+        return True
+    if _NESTED_PATH_RE.fullmatch(text):
+        # "Yes/No/Cancel" and "A/B/C" are lists of options, not paths
+        parts = text.split("/")
+        return not all(part[:1].isupper() and part[1:] == part[1:].lower() for part in parts)
+    return False
+
+
+def get_skip_reason(text: str, source_language: str, target_language: str) -> Optional[str]:
+    """Classify a segment that needs no model call.
+
+    Returns why it can be passed through unchanged ("empty", "number",
+    "url", "email", "code", "identifier", "symbols", "protected" or
+    "target_language"), or None if it should be translated.
+    """
+    stripped = text.strip()
+    if not stripped:
+        return "empty"
+    if _NUMBER_RE.fullmatch(stripped):
+        return "number"
+    if _URL_RE.fullmatch(stripped):
+        return "url"
+    if _EMAIL_RE.fullmatch(stripped):
+        return "email"
+    if _CODE_BLOCK_RE.fullmatch(stripped):
+        return "code"
+    if is_identifier(stripped):
+        return "identifier"
+    if not any(char.isalpha() for char in stripped):
+        return "symbols"
+
+    # Nothing but URLs, code, markup and the like, e.g. "<b>{name}</b>"
+    masked, spans = mask_text(stripped)
+    if spans and not any(char.isalpha() for char in _PLACEHOLDER_RE.sub("", masked)):
+        return "protected"
+
+    if is_in_target_script(stripped, source_language, target_language):
+        return "target_language"
+    return None
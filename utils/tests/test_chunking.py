@@ -0,0 +1,51 @@
+import threading
+
+from utils.chunking import estimate_tokens, split_into_chunks, translate_chunks
+
+
+def test_token_estimate_counts_cjk_per_character():
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("你好世界") == 4
+
+
+def test_chunks_reproduce_the_text_exactly():
+    text = "  First paragraph here.\n\nSecond one. It has two sentences.\n\n\n" + "word " * 60 + "\n"
+    pieces = split_into_chunks(text, max_tokens=10)
+    assert "".join(piece for piece, _ in pieces) == text
+    for piece, translatable in pieces:
+        if translatable:
+            assert estimate_tokens(piece) <= 10
+        else:
+            assert not piece.strip()
+
+
+def test_short_text_is_one_chunk():
+    assert split_into_chunks("\nHello there.\n", max_tokens=100) == [
+        ("\n", False), ("Hello there.", True), ("\n", False)
+    ]
+
+
+def test_text_without_boundaries_is_hard_split():
+    pieces = split_into_chunks("x" * 100, max_tokens=5)
+    assert all(estimate_tokens(piece) <= 5 for piece, _ in pieces)
+    assert "".join(piece for piece, _ in pieces) == "x" * 100
+
+
+def test_whitespace_only_text_is_not_translated():
+    assert split_into_chunks("  \n ", max_tokens=10) == [("  \n ", False)]
+    assert split_into_chunks("", max_tokens=10) == []
+
+
+def test_chunks_are_translated_once_and_kept_in_order():
+    pieces = split_into_chunks("One.\n\nTwo.\n\nOne.\n\nThree.", max_tokens=2)
+    calls = []
+    lock = threading.Lock()
+
+    def translate(chunk):
+        with lock:
+            calls.append(chunk)
+        return f" <{chunk.upper()}> "
+
+    output = "".join(translate_chunks(pieces, translate, max_workers=3))
+    assert output == "<ONE.>\n\n<TWO.>\n\n<ONE.>\n\n<THREE.>"
+    assert sorted(calls) == ["One.", "Three.", "Two."]
@@ -0,0 +1,45 @@
+import io
+import json
+
+from batch.pipeline import JsonlPipeline
+from utils.dedup import dedupe_segments, fan_out, get_dedup_stats, segment_key
+
+
+def test_repeats_collapse_to_their_first_occurrence():
+    texts = ["Hello", "  Hello\n", "Bye", "", "Hello  world", "Hello world", "   "]
+    unique, positions = dedupe_segments(texts)
+    assert unique == ["Hello", "Bye", "Hello  world"]
+    assert positions == [0, 0, 1, None, 2, 2, None]
+    assert segment_key("a  b") == segment_key(" a b\t")
+
+
+def test_fan_out_restores_each_occurrence_in_order():
+    texts = ["Hello", "  Hello\n", "Bye", "", " Bye"]
+    unique, positions = dedupe_segments(texts)
+    translations = fan_out(texts, positions, [" Bonjour ", "Au revoir\n"])
+    assert translations == ["Bonjour", "  Bonjour\n", "Au revoir", "", " Au revoir"]
+
+
+def test_dedup_stats():
+    assert get_dedup_stats(10, 4) == {"segments": 10, "unique_segments": 4, "dedup_ratio": 0.6, "calls_saved": 6}
+    assert get_dedup_stats(0, 0)["dedup_ratio"] == 0.0
+
+
+def test_pipeline_translates_repeats_once_and_reports_the_savings():
+    calls = []
+
+    def translate(text):
+        calls.append(text)
+        return text.upper()
+
+    lines = [json.dumps({"text": text}) + "\n" for text in ["hi", " hi ", "bye", "hi", "bye\n"]]
+    output = io.StringIO()
+    pipeline = JsonlPipeline(translate, ["text"], max_workers=1, progress_interval=0)
+    summary = pipeline.run(lines, output)
+
+    assert sorted(calls) == ["bye", "hi"]
+    assert [json.loads(line)["text"] for line in output.getvalue().splitlines()] == ["HI", " HI ", "BYE", "HI", "BYE\n"]
+    assert summary["segments"] == 5
+    assert summary["unique_segments"] == 2
+    assert summary["calls_saved"] == 3
+    assert summary["dedup_ratio"] == 0.6
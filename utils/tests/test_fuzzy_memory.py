@@ -0,0 +1,53 @@
+import pytest
+
+from utils.fuzzy_memory import FuzzyMemory, adapt_translation, get_band_keys, get_shingles, get_signature, jaccard
+
+
+@pytest.fixture
+def fuzzy_memory(tmp_path):
+    memory = FuzzyMemory(str(tmp_path / "fuzzy.db"), threshold=0.6)
+    yield memory
+    memory.close()
+
+
+def add(memory, text, translation, provider="Fake"):
+    memory.add(text, "English", "French", provider, "m", translation)
+
+
+def test_finds_near_matches(fuzzy_memory):
+    add(fuzzy_memory, "Click the button to save your changes", "Cliquez sur le bouton pour enregistrer")
+    add(fuzzy_memory, "Completely unrelated sentence here", "Phrase sans rapport")
+
+    matches = fuzzy_memory.search("Click the button to save all your changes", "English", "French")
+    assert [match["translation"] for match in matches] == ["Cliquez sur le bouton pour enregistrer"]
+    assert matches[0]["similarity"] >= 0.6
+    assert fuzzy_memory.search("Click the button to save your changes", "English", "German") == []
+
+
+def test_numbers_do_not_change_similarity():
+    assert jaccard(get_shingles("Page 1 of 10"), get_shingles("Page 7 of 12")) == 1.0
+
+
+def test_adapt_translation_swaps_numbers():
+    assert adapt_translation("Page 3 of 12", "Page 1 of 10", "Page 1 sur 10") == "Page 3 sur 12"
+    assert adapt_translation("Page 3 of 12", "Page 1 of 10", "Page 10 sur 1") is None
+    assert adapt_translation("Chapter 3 of 12", "Page 1 of 10", "Page 1 sur 10") is None
+
+
+def test_best_candidates_are_scored_first(tmp_path):
+    memory = FuzzyMemory(str(tmp_path / "fuzzy.db"), threshold=0.9, max_candidates=3)
+    text = "The quick brown fox jumps over the lazy dog"
+    band_keys = get_band_keys(get_signature(get_shingles(text)), "en", "fr")
+    # Older segments sharing all bands but one with the query crowd the candidate list
+    shared = sorted(band_keys)[:-1]
+    for number in range(20):
+        add(memory, f"Filler segment number {'x' * number}", f"Remplissage {number}")
+        segment_id = memory._connection.execute("SELECT MAX(id) FROM segments").fetchone()[0]
+        memory._connection.executemany("INSERT INTO bands (band_key, segment_id) VALUES (?, ?)",
+                                       [(band_key, segment_id) for band_key in shared])
+    memory._connection.commit()
+    add(memory, text, "Le renard", provider="Other")
+
+    matches = memory.search(text, "English", "French")
+    assert [match["translation"] for match in matches] == ["Le renard"]
+    memory.close()
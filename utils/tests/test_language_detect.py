@@ -0,0 +1,65 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from utils import language_detect
+from utils.language_detect import LanguageDetector, get_main_script
+
+
+@pytest.fixture(scope="module")
+def detector():
+    return LanguageDetector()
+
+
+def test_main_script():
+    assert get_main_script("Привет, world") == "Cyrillic"
+    assert get_main_script("日本語のテキスト") == "Kana"
+    assert get_main_script("12 + 34") is None
+
+
+def test_single_script_languages_need_no_model(detector, monkeypatch):
+    # Even with no margin small enough, a script of its own settles the language
+    monkeypatch.setattr(language_detect, "MIN_MARGIN", float("inf"))
+    assert detector.detect("สวัสดีครับ") == "Thai"
+    assert detector.detect("こんにちは") == "Japanese"
+    assert detector.detect("Привет, как дела?") is None
+
+
+@pytest.mark.parametrize("text, language", [
+    ("Merhaba, nasılsın?", "Turkish"),
+    ("Ciao, come stai?", "Italian"),
+    ("Hej, hur mår du?", "Swedish"),
+    ("Hello, how are you?", "English"),
+    ("Привет, как дела?", "Russian"),
+    ("Привіт, як справи?", "Ukrainian"),
+    ("آپ کیسے ہیں؟", "Urdu"),
+])
+def test_short_segments_in_shared_scripts(detector, text, language):
+    assert detector.detect(text) == language
+
+
+def test_close_calls_and_text_without_letters_are_undetected(detector):
+    assert detector.detect("Cancel") is None
+    assert detector.detect("42 / 7 = 6") is None
+    assert detector.detect("") is None
+
+
+def test_batches_match_single_detection_with_and_without_numpy(detector):
+    texts = ["Ciao, come stai?", "Cancel", "", "Привіт, як справи?", "こんにちは", "Guten Morgen, wie geht es dir?"]
+    expected = [detector.detect(text) for text in texts]
+    assert detector.detect_batch(texts) == expected
+
+    pure = LanguageDetector()
+    for group in pure._groups.values():
+        group.matrix = None
+    assert pure.detect_batch(texts) == expected
+
+
+def test_numpy_is_not_imported_at_startup():
+    code = "import sys, api.service; print('numpy' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                            check=True, cwd=root).stdout
+    assert output.strip() == "False"
@@ -0,0 +1,42 @@
+from utils.masking import mask_text, placeholders_intact, unmask_stream, unmask_text
+
+
+def test_mask_and_unmask_round_trip():
+    text = "Open https://example.com/docs or mail help@example.com by 2024-05-01."
+    masked, spans = mask_text(text)
+    assert "example.com" not in masked
+    assert spans == ["https://example.com/docs", "help@example.com", "2024-05-01"]
+    assert unmask_text(masked, spans) == text
+
+
+def test_repeated_spans_share_a_placeholder():
+    masked, spans = mask_text("Use {name} and then {name} again, `{x}`.")
+    assert spans == ["{name}", "`{x}`"]
+    assert masked == "Use ⟦1⟧ and then ⟦1⟧ again, ⟦2⟧."
+
+
+def test_only_requested_kinds_are_masked():
+    masked, spans = mask_text("Page 3 of https://example.com", kinds=("url",))
+    assert masked == "Page 3 of ⟦1⟧"
+    assert spans == ["https://example.com"]
+
+
+def test_text_with_placeholder_brackets_is_left_alone():
+    assert mask_text("Keep ⟦1⟧ as is") == ("Keep ⟦1⟧ as is", [])
+
+
+def test_placeholders_must_survive_exactly():
+    assert placeholders_intact("⟦1⟧ and ⟦2⟧", "⟦2⟧ und ⟦ 1 ⟧")
+    assert not placeholders_intact("⟦1⟧ and ⟦2⟧", "⟦1⟧ und")
+    assert not placeholders_intact("⟦1⟧", "⟦1⟧ ⟦1⟧")
+
+
+def test_unknown_placeholders_are_kept():
+    assert unmask_text("⟦1⟧ ⟦7⟧", ["x"]) == "x ⟦7⟧"
+
+
+def test_stream_restores_placeholders_split_across_pieces():
+    pieces = ["Siehe ⟦", "1", "⟧ und ", "⟦2⟧."]
+    restored = list(unmask_stream(pieces, ["https://example.com", "5"]))
+    assert "".join(restored) == "Siehe https://example.com und 5."
+    assert all("⟦" not in piece for piece in restored)
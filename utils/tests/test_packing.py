@@ -0,0 +1,28 @@
+from utils.packing import can_pack, pack_segments, plan_batches, unpack_segments
+
+
+def test_pack_and_unpack_round_trip():
+    texts = ["Hello", "Good morning", "See you"]
+    packed = pack_segments(texts)
+    assert packed.splitlines()[0] == '<seg id="1">Hello</seg>'
+    assert unpack_segments(packed, 3) == {0: "Hello", 1: "Good morning", 2: "See you"}
+
+
+def test_unpack_keeps_only_aligned_segments():
+    response = '<seg id="1">Bonjour</seg>\n<seg id="3">A</seg><seg id="3">B</seg><seg id="4"> </seg>'
+    assert unpack_segments(response, 4) == {0: "Bonjour"}
+
+
+def test_unpack_accepts_multiline_segments():
+    assert unpack_segments('<seg id="1">one\ntwo</seg>', 1) == {0: "one\ntwo"}
+
+
+def test_segments_with_tags_cannot_be_packed():
+    assert can_pack("Hello")
+    assert not can_pack('<seg id="1">x</seg>')
+
+
+def test_batches_respect_segment_and_token_limits():
+    assert plan_batches(["a"] * 5, max_tokens=1000, max_segments=2) == [[0, 1], [2, 3], [4]]
+    long_text = "word " * 200
+    assert plan_batches([long_text, "a", long_text], max_tokens=300, max_segments=50) == [[0, 1], [2]]
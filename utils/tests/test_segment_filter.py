@@ -0,0 +1,44 @@
+import pytest
+
+from utils.segment_filter import get_skip_reason
+
+
+@pytest.mark.parametrize("text", [
+    "Yes/No", "On/Off", "Read/Write", "Input/Output", "N/A", "and/or", "km/h",
+    "Yes/No/Cancel", "Hello world", "e.g.", "Save As...",
+])
+def test_ordinary_text_is_translated(text):
+    assert get_skip_reason(text, "English", "French") is None
+
+
+@pytest.mark.parametrize("text", [
+    "README.md", "src/main.py", "user_id", "MAX_SIZE", "__init__",
+    "/usr/local/bin", "./run.sh", "~/notes", "C:\\Temp\\log", "src\\main", "src/api/service",
+])
+def test_identifiers_are_skipped(text):
+    assert get_skip_reason(text, "English", "French") == "identifier"
+
+
+@pytest.mark.parametrize("text, reason", [
+    ("   ", "empty"),
+    ("12,345.67", "number"),
+    ("25%", "number"),
+    ("https://example.com/page", "url"),
+    ("someone@example.com", "email"),
+    ("`print(x)`", "code"),
+    ("```\nfor x in `ls`:\n    print(x)\n```", "code"),
+    ("-> ***", "symbols"),
+    ("<b>{name}</b>", "protected"),
+])
+def test_untranslatable_segments(text, reason):
+    assert get_skip_reason(text, "English", "French") == reason
+
+
+def test_prose_between_code_blocks_is_translated():
+    assert get_skip_reason("```a``` some prose ```b```", "English", "French") is None
+
+
+def test_text_already_in_the_target_script():
+    assert get_skip_reason("Привет, мир", "English", "Russian") == "target_language"
+    # Inconclusive when both languages share a script
+    assert get_skip_reason("Привет, мир", "Russian", "Ukrainian") is None
@@ -0,0 +1,61 @@
+import pytest
+
+from utils import translation_memory
+from utils.translation_memory import TranslationMemory, normalize_text
+
+
+@pytest.fixture
+def memory(tmp_path):
+    translation_memory_db = TranslationMemory(str(tmp_path / "tm.db"), max_entries=10, memory_entries=5)
+    yield translation_memory_db
+    translation_memory_db.close()
+
+
+def lookup(memory, text):
+    return memory.get(text, "English", "French", "Fake", "m", 1)
+
+
+def store(memory, text, translation):
+    memory.put(text, "English", "French", "Fake", "m", 1, translation)
+
+
+def test_normalize_collapses_spaces_but_keeps_line_breaks():
+    assert normalize_text("  Hello \t  world ") == "Hello world"
+    assert normalize_text("One \r\n  Two") == "One\nTwo"
+    assert normalize_text("One\n\nTwo") != normalize_text("One\nTwo")
+    assert normalize_text("One\nTwo") != normalize_text("One Two")
+
+
+def test_hits_ignore_spacing_but_not_layout(memory):
+    store(memory, "Hello world", "Bonjour le monde")
+    store(memory, "Hello\nworld", "Bonjour\nle monde")
+    assert lookup(memory, "Hello   world ") == "Bonjour le monde"
+    assert lookup(memory, "Hello\nworld") == "Bonjour\nle monde"
+    assert lookup(memory, "Hello\n\nworld") is None
+    assert memory.get_stats() == {"hits": 2, "misses": 1, "entries": 2}
+
+
+def test_entries_survive_a_restart(tmp_path):
+    path = str(tmp_path / "tm.db")
+    first = TranslationMemory(path)
+    first.put("Hello", "English", "French", "Fake", "m", 1, "Bonjour")
+    first.close()
+    second = TranslationMemory(path)
+    assert second.get("Hello", "English", "French", "Fake", "m", 1) == "Bonjour"
+    assert second.get("Hello", "English", "French", "Fake", "m", 2) is None
+    second.close()
+
+
+def test_eviction_keeps_entries_used_from_the_lru(memory, monkeypatch):
+    monkeypatch.setattr(translation_memory, "_TOUCH_BATCH", 1)
+    store(memory, "favourite", "favori")
+    for number in range(9):
+        store(memory, f"text {number}", f"texte {number}")
+        # Served from the in-process LRU every time
+        assert lookup(memory, "favourite") == "favori"
+
+    store(memory, "one too many", "un de trop")
+    assert memory.get_stats()["entries"] == 9
+    memory._memory.clear()
+    assert lookup(memory, "favourite") == "favori"
+    assert lookup(memory, "text 0") is None
@@ -0,0 +1,213 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from utils.language_utils import get_language_code
+
+
+_LINE_BREAK_RE = re.compile(r"\r\n?")
+_SPACES_RE = re.compile(r"[^\S\n]+")
+_SPACES_AROUND_BREAK_RE = re.compile(r" ?\n ?")
+
+# Hits served from the in-process LRU refresh last_used in batches, once
+# this many are pending or this many seconds have passed
+_TOUCH_BATCH = 100
+_TOUCH_INTERVAL = 30.0
+
+
+def normalize_text(text: str) -> str:
+    """Normalize source text for exact-match lookups.
+
+    Runs of spaces and tabs collapse to one space, but line breaks are kept,
+    so texts that differ in their line or paragraph layout stay distinct.
+    """
+    text = unicodedata.normalize("NFC", text)
+    text = _SPACES_RE.sub(" ", _LINE_BREAK_RE.sub("\n", text))
+    return _SPACES_AROUND_BREAK_RE.sub("\n", text).strip()
+
+
+class TranslationMemory:
+    """Persistent exact-match cache of previous translations.
+
+    Entries live in a SQLite database and are keyed on the normalized source
+    text, the language pair, the provider, the model and the prompt version.
+    A small in-process LRU sits in front of the database so repeated lookups
+    rarely touch the disk; their use is written back in batches. The
+    database is size-bounded: once it grows past max_entries the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, db_path: str, max_entries: int = 100000, memory_entries: int = 1000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        # LRU hits whose last_used is not yet written: key -> time used
+        self._touched: Dict[str, float] = {}
+        self._touched_since = time.monotonic()
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._connection = sqlite3.connect(db_path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " key TEXT PRIMARY KEY,"
+            " source_text TEXT NOT NULL,"
+            " translation TEXT NOT NULL,"
+            " source_code TEXT NOT NULL,"
+            " target_code TEXT NOT NULL,"
+            " provider TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " prompt_version INTEGER NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)"
+        )
+        self._connection.commit()
+        self._entry_count = self._connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    @staticmethod
+    def make_key(text: str, source_language: str, target_language: str,
+                 provider: str, model: str, prompt_version: int) -> str:
+        """Build the cache key for a translation request."""
+        parts = [
+            normalize_text(text),
+            get_language_code(source_language),
+            get_language_code(target_language),
+            provider,
+            model or "",
+            str(prompt_version)
+        ]
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def _remember(self, key: str, translation: str) -> None:
+        """Store an entry in the in-process LRU (caller holds the lock)."""
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _flush_touched(self) -> None:
+        """Write pending last_used times of LRU hits (caller holds the lock and commits)."""
+        if self._touched:
+            self._connection.executemany(
+                "UPDATE translations SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._touched.items()]
+            )
+            self._touched.clear()
+        self._touched_since = time.monotonic()
+
+    def get(self, text: str, source_language: str, target_language: str,
+            provider: str, model: str, prompt_version: int) -> Optional[str]:
+        """Look up a previous translation, or return None on a miss."""
+        key = self.make_key(text, source_language, target_language, provider, model, prompt_version)
+
+        with self._lock:
+            translation = self._memory.get(key)
+            if translation is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                # Keep often-used entries from looking stale to eviction
+                self._touched[key] = time.time()
+                if (len(self._touched) >= _TOUCH_BATCH
+                        or time.monotonic() - self._touched_since >= _TOUCH_INTERVAL):
+                    self._flush_touched()
+                    self._connection.commit()
+                return translation
+
+            row = self._connection.execute(
+                "SELECT translation FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            self._touched[key] = time.time()
+            self._flush_touched()
+            self._connection.commit()
+            self._remember(key, row[0])
+            self.hits += 1
+            return row[0]
+
+    def put(self, text: str, source_language: str, target_language: str,
+            provider: str, model: str, prompt_version: int, translation: str) -> None:
+        """Store a translation."""
+        if not translation:
+            return
+
+        key = self.make_key(text, source_language, target_language, provider, model, prompt_version)
+        now = time.time()
+
+        with self._lock:
+            exists = self._connection.execute(
+                "SELECT 1 FROM translations WHERE key = ?", (key,)
+            ).fetchone() is not None
+            self._connection.execute(
+                "INSERT OR REPLACE INTO translations"
+                " (key, source_text, translation, source_code, target_code, provider, model,"
+                "  prompt_version, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, text, translation, get_language_code(source_language),
+                 get_language_code(target_language), provider, model or "",
+                 prompt_version, now, now)
+            )
+            if not exists:
+                self._entry_count += 1
+            self._remember(key, translation)
+            self._touched.pop(key, None)
+            self._flush_touched()
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self) -> None:
+        """Drop the least recently used entries once over capacity (caller holds the lock)."""
+        if self._entry_count <= self.max_entries:
+            return
+
+        # Evict down to 90% so we don't evict on every insert
+        excess = self._entry_count - int(self.max_entries * 0.9)
+        self._connection.execute(
+            "DELETE FROM translations WHERE key IN"
+            " (SELECT key FROM translations ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+        self._entry_count = self._connection.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        self._memory.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and the number of stored entries."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": self._entry_count
+            }
+
+    def clear(self) -> None:
+        """Remove all stored translations."""
+        with self._lock:
+            self._connection.execute("DELETE FROM translations")
+            self._connection.commit()
+            self._memory.clear()
+            self._touched.clear()
+            self._entry_count = 0
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._flush_touched()
+            self._connection.commit()
+            self._connection.close()